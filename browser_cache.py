@@ -0,0 +1,233 @@
+"""
+Per-carrier browser state that survives between runs.
+
+Chromium only keeps a disk cache for persistent profiles, and every run used to
+start each carrier from an empty context. A CarrierCache hook gives each carrier
+a directory under .cache/browser/<carrier>/ with:
+
+    storage_state.json     cookies + localStorage (consent banners, A/B buckets, ...),
+                           loaded into the new context and saved when it closes
+    index.json, objects/   an HTTP cache for static assets (scripts, stylesheets,
+                           fonts, images) served through route fulfilment
+
+Cached responses follow Cache-Control max-age / Expires. Stale entries are
+revalidated with If-None-Match / If-Modified-Since, and a 304 is served from disk.
+Documents and XHR are never cached, so prices are always fetched fresh. Each
+carrier's cache is capped at `max_bytes`; the least recently used entries are
+evicted when the index is saved.
+"""
+import hashlib
+import json
+import os
+import re
+import time
+from email.utils import parsedate_to_datetime
+
+from items import slugify
+
+CACHE_ROOT = os.path.join(".cache", "browser")
+DEFAULT_MAX_BYTES = int(os.environ.get("BROWSER_CACHE_MB", 64)) * 1024 * 1024
+CACHEABLE_TYPES = {"script", "stylesheet", "font", "image"}
+INDEX_VERSION = 1
+
+# The body we store is already decoded, so the first five would describe the wrong bytes; the
+# rest belong to the original response (replaying set-cookie would overwrite newer cookies)
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive",
+                 "set-cookie", "date", "age"}
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+def _expires_at(headers, now):
+    """Absolute expiry time from the response headers (0: revalidate on every use), or None if not storable."""
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-store" in cache_control:
+        return None
+    if "no-cache" in cache_control:
+        return 0
+    m = _MAX_AGE_RE.search(cache_control)
+    if m:
+        return now + int(m.group(1))
+    if headers.get("expires"):
+        try:
+            return parsedate_to_datetime(headers["expires"]).timestamp()
+        except (TypeError, ValueError):
+            return 0
+    return 0
+
+
+class CarrierCache:
+    """
+    run_carrier hook. Install it before the resource filter (the filter should still
+    block first) and after the stand-in router.
+
+        cache = CarrierCache("au")
+        context = await browser.new_context(**CONTEXT_OPTIONS, **cache.context_options())
+        await cache.install(context)
+        ...
+        await cache.before_close(context)   # saves storage_state, index, evicts
+    """
+
+    def __init__(self, carrier, root=CACHE_ROOT, max_bytes=DEFAULT_MAX_BYTES, enabled=True):
+        self.carrier = carrier
+        self.dir = os.path.join(root, slugify(carrier))
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.entries = {}
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.bytes_served = 0
+        self.evicted = 0
+        if enabled:
+            self._load()
+
+    @property
+    def storage_state_path(self):
+        return os.path.join(self.dir, "storage_state.json")
+
+    @property
+    def index_path(self):
+        return os.path.join(self.dir, "index.json")
+
+    def _object_path(self, url):
+        return os.path.join(self.dir, "objects", hashlib.sha256(url.encode("utf-8")).hexdigest() + ".bin")
+
+    def _load(self):
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+        if index.get("version") == INDEX_VERSION:
+            self.entries = {url: e for url, e in index.get("entries", {}).items()
+                            if os.path.exists(self._object_path(url))}
+            # Entries written before _DROP_HEADERS covered set-cookie/date/age
+            for entry in self.entries.values():
+                entry["headers"] = {k: v for k, v in entry["headers"].items() if k not in _DROP_HEADERS}
+
+    def context_options(self):
+        """Extra new_context() kwargs: the saved cookies/localStorage, if any."""
+        if self.enabled and os.path.exists(self.storage_state_path):
+            return {"storage_state": self.storage_state_path}
+        return {}
+
+    def _serve(self, url, entry):
+        with open(self._object_path(url), "rb") as f:
+            body = f.read()
+        entry["last_used"] = time.time()
+        self.bytes_served += len(body)
+        return body
+
+    def _store(self, url, response, body, now):
+        headers = {k.lower(): v for k, v in response.headers.items()}
+        expires = _expires_at(headers, now)
+        if response.status != 200 or expires is None:
+            self.entries.pop(url, None)
+            return
+        path = self._object_path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(body)
+        os.replace(tmp, path)
+        self.entries[url] = {
+            "size": len(body),
+            "headers": {k: v for k, v in headers.items() if k not in _DROP_HEADERS},
+            "expires": expires,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "last_used": now,
+        }
+
+    async def _handle_route(self, route):
+        request = route.request
+        if request.method != "GET" or request.resource_type not in CACHEABLE_TYPES:
+            await route.fallback()
+            return
+        url = request.url.split("#", 1)[0]
+        now = time.time()
+        entry = self.entries.get(url)
+        if entry is not None and entry["expires"] > now:
+            self.hits += 1
+            await route.fulfill(status=200, headers=entry["headers"], body=self._serve(url, entry))
+            return
+
+        headers = dict(request.headers)
+        if entry is not None:
+            if entry.get("etag"):
+                headers["if-none-match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["if-modified-since"] = entry["last_modified"]
+        try:
+            response = await route.fetch(headers=headers)
+        except Exception:
+            await route.fallback()
+            return
+        if response.status == 304 and entry is not None:
+            self.revalidated += 1
+            fresh = _expires_at({k.lower(): v for k, v in response.headers.items()}, now)
+            entry["expires"] = fresh or 0
+            await route.fulfill(status=200, headers=entry["headers"], body=self._serve(url, entry))
+            return
+        self.misses += 1
+        body = await response.body()
+        self._store(url, response, body, now)
+        await route.fulfill(response=response, body=body)
+
+    async def install(self, context):
+        if self.enabled:
+            await context.route("**/*", self._handle_route)
+
+    async def before_close(self, context):
+        if not self.enabled:
+            return
+        os.makedirs(self.dir, exist_ok=True)
+        tmp = self.storage_state_path + ".tmp"
+        await context.storage_state(path=tmp)
+        os.replace(tmp, self.storage_state_path)
+        self.save()
+
+    def save(self):
+        """Evict least recently used entries down to max_bytes and write the index."""
+        total = sum(e["size"] for e in self.entries.values())
+        for url, entry in sorted(self.entries.items(), key=lambda kv: kv[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= entry["size"]
+            del self.entries[url]
+            self.evicted += 1
+            try:
+                os.remove(self._object_path(url))
+            except OSError:
+                pass
+        os.makedirs(self.dir, exist_ok=True)
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "entries": self.entries}, f)
+        os.replace(tmp, self.index_path)
+
+    def stats(self):
+        lookups = self.hits + self.revalidated + self.misses
+        return {
+            "carrier": self.carrier,
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.revalidated) / lookups if lookups else 0.0,
+            "bytes_served": self.bytes_served,
+            "entries": len(self.entries),
+            "bytes_on_disk": sum(e["size"] for e in self.entries.values()),
+            "evicted": self.evicted,
+        }
+
+
+def print_cache_summary(caches):
+    caches = [c for c in caches if c.enabled]
+    if not caches:
+        return
+    print("Browser cache (static assets):")
+    for cache in caches:
+        s = cache.stats()
+        print(f"  {s['carrier']:<10} hit rate {s['hit_rate']:>4.0%}  hits={s['hits']:<4} revalidated={s['revalidated']:<4} "
+              f"misses={s['misses']:<4} served {s['bytes_served'] / 1024:.0f}KB from disk, "
+              f"{s['entries']} entries / {s['bytes_on_disk'] / 1024 / 1024:.1f}MB" + (f", evicted {s['evicted']}" if s["evicted"] else ""))
@@ -0,0 +1,121 @@
+"""
+Delta feed between two runs (previous data.json -> new data.json).
+
+Written next to data.json as changes/<YYYYMMDD-HHMM>.json (only when something
+changed) and changes/latest.json (every run, possibly empty):
+
+    {
+      "version": 1, "from": "<previous updated_at>", "to": "<updated_at>",
+      "added":   [{"id", "carrier", "model", "storage", "url", <price fields>}, ...],
+      "removed": ["<id>", ...],
+      "prices":  [{"id", "changes": {"<field>": [old, new], ...}}, ...],
+      "stock":   [{"id", "color", "available": true|false}, ...]      # flips only
+    }
+
+Items are keyed by the stable ids from items.py, so bots can poll a few hundred
+bytes instead of diffing the whole file:
+
+    python changes.py old_data.json docs/data.json      # print the diff of two saved files
+"""
+import json
+import os
+import sys
+
+from history import PRICE_FIELDS
+from items import assign_item_ids
+
+CHANGES_VERSION = 1
+# Timestamped files older than this many runs-with-changes are deleted
+MAX_CHANGE_FILES = 120
+
+
+def changes_dir(data_path):
+    return os.path.join(os.path.dirname(data_path), "changes")
+
+
+def load_previous(data_path):
+    """The data.json about to be overwritten, or None."""
+    try:
+        with open(data_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _by_id(data):
+    items = data.get("items") or []
+    return dict(zip(assign_item_ids(items), items))
+
+
+def _stock(item):
+    return {v.get("color") or "": bool(v.get("stock_available")) for v in item.get("variants") or []}
+
+
+def diff_runs(old, new):
+    before, after = _by_id(old), _by_id(new)
+    delta = {
+        "version": CHANGES_VERSION,
+        "from": old.get("updated_at"),
+        "to": new.get("updated_at"),
+        "added": [],
+        "removed": sorted(set(before) - set(after)),
+        "prices": [],
+        "stock": [],
+    }
+    for item_id, item in after.items():
+        prev = before.get(item_id)
+        if prev is None:
+            entry = {"id": item_id}
+            entry.update({k: item.get(k) for k in ("carrier", "model", "storage", "url")})
+            entry.update({f: item.get(f) for f in PRICE_FIELDS})
+            delta["added"].append(entry)
+            continue
+        changed = {f: [prev.get(f), item.get(f)] for f in PRICE_FIELDS if prev.get(f) != item.get(f)}
+        if changed:
+            delta["prices"].append({"id": item_id, "changes": changed})
+        prev_stock = _stock(prev)
+        for color, available in _stock(item).items():
+            if color in prev_stock and prev_stock[color] != available:
+                delta["stock"].append({"id": item_id, "color": color, "available": available})
+    return delta
+
+
+def is_empty(delta):
+    return not (delta["added"] or delta["removed"] or delta["prices"] or delta["stock"])
+
+
+def _dump(path, delta):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(delta, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def write_changes(old, new, data_path):
+    """Write latest.json (and a timestamped copy if anything changed). Returns the delta."""
+    root = changes_dir(data_path)
+    os.makedirs(root, exist_ok=True)
+    delta = diff_runs(old, new)
+    if not is_empty(delta):
+        stamp = (new.get("updated_at") or "").replace("-", "").replace(":", "").replace(" ", "-")
+        _dump(os.path.join(root, f"{stamp}.json"), delta)
+        history = sorted(n for n in os.listdir(root) if n.endswith(".json") and n != "latest.json")
+        for name in history[:-MAX_CHANGE_FILES]:
+            os.remove(os.path.join(root, name))
+    _dump(os.path.join(root, "latest.json"), delta)
+    return delta
+
+
+def summary(delta):
+    return (f"+{len(delta['added'])} -{len(delta['removed'])} items, "
+            f"{len(delta['prices'])} price changes, {len(delta['stock'])} stock flips")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python changes.py OLD_DATA_JSON NEW_DATA_JSON")
+    with open(sys.argv[1], encoding="utf-8") as f:
+        old_data = json.load(f)
+    with open(sys.argv[2], encoding="utf-8") as f:
+        new_data = json.load(f)
+    print(json.dumps(diff_runs(old_data, new_data), ensure_ascii=False, indent=2))
@@ -16,11 +16,27 @@ window.mountIPhoneMonitor = function (container, config) {
     }
     const BASE_URL = baseUrl;
 
+    // Embeds for a single carrier/model can load just those shards (shards.py), e.g.
+    // { carriers: ['au'] } or { models: ['iPhone 17 Pro'] }; both together narrows the carriers' shards
+    const SHARD_CARRIERS = config.carriers || null;
+    const SHARD_MODELS = config.models || null;
+
+    // Last dataset is kept in IndexedDB and shown immediately on the next mount (disable with cache: false)
+    const USE_CACHE = config.cache !== false && 'indexedDB' in window;
+    const CACHE_KEY = BASE_URL + '|' + JSON.stringify([SHARD_CARRIERS, SHARD_MODELS]);
+
+    // Optional Web Worker (js/engine.js) for parsing, facets, filtering, sorting and lowest-price marking
+    const USE_WORKER = config.worker === true && 'Worker' in window;
+
     // --- 2. State (Scoped to this instance) ---
     const INITIAL_DISPLAY_COUNT = 5;
     const LOAD_INCREMENT = 5;
+    // Above this many visible cards, off-screen cards are swapped for fixed-height placeholders
+    const VIRTUALIZE_ABOVE = config.virtualizeAbove || 40;
+    const ESTIMATED_CARD_HEIGHT = 220;
 
     let allData = [];
+    let viewIndex = null; // data.index.json (view_index.py), when it matches data.json
     let carriers = ['Rakuten', 'ahamo', 'UQ mobile', 'au', 'SoftBank', 'docomo'];
     let selectedModel = 'All';
     let selectedStorage = 'All';
@@ -28,6 +44,19 @@ window.mountIPhoneMonitor = function (container, config) {
     let sortOrder = 'price_asc'; // 'price_asc', 'price_desc', 'model_newest'
     let displayedCount = INITIAL_DISPLAY_COUNT;
 
+    // Keyed rendering: card nodes are built once per item and then only moved/shown/hidden
+    const cardCache = new Map();    // key -> card element
+    const slotCache = new Map();    // key -> placeholder wrapper (virtualized mode)
+    const heightCache = new Map();  // key -> last measured card height
+    const itemsByKey = new Map();
+    let slotObserver = null;
+
+    let engine = null;        // worker wrapper, see createEngine()
+    let engineFacets = null;  // facets from the worker for the current data set
+    let querySeq = 0;         // only the latest query's answer is rendered
+
+    let imageManifest = null; // images/manifest.json (tools/fetch_images.py): WebP/AVIF thumbnails
+
     // --- 3. DOM Elements Reference ---
     // We will query these relative to `container`
     let updatedAtEl, errorMessageEl, errorTextEl, loadingEl, productContainerEl, mobileListEl, noResultsEl, loadMoreBtn, closeListBtn;
@@ -42,8 +71,11 @@ window.mountIPhoneMonitor = function (container, config) {
         // Grab References
         grabElements();
         // Fetch & Setup
+        if (USE_WORKER) engine = createEngine();
+        loadImageManifest(); // doesn't block the first render, see upgradeImages()
         fetchData();
         setupEventListeners();
+        if (config.serviceWorker) registerServiceWorker();
     }
 
     // --- 5. Core Functions ---
@@ -225,30 +257,246 @@ window.mountIPhoneMonitor = function (container, config) {
     }
 
     async function fetchData() {
-        try {
-            const response = await fetch(BASE_URL + 'data.json');
-            if (!response.ok) throw new Error(`HTTP error! status: ${response.status} `);
-            const data = await response.json();
-
-            if (updatedAtEl) updatedAtEl.textContent = data.updated_at || '不明';
+        // Stale-while-revalidate: render the cached copy now, then check the network
+        const cached = USE_CACHE ? await readCache() : null;
+        if (cached) applyData(cached.data, cached.index, await prepareInEngine(cached.data, cached.index));
 
-            allData = data.items;
+        try {
+            const { data, index, prepared } = await loadFresh();
 
-            populateFilterChips(allData);
-            markLowestPrices(allData);
-
-            if (loadingEl) loadingEl.classList.add('hidden');
-            if (productContainerEl) productContainerEl.classList.remove('hidden');
-            render();
+            // updated_at is per minute, so two runs in the same minute (a partial refresh) would look equal
+            const signature = datasetSignature(data);
+            if (cached && cached.signature === signature) return;
+            if (USE_CACHE) writeCache(data, index, signature);
+            applyData(data, index, prepared);
 
         } catch (err) {
             console.error(err);
+            if (cached) return; // keep showing the cached prices
             if (loadingEl) loadingEl.classList.add('hidden');
             if (errorMessageEl) errorMessageEl.classList.remove('hidden');
             if (errorTextEl) errorTextEl.textContent = err.message;
         }
     }
 
+    async function loadFresh() {
+        const sharded = SHARD_CARRIERS || SHARD_MODELS;
+        if (engine && !sharded) {
+            try {
+                // The worker resolves URLs against js/engine.js, so give it an absolute base
+                const result = await engine.call('fetch', { baseUrl: new URL(BASE_URL, location.href).href });
+                return { data: result.data, index: result.index, prepared: result };
+            } catch (err) {
+                disableEngine(err);
+            }
+        }
+        // The view index describes the full data set, so it is useless for a subset
+        const [data, index] = await Promise.all([sharded ? fetchShards() : fetchItems(), sharded ? null : fetchViewIndex()]);
+        return { data, index, prepared: await prepareInEngine(data, index) };
+    }
+
+    function applyData(data, index, prepared) {
+        if (updatedAtEl) updatedAtEl.textContent = data.updated_at || '不明';
+
+        allData = data.items;
+        // A stale index (e.g. cached from a previous run) would point at the wrong items
+        viewIndex = (index && index.updated_at === data.updated_at && index.count === allData.length) ? index : null;
+        engineFacets = prepared ? prepared.facets : null;
+
+        // Keys may point at different items in the new data set
+        if (slotObserver) slotObserver.disconnect();
+        slotObserver = null;
+        [cardCache, slotCache, heightCache, itemsByKey].forEach(cache => cache.clear());
+        allData.forEach((item, pos) => {
+            item._pos = pos;
+            item._key = prepared ? prepared.keys[pos] : (viewIndex ? viewIndex.ids[pos] : String(pos));
+            itemsByKey.set(item._key, item);
+        });
+
+        populateFilterChips(allData);
+        markLowestPrices(allData);
+
+        if (loadingEl) loadingEl.classList.add('hidden');
+        if (productContainerEl) productContainerEl.classList.remove('hidden');
+        render();
+    }
+
+    function createEngine() {
+        let worker;
+        try {
+            // Throws for cross-origin script URLs (widget embedded on another site): stay on the main thread
+            worker = new Worker(BASE_URL + 'js/engine.js');
+        } catch (err) {
+            console.warn('iPhone Monitor: worker unavailable', err);
+            return null;
+        }
+        const pending = new Map();
+        let nextId = 0;
+        worker.onmessage = (event) => {
+            const { id, result, error } = event.data;
+            const request = pending.get(id);
+            if (!request) return;
+            pending.delete(id);
+            if (error) request.reject(new Error(error));
+            else request.resolve(result);
+        };
+        worker.onerror = (event) => {
+            pending.forEach(request => request.reject(new Error(event.message || 'worker error')));
+            pending.clear();
+        };
+        return {
+            worker,
+            call(type, payload) {
+                const id = ++nextId;
+                return new Promise((resolve, reject) => {
+                    pending.set(id, { resolve, reject });
+                    worker.postMessage(Object.assign({ id, type }, payload));
+                });
+            },
+        };
+    }
+
+    async function prepareInEngine(data, index) {
+        if (!engine) return null;
+        try {
+            return await engine.call('load', { data, index });
+        } catch (err) {
+            disableEngine(err);
+            return null;
+        }
+    }
+
+    function disableEngine(err) {
+        console.warn('iPhone Monitor: worker failed, using the main thread', err);
+        if (engine) engine.worker.terminate();
+        engine = null;
+        engineFacets = null;
+    }
+
+    function openCacheDb() {
+        return new Promise((resolve, reject) => {
+            const request = indexedDB.open('iphone-monitor', 1);
+            request.onupgradeneeded = () => request.result.createObjectStore('datasets');
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+    }
+
+    async function readCache() {
+        try {
+            const db = await openCacheDb();
+            return await new Promise((resolve, reject) => {
+                const request = db.transaction('datasets').objectStore('datasets').get(CACHE_KEY);
+                request.onsuccess = () => resolve(request.result || null);
+                request.onerror = () => reject(request.error);
+            });
+        } catch (err) {
+            // Private browsing, blocked storage, ...: just go to the network
+            console.warn('iPhone Monitor: cache unavailable', err);
+            return null;
+        }
+    }
+
+    // Content signature of a dataset as fetched (before applyData() annotates it): FNV-1a over its JSON
+    function datasetSignature(data) {
+        const text = JSON.stringify(data);
+        let hash = 0x811c9dc5;
+        for (let i = 0; i < text.length; i++) {
+            hash ^= text.charCodeAt(i);
+            hash = Math.imul(hash, 0x01000193);
+        }
+        return `${text.length}:${(hash >>> 0).toString(16)}`;
+    }
+
+    async function writeCache(data, index, signature) {
+        try {
+            // Copy before the first await: applyData() adds _pos/_key/isLowest to these same objects right after
+            const record = { data: structuredClone(data), index, signature, savedAt: Date.now() };
+            const db = await openCacheDb();
+            db.transaction('datasets', 'readwrite').objectStore('datasets').put(record, CACHE_KEY);
+        } catch (err) {
+            console.warn('iPhone Monitor: could not cache data', err);
+        }
+    }
+
+    function registerServiceWorker() {
+        // Only possible when the widget is served from the same origin as docs/ (not for cross-site embeds)
+        if (!('serviceWorker' in navigator)) return;
+        const swUrl = new URL(BASE_URL + 'sw.js', location.href);
+        if (swUrl.origin !== location.origin) return;
+        navigator.serviceWorker.register(swUrl.href).catch(err => console.warn('iPhone Monitor: service worker not registered', err));
+    }
+
+    // data.v2.json (wire_format.py) is the compact version of data.json; older deployments only have the latter
+    // no-cache: always revalidate with the server (ETag -> 304) instead of trusting the HTTP cache's max-age
+    async function fetchItems() {
+        try {
+            const [response] = await Promise.all([fetch(BASE_URL + 'data.v2.json', { cache: 'no-cache' }), loadWireFormat()]);
+            if (response.ok) return decodeCompactData(await response.json());
+        } catch (err) {
+            console.warn('iPhone Monitor: falling back to data.json', err);
+        }
+        const response = await fetch(BASE_URL + 'data.json', { cache: 'no-cache' });
+        if (!response.ok) throw new Error(`HTTP error! status: ${response.status} `);
+        return response.json();
+    }
+
+    // decodeCompactData() lives in js/wire_format.js, shared with the worker; embeds only include app.js
+    let wireFormatReady = null;
+    function loadWireFormat() {
+        if (typeof decodeCompactData === 'function') return Promise.resolve();
+        if (!wireFormatReady) {
+            wireFormatReady = new Promise((resolve, reject) => {
+                const script = document.createElement('script');
+                script.src = BASE_URL + 'js/wire_format.js';
+                script.onload = resolve;
+                script.onerror = () => reject(new Error('could not load js/wire_format.js'));
+                document.head.appendChild(script);
+            });
+        }
+        return wireFormatReady;
+    }
+
+    async function fetchShards() {
+        // The manifest is tiny and changes every run; the shards are cache-busted by their content hash
+        const response = await fetch(BASE_URL + 'data/manifest.json', { cache: 'no-cache' });
+        if (!response.ok) throw new Error(`HTTP error! status: ${response.status} `);
+        const manifest = await response.json();
+
+        const names = SHARD_CARRIERS || SHARD_MODELS;
+        const entries = SHARD_CARRIERS ? manifest.carriers : manifest.models;
+        const shards = await Promise.all(names.filter(name => entries[name]).map(async name => {
+            const entry = entries[name];
+            const res = await fetch(`${BASE_URL}data/${encodeURI(entry.file)}?v=${entry.hash}`);
+            if (!res.ok) throw new Error(`HTTP error! status: ${res.status} `);
+            return res.json();
+        }));
+
+        let items = shards.flatMap(shard => shard.items);
+        if (SHARD_CARRIERS && SHARD_MODELS) items = items.filter(item => SHARD_MODELS.includes(item.model));
+        return { updated_at: manifest.updated_at, items };
+    }
+
+    async function fetchViewIndex() {
+        try {
+            const response = await fetch(BASE_URL + 'data.index.json', { cache: 'no-cache' });
+            return response.ok ? await response.json() : null;
+        } catch (err) {
+            return null;
+        }
+    }
+
+    function getNum(model) {
+        if (model.includes('SE')) return -1;
+        const match = model.match(/iPhone\s*(\d+)/);
+        return match ? parseInt(match[1]) : 0;
+    }
+
+    function getMonthlyPrice(item) {
+        if (viewIndex) return viewIndex.monthly[item._pos];
+        return item.monthly_payment || (item.price_effective_rent ? Math.floor(item.price_effective_rent / 24) : 0);
+    }
+
     function populateFilterChips(items) {
         const modelContainer = container.querySelector('#filter-model-container');
         const storageContainer = container.querySelector('#filter-storage-container');
@@ -256,18 +504,18 @@ window.mountIPhoneMonitor = function (container, config) {
         if (!modelContainer || !storageContainer) return;
 
         // --- Models ---
-        const models = [...new Set(items.map(i => i.model))];
-        models.sort((a, b) => {
-            const getNum = (s) => {
-                if (s.includes('SE')) return -1;
-                const match = s.match(/iPhone\s*(\d+)/);
-                return match ? parseInt(match[1]) : 0;
-            };
-            const numA = getNum(a);
-            const numB = getNum(b);
-            if (numA !== numB) return numB - numA; // Descending
-            return a.localeCompare(b);
-        });
+        let models;
+        if (engineFacets || viewIndex) {
+            models = (engineFacets || viewIndex).models.slice();
+        } else {
+            models = [...new Set(items.map(i => i.model))];
+            models.sort((a, b) => {
+                const numA = getNum(a);
+                const numB = getNum(b);
+                if (numA !== numB) return numB - numA; // Descending
+                return a.localeCompare(b);
+            });
+        }
         models.unshift('All');
 
         modelContainer.innerHTML = '';
@@ -285,11 +533,16 @@ window.mountIPhoneMonitor = function (container, config) {
         });
 
         // --- Storage ---
-        const storages = [...new Set(items.map(i => i.storage))];
-        storages.sort((a, b) => {
-            const parse = (s) => (s.includes('TB') ? parseInt(s) * 1024 : parseInt(s) || 9999);
-            return parse(a) - parse(b);
-        });
+        let storages;
+        if (engineFacets || viewIndex) {
+            storages = (engineFacets || viewIndex).storages.slice();
+        } else {
+            storages = [...new Set(items.map(i => i.storage))];
+            storages.sort((a, b) => {
+                const parse = (s) => (s.includes('TB') ? parseInt(s) * 1024 : parseInt(s) || 9999);
+                return parse(a) - parse(b);
+            });
+        }
         storages.unshift('All');
 
         storageContainer.innerHTML = '';
@@ -327,6 +580,13 @@ window.mountIPhoneMonitor = function (container, config) {
     }
 
     function markLowestPrices(items) {
+        if (engineFacets) return; // the worker sends lowest flags with each query
+        if (viewIndex) {
+            const flags = viewIndex.lowest[priceMode];
+            items.forEach(item => { item.isLowest = flags[item._pos] === 1; });
+            return;
+        }
+
         const groups = {};
         items.forEach(item => {
             const key = `${item.model} -${item.storage} `;
@@ -336,7 +596,6 @@ window.mountIPhoneMonitor = function (container, config) {
 
         Object.values(groups).forEach(group => {
             if (group.length === 0) return;
-            const getMonthlyPrice = (i) => i.monthly_payment || (i.price_effective_rent ? Math.floor(i.price_effective_rent / 24) : 0);
             const minPrice = Math.min(...group.map(i => priceMode === 'rent' ? getMonthlyPrice(i) : i.price_gross));
             group.forEach(item => {
                 const price = priceMode === 'rent' ? getMonthlyPrice(item) : item.price_gross;
@@ -372,7 +631,12 @@ window.mountIPhoneMonitor = function (container, config) {
     }
 
     function render() {
-        let filtered = allData.filter(item => {
+        if (engine && engineFacets) {
+            renderFromEngine();
+            return;
+        }
+
+        const matches = (item) => {
             if (!carriers.includes(item.carrier)) return false;
             if (selectedModel !== 'All' && item.model !== selectedModel) return false;
             if (selectedModel !== 'All' && item.model !== selectedModel) return false;
@@ -386,32 +650,57 @@ window.mountIPhoneMonitor = function (container, config) {
                 }
             }
             return true;
-        });
+        };
 
-        filtered.sort((a, b) => {
-            if (sortOrder === 'model_newest') {
-                const getNum = (s) => {
-                    if (s.includes('SE')) return -1;
-                    const match = s.match(/iPhone\s*(\d+)/);
-                    return match ? parseInt(match[1]) : 0;
-                };
-                const numA = getNum(a.model);
-                const numB = getNum(b.model);
-                if (numA !== numB) return numB - numA;
-                return a.model.localeCompare(b.model);
-            } else {
-                const getMonthlyPrice = (i) => i.monthly_payment || (i.price_effective_rent ? Math.floor(i.price_effective_rent / 24) : 0);
-                const valA = priceMode === 'rent' ? getMonthlyPrice(a) : a.price_gross;
-                const valB = priceMode === 'rent' ? getMonthlyPrice(b) : b.price_gross;
-                return sortOrder === 'price_asc' ? valA - valB : valB - valA;
-            }
-        });
+        let filtered;
+        if (viewIndex) {
+            // Pre-sorted positions: no per-click sort, just a filtered walk
+            const orderKey = sortOrder === 'model_newest' ? sortOrder : `${sortOrder}:${priceMode}`;
+            filtered = viewIndex.order[orderKey].map(pos => allData[pos]).filter(matches);
+        } else {
+            filtered = allData.filter(matches);
+            filtered.sort(compareItems);
+        }
 
-        const currentFilteredData = filtered;
+        renderList(filtered);
+    }
+
+    function renderFromEngine() {
+        const seq = ++querySeq;
+        engine.call('query', { carriers, model: selectedModel, storage: selectedStorage, sortOrder, priceMode })
+            .then(result => {
+                if (seq !== querySeq) return; // a newer filter change is already on its way
+                const items = result.keys.map((key, i) => {
+                    const item = itemsByKey.get(key);
+                    item.isLowest = result.lowest[i] === 1;
+                    return item;
+                });
+                renderList(items);
+            })
+            .catch(err => {
+                disableEngine(err);
+                markLowestPrices(allData);
+                render();
+            });
+    }
+
+    function compareItems(a, b) {
+        if (sortOrder === 'model_newest') {
+            const numA = getNum(a.model);
+            const numB = getNum(b.model);
+            if (numA !== numB) return numB - numA;
+            return a.model.localeCompare(b.model);
+        } else {
+            const valA = priceMode === 'rent' ? getMonthlyPrice(a) : a.price_gross;
+            const valB = priceMode === 'rent' ? getMonthlyPrice(b) : b.price_gross;
+            return sortOrder === 'price_asc' ? valA - valB : valB - valA;
+        }
+    }
 
-        if (mobileListEl) mobileListEl.innerHTML = '';
+    function renderList(currentFilteredData) {
 
         if (currentFilteredData.length === 0) {
+            if (mobileListEl) mobileListEl.replaceChildren();
             if (productContainerEl) productContainerEl.classList.add('hidden');
             if (noResultsEl) noResultsEl.classList.remove('hidden');
             if (loadMoreBtn) loadMoreBtn.classList.add('hidden');
@@ -442,68 +731,136 @@ window.mountIPhoneMonitor = function (container, config) {
         }
 
         const visibleItems = currentFilteredData.slice(0, displayedCount);
+        const virtual = visibleItems.length > VIRTUALIZE_ABOVE && 'IntersectionObserver' in window;
+        if (!virtual && slotObserver) {
+            slotObserver.disconnect();
+            slotObserver = null;
+        }
 
-        visibleItems.forEach(item => {
-            const imgUrl = getProductImage(item.model);
-            const carrierName = getCarrierDisplayName(item.carrier);
-            const carrierLogo = getCarrierLogoPath(item.carrier);
-            const isLowest = item.isLowest;
-
-            let unitBadge = '', phasesHTML = '';
-            // Monthly payment only
-            const monthlyPayment = item.monthly_payment || (item.price_effective_rent ? Math.floor(item.price_effective_rent / 24) : 0);
-            const displayPrice = monthlyPayment;
-            if (item.program_exemption > 0) unitBadge = '返却P';
-            
-            // SoftBank payment phases display
-            if (item.carrier === 'SoftBank' && item.monthly_payment_phases && item.monthly_payment_phases.length > 1) {
-                const phases = item.monthly_payment_phases
-                    .filter(p => p.amount > 0)
-                    .map(p => `<span class="inline-block">${p.period}: ¥${p.amount.toLocaleString()}</span>`)
-                    .join('<span class="mx-1 text-gray-300">→</span>');
-                if (phases) {
-                    phasesHTML = `<div class="mt-1 text-[10px] text-gray-500 leading-relaxed">${phases}</div>`;
-                }
+        // Reconcile in place: unchanged cards stay put, load-more only appends the new slice
+        visibleItems.forEach((item, i) => {
+            const node = virtual ? getSlot(item) : getCard(item);
+            if (mobileListEl.children[i] !== node) {
+                mobileListEl.insertBefore(node, mobileListEl.children[i] || null);
             }
+        });
+        while (mobileListEl.children.length > visibleItems.length) {
+            const node = mobileListEl.lastElementChild;
+            if (slotObserver && slotCache.get(node.dataset.key) === node) slotObserver.unobserve(node);
+            node.remove();
+        }
+    }
 
-            const fmtPrice = displayPrice.toLocaleString();
-            const lowestBadge = isLowest ? `<div class="absolute top-2 left-2 bg-yellow-400 text-yellow-900 text-[10px] font-black px-2 py-0.5 rounded shadow-sm z-10">最安</div>` : '';
+    function getCard(item) {
+        let card = cardCache.get(item._key);
+        if (!card) {
+            card = createCard(item);
+            cardCache.set(item._key, card);
+        }
+        updateCard(card, item);
+        return card;
+    }
 
-            const cardHTML = `
-                <div class="flex flex-col gap-3 p-5 border border-gray-100 rounded-2xl bg-white shadow-sm hover:shadow-xl hover:-translate-y-1 hover:border-blue-200 transition-all duration-300 relative overflow-hidden group">
-                    ${lowestBadge}
-                    <div class="flex gap-4 items-start">
-                        <div class="w-20 h-24 flex-shrink-0 bg-gray-50 rounded-xl flex items-center justify-center p-2 group-hover:bg-blue-50/50 transition-colors">
-                            <img src="${imgUrl}" onerror="this.onerror=null; this.src='https://placehold.co/200x250/e2e8f0/64748b?text=No+Image'; this.classList.add('opacity-50');" class="w-full h-full object-contain mix-blend-multiply transition-transform duration-500 group-hover:scale-110">
-                        </div>
-                        <div class="flex-grow min-w-0">
-                            <div class="flex flex-col gap-1 items-start mb-2">
-                                <div>
-                                    <h3 class="text-lg font-bold text-gray-900 leading-tight">${item.model}</h3>
-                                    <div class="flex flex-wrap gap-1 mt-1">
-                                            <span class="text-[10px] font-medium text-gray-500 bg-gray-100 px-1.5 py-0.5 rounded">${item.storage}</span>
-                                    </div>
+    function updateCard(card, item) {
+        card.querySelector('[data-role="lowest"]').classList.toggle('hidden', !item.isLowest);
+    }
+
+    // Virtualized mode: each item gets a wrapper that holds its card only while near the viewport.
+    // IntersectionObserver measures against the top-level viewport, so this also works inside the iframe embed.
+    function getSlot(item) {
+        let slot = slotCache.get(item._key);
+        if (!slot) {
+            slot = document.createElement('div');
+            slot.dataset.key = item._key;
+            slotCache.set(item._key, slot);
+        }
+        // Empty slots (new, or whose card was taken back by the non-virtual path) keep the list height stable
+        if (!slot.firstChild) slot.style.height = `${heightCache.get(item._key) || ESTIMATED_CARD_HEIGHT}px`;
+        if (!slotObserver) {
+            slotObserver = new IntersectionObserver(onSlotVisibility, { rootMargin: '800px 0px' });
+        }
+        slotObserver.observe(slot);
+        if (slot.firstChild) updateCard(slot.firstChild, item);
+        return slot;
+    }
+
+    function onSlotVisibility(entries) {
+        entries.forEach(entry => {
+            const slot = entry.target;
+            const key = slot.dataset.key;
+            if (entry.isIntersecting && !slot.firstChild) {
+                slot.appendChild(getCard(itemsByKey.get(key)));
+                slot.style.height = '';
+            } else if (!entry.isIntersecting && slot.firstChild) {
+                const height = slot.offsetHeight;
+                if (height) heightCache.set(key, height);
+                slot.style.height = `${height || ESTIMATED_CARD_HEIGHT}px`;
+                slot.firstChild.remove();
+            }
+        });
+    }
+
+    function createCard(item) {
+        const carrierName = getCarrierDisplayName(item.carrier);
+        const carrierLogo = getCarrierLogoPath(item.carrier);
+
+        let unitBadge = '', phasesHTML = '';
+        // Monthly payment only
+        const monthlyPayment = getMonthlyPrice(item);
+        const displayPrice = monthlyPayment;
+        if (item.program_exemption > 0) unitBadge = '返却P';
+        
+        // SoftBank payment phases display
+        if (item.carrier === 'SoftBank' && item.monthly_payment_phases && item.monthly_payment_phases.length > 1) {
+            const phases = item.monthly_payment_phases
+                .filter(p => p.amount > 0)
+                .map(p => `<span class="inline-block">${p.period}: ¥${p.amount.toLocaleString()}</span>`)
+                .join('<span class="mx-1 text-gray-300">→</span>');
+            if (phases) {
+                phasesHTML = `<div class="mt-1 text-[10px] text-gray-500 leading-relaxed">${phases}</div>`;
+            }
+        }
+
+        const fmtPrice = displayPrice.toLocaleString();
+        // Always rendered, toggled by updateCard() when the price mode changes
+        const lowestBadge = `<div data-role="lowest" class="hidden absolute top-2 left-2 bg-yellow-400 text-yellow-900 text-[10px] font-black px-2 py-0.5 rounded shadow-sm z-10">最安</div>`;
+
+        const cardHTML = `
+            <div data-key="${item._key}" class="flex flex-col gap-3 p-5 border border-gray-100 rounded-2xl bg-white shadow-sm hover:shadow-xl hover:-translate-y-1 hover:border-blue-200 transition-all duration-300 relative overflow-hidden group">
+                ${lowestBadge}
+                <div class="flex gap-4 items-start">
+                    <div class="w-20 h-24 flex-shrink-0 bg-gray-50 rounded-xl flex items-center justify-center p-2 group-hover:bg-blue-50/50 transition-colors">
+                        ${productImageHTML(item.model, 'w-full h-full object-contain mix-blend-multiply transition-transform duration-500 group-hover:scale-110', "this.onerror=null; this.parentNode.querySelectorAll('source').forEach(s => s.remove()); this.src='https://placehold.co/200x250/e2e8f0/64748b?text=No+Image'; this.classList.add('opacity-50');")}
+                    </div>
+                    <div class="flex-grow min-w-0">
+                        <div class="flex flex-col gap-1 items-start mb-2">
+                            <div>
+                                <h3 class="text-lg font-bold text-gray-900 leading-tight">${item.model}</h3>
+                                <div class="flex flex-wrap gap-1 mt-1">
+                                        <span class="text-[10px] font-medium text-gray-500 bg-gray-100 px-1.5 py-0.5 rounded">${item.storage}</span>
                                 </div>
-                                <img src="${carrierLogo}" alt="${carrierName}" class="h-5 object-contain object-left mt-1 opacity-80 group-hover:opacity-100 transition-opacity">
                             </div>
-                            <div class="mt-3">
-                                <div class="flex items-baseline gap-1">
-                                    <span class="text-xs text-gray-400 font-bold">月々</span>
-                                    <span class="text-3xl font-black text-slate-800 tracking-tighter font-sans">¥${fmtPrice}〜</span>
-                                </div>
-                                ${phasesHTML}
-                                ${unitBadge ? `<div class="mt-1"><span class="text-[10px] text-red-600 bg-red-50 border border-red-100 px-1.5 py-0.5 rounded font-bold">${unitBadge}</span></div>` : ''}
+                            <img src="${carrierLogo}" alt="${carrierName}" class="h-5 object-contain object-left mt-1 opacity-80 group-hover:opacity-100 transition-opacity">
+                        </div>
+                        <div class="mt-3">
+                            <div class="flex items-baseline gap-1">
+                                <span class="text-xs text-gray-400 font-bold">月々</span>
+                                <span class="text-3xl font-black text-slate-800 tracking-tighter font-sans">¥${fmtPrice}〜</span>
                             </div>
+                            ${phasesHTML}
+                            ${unitBadge ? `<div class="mt-1"><span class="text-[10px] text-red-600 bg-red-50 border border-red-100 px-1.5 py-0.5 rounded font-bold">${unitBadge}</span></div>` : ''}
                         </div>
                     </div>
-                    <a href="${item.url}" target="_blank" class="block w-full bg-slate-900 text-white text-center text-sm font-bold py-3 rounded-xl shadow-lg shadow-slate-200 hover:bg-slate-800 hover:shadow-xl transition active:scale-95 flex items-center justify-center gap-2 group/btn">
-                        公式サイトで見る
-                        <svg class="w-4 h-4 transition-transform group-hover/btn:translate-x-1" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M14 5l7 7m0 0l-7 7m7-7H3"/></svg>
-                    </a>
                 </div>
-            `;
-            mobileListEl.insertAdjacentHTML('beforeend', cardHTML);
-        });
+                <a href="${item.url}" target="_blank" class="block w-full bg-slate-900 text-white text-center text-sm font-bold py-3 rounded-xl shadow-lg shadow-slate-200 hover:bg-slate-800 hover:shadow-xl transition active:scale-95 flex items-center justify-center gap-2 group/btn">
+                    公式サイトで見る
+                    <svg class="w-4 h-4 transition-transform group-hover/btn:translate-x-1" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M14 5l7 7m0 0l-7 7m7-7H3"/></svg>
+                </a>
+            </div>
+        `;
+        const template = document.createElement('template');
+        template.innerHTML = cardHTML.trim();
+        return template.content.firstElementChild;
     }
 
     function getCarrierLogoPath(carrier) {
@@ -522,14 +879,54 @@ window.mountIPhoneMonitor = function (container, config) {
         return carrier;
     }
 
-    function getProductImage(model) {
+    function getProductImageKey(model) {
         let clean = model.toLowerCase();
         if (clean.includes('se') && (clean.includes('3') || clean.includes('第3'))) {
             clean = 'iphonese3';
         } else {
             clean = clean.replace(/[^a-z0-9]/g, '');
         }
-        return BASE_URL + 'images/' + clean + '.png';
+        return clean;
+    }
+
+    function getProductImage(model) {
+        return BASE_URL + 'images/' + getProductImageKey(model) + '.png';
+    }
+
+    async function loadImageManifest() {
+        try {
+            const response = await fetch(BASE_URL + 'images/manifest.json');
+            if (response.ok) imageManifest = await response.json();
+        } catch (err) {
+            console.warn('iPhone Monitor: no image manifest, using full-size PNGs', err);
+        }
+        if (imageManifest) upgradeImages();
+    }
+
+    // Rendering never waits for the manifest: cards built before it arrived show the
+    // full-size PNGs, so rebuild whatever is on screen with the thumbnails
+    function upgradeImages() {
+        if (!allData.length) return;
+        if (slotObserver) slotObserver.disconnect();
+        slotObserver = null;
+        [cardCache, slotCache].forEach(cache => cache.clear());
+        render();
+    }
+
+    // <picture> with AVIF/WebP thumbnails sized for the 64x80 box, falling back to the PNG
+    function productImageHTML(model, imgClass, onError) {
+        const png = getProductImage(model);
+        const entry = imageManifest && imageManifest.images[getProductImageKey(model)];
+        if (!entry) {
+            return `<img src="${png}" onerror="${onError}" class="${imgClass}">`;
+        }
+        const srcset = (variants) => variants.map(v => `${BASE_URL}images/${v.file} ${v.w}w`).join(', ');
+        const sources = ['avif', 'webp']
+            .filter(fmt => entry.variants[fmt] && entry.variants[fmt].length)
+            .map(fmt => `<source type="image/${fmt}" srcset="${srcset(entry.variants[fmt])}" sizes="${imageManifest.box[0]}px">`)
+            .join('');
+        const base = (entry.variants.webp || entry.variants.avif)[0];
+        return `<picture class="block w-full h-full">${sources}<img src="${png}" width="${base.w}" height="${base.h}" loading="lazy" decoding="async" onerror="${onError}" class="${imgClass}"></picture>`;
     }
 
     // Initialize!
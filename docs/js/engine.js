@@ -0,0 +1,139 @@
+/**
+ * iPhone Monitor data engine (Web Worker)
+ * Used by app.js when mounted with `worker: true`.
+ *
+ * Fetching + JSON parsing + decoding, facets, filtering, sorting and lowest-price
+ * marking all run here; the page only gets the dataset once (to build cards) and
+ * then ordered item keys per query. The logic mirrors the main-thread fallback in app.js.
+ *
+ * Messages (each request carries an `id`, echoed in the reply):
+ *   { type: 'fetch', baseUrl }                -> { data, index, keys, facets }
+ *   { type: 'load', data, index }             -> { keys, facets }
+ *   { type: 'query', carriers, model, storage, sortOrder, priceMode }
+ *                                             -> { keys, lowest }   (lowest: 0/1 per key)
+ */
+
+importScripts('wire_format.js'); // decodeCompactData(), shared with app.js
+
+let items = [];
+let keys = [];
+let ranks = [];
+let prices = { rent: [], buyout: [] };
+let lowest = { rent: [], buyout: [] };
+let orders = {}; // order key -> positions, built on first use (or taken from the view index)
+
+function getNum(model) {
+    if (model.includes('SE')) return -1;
+    const match = model.match(/iPhone\s*(\d+)/);
+    return match ? parseInt(match[1]) : 0;
+}
+
+function parseStorage(s) {
+    return s.includes('TB') ? parseInt(s) * 1024 : parseInt(s) || 9999;
+}
+
+async function fetchJson(url) {
+    const response = await fetch(url, { cache: 'no-cache' });
+    if (!response.ok) throw new Error(`HTTP error! status: ${response.status} `);
+    return response.json();
+}
+
+async function fetchDataset(baseUrl) {
+    const indexPromise = fetchJson(baseUrl + 'data.index.json').catch(() => null);
+    let data;
+    try {
+        data = decodeCompactData(await fetchJson(baseUrl + 'data.v2.json'));
+    } catch (err) {
+        data = await fetchJson(baseUrl + 'data.json');
+    }
+    return { data, index: await indexPromise };
+}
+
+function load(data, index) {
+    items = data.items;
+    // Only trust an index built for exactly this data set (same check as app.js)
+    const viewIndex = (index && index.updated_at === data.updated_at && index.count === items.length) ? index : null;
+    keys = items.map((item, pos) => viewIndex ? viewIndex.ids[pos] : String(pos));
+    ranks = viewIndex ? viewIndex.model_rank : items.map(item => getNum(item.model));
+    const monthly = viewIndex ? viewIndex.monthly : items.map(i => i.monthly_payment || (i.price_effective_rent ? Math.floor(i.price_effective_rent / 24) : 0));
+    prices = { rent: monthly, buyout: items.map(i => i.price_gross) };
+    orders = viewIndex ? Object.assign({}, viewIndex.order) : {};
+
+    lowest = {};
+    ['rent', 'buyout'].forEach(mode => {
+        if (viewIndex) {
+            lowest[mode] = viewIndex.lowest[mode];
+            return;
+        }
+        const min = {};
+        items.forEach((item, pos) => {
+            const group = `${item.model} -${item.storage} `;
+            min[group] = group in min ? Math.min(min[group], prices[mode][pos]) : prices[mode][pos];
+        });
+        lowest[mode] = items.map((item, pos) => prices[mode][pos] === min[`${item.model} -${item.storage} `] ? 1 : 0);
+    });
+
+    const models = viewIndex ? viewIndex.models : [...new Set(items.map(i => i.model))].sort((a, b) => {
+        const numA = getNum(a);
+        const numB = getNum(b);
+        if (numA !== numB) return numB - numA;
+        return a.localeCompare(b);
+    });
+    const storages = viewIndex ? viewIndex.storages : [...new Set(items.map(i => i.storage))].sort((a, b) => parseStorage(a) - parseStorage(b));
+    return { keys, facets: { models, storages } };
+}
+
+function getOrder(orderKey) {
+    if (!orders[orderKey]) {
+        const positions = items.map((_, pos) => pos);
+        if (orderKey === 'model_newest') {
+            positions.sort((a, b) => (ranks[a] !== ranks[b]) ? ranks[b] - ranks[a] : items[a].model.localeCompare(items[b].model));
+        } else {
+            const [sortOrder, mode] = orderKey.split(':');
+            const p = prices[mode];
+            positions.sort((a, b) => sortOrder === 'price_asc' ? p[a] - p[b] : p[b] - p[a]);
+        }
+        orders[orderKey] = positions;
+    }
+    return orders[orderKey];
+}
+
+function query({ carriers, model, storage, sortOrder, priceMode }) {
+    const orderKey = sortOrder === 'model_newest' ? sortOrder : `${sortOrder}:${priceMode}`;
+    const carrierSet = new Set(carriers);
+    const matches = (item) => {
+        if (!carrierSet.has(item.carrier)) return false;
+        if (model !== 'All' && item.model !== model) return false;
+        if (storage !== 'All') {
+            if (item.storage === '最小容量') {
+                // Same heuristic as app.js: "最小容量" shows up for the small standard sizes
+                if (storage !== '128GB' && storage !== '64GB' && storage !== '256GB') return false;
+            } else if (item.storage !== storage) {
+                return false;
+            }
+        }
+        return true;
+    };
+    const positions = getOrder(orderKey).filter(pos => matches(items[pos]));
+    return { keys: positions.map(pos => keys[pos]), lowest: positions.map(pos => lowest[priceMode][pos]) };
+}
+
+self.onmessage = async (event) => {
+    const { id, type } = event.data;
+    try {
+        let result;
+        if (type === 'fetch') {
+            const { data, index } = await fetchDataset(event.data.baseUrl);
+            result = Object.assign({ data, index }, load(data, index));
+        } else if (type === 'load') {
+            result = load(event.data.data, event.data.index);
+        } else if (type === 'query') {
+            result = query(event.data);
+        } else {
+            throw new Error(`unknown message type ${type}`);
+        }
+        self.postMessage({ id, result });
+    } catch (err) {
+        self.postMessage({ id, error: err.message });
+    }
+};
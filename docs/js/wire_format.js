@@ -0,0 +1,36 @@
+/**
+ * Decoder for docs/data.v2.json (wire_format.py). Shared by app.js, which loads it
+ * on first use, and js/engine.js, which pulls it in with importScripts().
+ */
+
+function decodeCompactData(compact) {
+    if (compact.v !== 2) throw new Error(`unsupported data format version ${compact.v}`);
+    const { strings, cols } = compact;
+    const lookup = (table, i) => (i === null || i === undefined) ? null : strings[table][i];
+    const intColumns = ['price_gross', 'price_effective_rent', 'price_effective_buyout', 'discount_official', 'points_awarded', 'program_exemption', 'monthly_payment'];
+    const extra = compact.extra || {};
+
+    const items = [];
+    for (let pos = 0; pos < compact.n; pos++) {
+        const item = {
+            carrier: lookup('carrier', cols.carrier[pos]),
+            model: lookup('model', cols.model[pos]),
+            storage: lookup('storage', cols.storage[pos]),
+            url: lookup('url', cols.url[pos]),
+        };
+        intColumns.forEach(key => { item[key] = cols[key][pos]; });
+
+        const phases = compact.phases[pos];
+        item.monthly_payment_phases = [];
+        for (let j = 0; j < phases.length; j += 2) {
+            item.monthly_payment_phases.push({ period: lookup('text', phases[j]), amount: phases[j + 1] });
+        }
+        const variants = compact.variants[pos];
+        item.variants = [];
+        for (let j = 0; j < variants.length; j += 3) {
+            item.variants.push({ color: lookup('color', variants[j]), stock_text: lookup('text', variants[j + 1]), stock_available: variants[j + 2] === 1 });
+        }
+        items.push(Object.assign(item, extra[pos] || {}));
+    }
+    return { updated_at: compact.updated_at, items };
+}
@@ -0,0 +1,38 @@
+/**
+ * Optional service worker for the static docs/ assets (pages, js/app.js, images).
+ * Enabled with `serviceWorker: true` in the widget config.
+ *
+ * Static files are served stale-while-revalidate from the Cache API.
+ * JSON data is left to the network: app.js keeps its own copy in IndexedDB and revalidates it.
+ */
+const STATIC_CACHE = 'iphone-monitor-static-v1';
+
+self.addEventListener('install', () => self.skipWaiting());
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil((async () => {
+        const names = await caches.keys();
+        await Promise.all(names.filter(n => n.startsWith('iphone-monitor-static-') && n !== STATIC_CACHE).map(n => caches.delete(n)));
+        await self.clients.claim();
+    })());
+});
+
+self.addEventListener('fetch', (event) => {
+    const request = event.request;
+    const url = new URL(request.url);
+    if (request.method !== 'GET' || url.origin !== self.location.origin || url.pathname.endsWith('.json')) return;
+
+    event.respondWith((async () => {
+        const cache = await caches.open(STATIC_CACHE);
+        const cached = await cache.match(request);
+        const refresh = fetch(request).then(response => {
+            if (response.ok) cache.put(request, response.clone());
+            return response;
+        });
+        if (cached) {
+            event.waitUntil(refresh.catch(() => {}));
+            return cached;
+        }
+        return refresh;
+    })());
+});
@@ -0,0 +1,60 @@
+"""
+Declarative, single-roundtrip DOM extraction.
+
+Instead of walking the DOM from Python with one CDP call per locator/count/text,
+a scraper describes what it needs as a nested schema and gets the whole
+structure back from one page.evaluate() call as plain JSON.
+
+Schema keys (every key is optional):
+    selector  CSS selector, matched inside the current element.
+              No selector means the current element itself.
+    sibling   match among the *following siblings* of the current element
+              instead of its descendants (like xpath following-sibling::)
+    all       return a list of every match instead of the first match (or None)
+    attr      return this attribute instead of the text
+    fields    {name: sub-schema}; each match becomes a dict of those fields
+
+Leaves return textContent (same as Locator.text_content()), untrimmed.
+"""
+
+_EXTRACT_JS = """
+(schema) => {
+    const scoped = (sel) => sel.split(',').map(s => ':scope ' + s.trim()).join(', ');
+
+    const find = (el, spec) => {
+        if (!spec.selector) return [el];
+        if (spec.sibling) {
+            const out = [];
+            for (let s = el.nextElementSibling; s; s = s.nextElementSibling) {
+                if (s.matches(spec.selector)) out.push(s);
+            }
+            return out;
+        }
+        const sel = el === document ? spec.selector : scoped(spec.selector);
+        return Array.from(el.querySelectorAll(sel));
+    };
+
+    const value = (el, spec) => {
+        if (spec.fields) {
+            const obj = {};
+            for (const [name, sub] of Object.entries(spec.fields)) obj[name] = run(el, sub);
+            return obj;
+        }
+        if (spec.attr) return el.getAttribute(spec.attr);
+        return el.textContent;
+    };
+
+    const run = (el, spec) => {
+        const matches = find(el, spec);
+        if (spec.all) return matches.map(m => value(m, spec));
+        return matches.length ? value(matches[0], spec) : null;
+    };
+
+    return run(document, schema);
+}
+"""
+
+
+async def extract(page, schema):
+    """Evaluate `schema` against the page in one roundtrip and return the JSON result."""
+    return await page.evaluate(_EXTRACT_JS, schema)
@@ -0,0 +1,205 @@
+"""
+Local price history (SQLite, WAL mode).
+
+Every run appends one snapshot per item (prices) and per colour variant (stock),
+keyed by the stable item id from items.py, so questions like these don't need
+the git log of docs/data.json:
+
+    python history.py series rakuten/iphone-17/256gb~3fa2c1 --days 90
+    python history.py changed --field price_effective_rent          # changed in the latest run today
+    python history.py items                                          # known item ids
+    python history.py import docs/data.json                          # backfill a saved data.json
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+from items import assign_item_ids, url_hash
+
+HISTORY_DB = os.path.join("history", "prices.sqlite3")
+
+PRICE_FIELDS = [
+    "price_gross",
+    "price_effective_rent",
+    "price_effective_buyout",
+    "monthly_payment",
+    "discount_official",
+    "points_awarded",
+    "program_exemption",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      INTEGER PRIMARY KEY,
+    recorded_at TEXT NOT NULL,          -- data.json updated_at, "YYYY-MM-DD HH:MM"
+    item_count  INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_recorded_at ON runs (recorded_at);
+
+CREATE TABLE IF NOT EXISTS items (
+    item_id    TEXT PRIMARY KEY,
+    carrier    TEXT NOT NULL,
+    model      TEXT NOT NULL,
+    storage    TEXT NOT NULL,
+    first_run  INTEGER NOT NULL,
+    last_run   INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS prices (
+    item_id                TEXT NOT NULL,
+    run_id                 INTEGER NOT NULL,
+    price_gross            INTEGER,
+    price_effective_rent   INTEGER,
+    price_effective_buyout INTEGER,
+    monthly_payment        INTEGER,
+    discount_official      INTEGER,
+    points_awarded         INTEGER,
+    program_exemption      INTEGER,
+    url                    TEXT,
+    PRIMARY KEY (item_id, run_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS prices_run ON prices (run_id);
+
+CREATE TABLE IF NOT EXISTS stock (
+    item_id         TEXT NOT NULL,
+    run_id          INTEGER NOT NULL,
+    color           TEXT NOT NULL,
+    stock_available INTEGER NOT NULL,
+    stock_text      TEXT,
+    PRIMARY KEY (item_id, color, run_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS stock_run ON stock (run_id);
+"""
+
+
+def connect(path=HISTORY_DB):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    migrate_item_ids(conn)
+    return conn
+
+
+def migrate_item_ids(conn):
+    """Rename ids from before every id carried a URL hash ("au/iphone-17/256gb" -> "...~3fa2c1"), using each row's URL."""
+    old_ids = conn.execute("SELECT item_id, carrier, model, storage FROM items WHERE item_id NOT LIKE '%~%'").fetchall()
+    if not old_ids:
+        return
+    with conn:
+        for old, carrier, model, storage in old_ids:
+            for run_id, url in conn.execute("SELECT run_id, url FROM prices WHERE item_id = ?", (old,)).fetchall():
+                new = f"{old}~{url_hash(url)}"
+                conn.execute("UPDATE OR IGNORE prices SET item_id = ? WHERE item_id = ? AND run_id = ?", (new, old, run_id))
+                conn.execute("UPDATE OR IGNORE stock SET item_id = ? WHERE item_id = ? AND run_id = ?", (new, old, run_id))
+                conn.execute(
+                    "INSERT INTO items (item_id, carrier, model, storage, first_run, last_run) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(item_id) DO UPDATE SET first_run = min(first_run, excluded.first_run), "
+                    "last_run = max(last_run, excluded.last_run)",
+                    (new, carrier, model, storage, run_id, run_id))
+            for table in ("prices", "stock", "items"):
+                conn.execute(f"DELETE FROM {table} WHERE item_id = ?", (old,))
+    print(f"History: moved {len(old_ids)} item id(s) to the always-hashed form")
+
+
+def record_run(conn, data):
+    """Append one data.json snapshot ({"updated_at", "items"}). Returns the new run_id."""
+    items = data["items"]
+    ids = assign_item_ids(items)
+    with conn:
+        cur = conn.execute("INSERT INTO runs (recorded_at, item_count) VALUES (?, ?)",
+                           (data.get("updated_at") or datetime.now().strftime("%Y-%m-%d %H:%M"), len(items)))
+        run_id = cur.lastrowid
+        conn.executemany(
+            "INSERT INTO items (item_id, carrier, model, storage, first_run, last_run) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(item_id) DO UPDATE SET last_run = excluded.last_run",
+            [(iid, i["carrier"], i["model"], i["storage"], run_id, run_id) for iid, i in zip(ids, items)])
+        conn.executemany(
+            f"INSERT OR REPLACE INTO prices (item_id, run_id, {', '.join(PRICE_FIELDS)}, url) "
+            f"VALUES (?, ?, {', '.join('?' for _ in PRICE_FIELDS)}, ?)",
+            [(iid, run_id, *[i.get(f) for f in PRICE_FIELDS], i.get("url")) for iid, i in zip(ids, items)])
+        conn.executemany(
+            "INSERT OR REPLACE INTO stock (item_id, run_id, color, stock_available, stock_text) VALUES (?, ?, ?, ?, ?)",
+            [(iid, run_id, v.get("color") or "", 1 if v.get("stock_available") else 0, v.get("stock_text"))
+             for iid, i in zip(ids, items) for v in i.get("variants") or []])
+    return run_id
+
+
+def _check_field(field):
+    if field not in PRICE_FIELDS:
+        raise ValueError(f"unknown price field {field!r} (one of: {', '.join(PRICE_FIELDS)})")
+
+
+def price_series(conn, item_id, field="price_effective_rent", days=90):
+    """[(recorded_at, value), ...] for one item over the last `days` days, oldest first."""
+    _check_field(field)
+    since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M")
+    return conn.execute(
+        f"SELECT r.recorded_at, p.{field} FROM prices p JOIN runs r ON r.run_id = p.run_id "
+        "WHERE p.item_id = ? AND r.recorded_at >= ? ORDER BY p.run_id",
+        (item_id, since)).fetchall()
+
+
+def changed_items(conn, field="price_effective_rent", day=None):
+    """
+    Items whose `field` differs from their previous snapshot, for snapshots taken on `day`
+    ("YYYY-MM-DD", default today). Returns [(item_id, old, new, recorded_at), ...].
+    """
+    _check_field(field)
+    day = day or datetime.now().strftime("%Y-%m-%d")
+    return conn.execute(
+        f"""
+        WITH ordered AS (
+            SELECT p.item_id, r.recorded_at, p.{field} AS value,
+                   LAG(p.{field}) OVER (PARTITION BY p.item_id ORDER BY p.run_id) AS previous
+            FROM prices p JOIN runs r ON r.run_id = p.run_id
+        )
+        SELECT item_id, previous, value, recorded_at FROM ordered
+        WHERE previous IS NOT NULL AND previous IS NOT value AND substr(recorded_at, 1, 10) = ?
+        ORDER BY item_id, recorded_at
+        """,
+        (day,)).fetchall()
+
+
+def _cli(argv):
+    parser = argparse.ArgumentParser(description="Query the local price history")
+    parser.add_argument("--db", default=HISTORY_DB)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("series", help="price series for one item")
+    p.add_argument("item_id")
+    p.add_argument("--field", default="price_effective_rent", choices=PRICE_FIELDS)
+    p.add_argument("--days", type=int, default=90)
+    p = sub.add_parser("changed", help="items whose price changed on a day")
+    p.add_argument("--field", default="price_effective_rent", choices=PRICE_FIELDS)
+    p.add_argument("--date", default=None, help="YYYY-MM-DD (default: today)")
+    sub.add_parser("items", help="list known item ids")
+    p = sub.add_parser("import", help="append a saved data.json as a run")
+    p.add_argument("files", nargs="+")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    if args.cmd == "series":
+        for recorded_at, value in price_series(conn, args.item_id, args.field, args.days):
+            print(f"{recorded_at}  {value}")
+    elif args.cmd == "changed":
+        for item_id, old, new, recorded_at in changed_items(conn, args.field, args.date):
+            print(f"{recorded_at}  {item_id:<48} {old} -> {new}")
+    elif args.cmd == "items":
+        for row in conn.execute("SELECT item_id, first_run, last_run FROM items ORDER BY item_id"):
+            print(f"{row[0]:<48} runs {row[1]}..{row[2]}")
+    elif args.cmd == "import":
+        for path in args.files:
+            with open(path, encoding="utf-8") as f:
+                run_id = record_run(conn, json.load(f))
+            print(f"Imported {path} as run {run_id}")
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_cli(sys.argv[1:]))
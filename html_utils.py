@@ -0,0 +1,70 @@
+"""
+Tiny stdlib-only helpers to read server-rendered HTML without a browser.
+
+Good enough for the carrier pages we parse (well-formed markup, class-based
+hooks); not a general HTML parser.
+"""
+import html as _html
+import re
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_SCRIPT_STYLE_RE = re.compile(r'<(script|style)\b[^>]*>.*?</\1\s*>', re.DOTALL | re.IGNORECASE)
+_TITLE_RE = re.compile(r'<title[^>]*>(.*?)</title\s*>', re.DOTALL | re.IGNORECASE)
+_OPEN_OR_CLOSE_RE = re.compile(r'<(/?)([a-zA-Z][a-zA-Z0-9]*)\b[^>]*?(/?)>')
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+def strip_tags(fragment):
+    """Text of an HTML fragment, like element.textContent (tags removed, entities decoded)."""
+    return _html.unescape(_TAG_RE.sub('', fragment))
+
+
+def visible_text(fragment):
+    """Like strip_tags() but drops <script>/<style> bodies too."""
+    return strip_tags(_SCRIPT_STYLE_RE.sub('', fragment))
+
+
+def html_title(doc):
+    m = _TITLE_RE.search(doc)
+    return strip_tags(m.group(1)).strip() if m else ""
+
+
+def _element_end(doc, tag, start):
+    """Index just past the element whose open tag ends at `start`, balancing nested same-name tags."""
+    depth = 1
+    for m in _OPEN_OR_CLOSE_RE.finditer(doc, start):
+        if m.group(2).lower() != tag:
+            continue
+        if m.group(1):
+            depth -= 1
+            if depth == 0:
+                return m.end()
+        elif not m.group(3):
+            depth += 1
+    return len(doc)
+
+
+def elements(doc, tag=None, class_name=None):
+    """
+    Outer HTML of every element matching `tag` and/or having `class_name` in its class list,
+    in document order (roughly `querySelectorAll("tag.class_name")`).
+    """
+    if class_name:
+        pattern = r'<(%s)\b[^>]*\bclass\s*=\s*["\'](?:[^"\']*\s)?%s(?:\s[^"\']*)?["\'][^>]*>' % (
+            re.escape(tag) if tag else r'[a-zA-Z][a-zA-Z0-9]*', re.escape(class_name))
+    else:
+        pattern = r'<(%s)\b[^>]*>' % re.escape(tag)
+    out = []
+    for m in re.finditer(pattern, doc, re.IGNORECASE):
+        name = m.group(1).lower()
+        if name in _VOID_TAGS or m.group(0).endswith("/>"):
+            out.append(m.group(0))
+            continue
+        out.append(doc[m.start():_element_end(doc, name, m.end())])
+    return out
+
+
+def first_text(doc, tag=None, class_name=None):
+    """textContent of the first matching element, or None."""
+    found = elements(doc, tag, class_name)
+    return strip_tags(found[0]) if found else None
@@ -0,0 +1,167 @@
+"""
+HTTP-first page fetching.
+
+Many carrier detail pages are server-rendered: the prices we regex for are in
+the initial HTML. For those, a pooled HTTP/2 client (keep-alive, gzip/br) is far
+cheaper than a Chromium navigation. `fetch_page()` tries HTTP first and falls
+back to the browser page only when the carrier's expected markers are missing
+from the response. Which path each URL took is recorded in PATH_LOG.
+
+httpx is optional: without it (or with --no-http) every page goes through the browser.
+"""
+import time
+
+from html_utils import html_title
+from instrumentation import goto, phase, record_transfer
+from readiness import wait_ready
+from standin import rewrite_url
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+HTTP_TIMEOUT = 15.0
+MAX_CONNECTIONS = 24
+
+# Substrings that must all be present in the raw HTML for the HTTP path to be trusted.
+# Carriers not listed here always use the browser.
+CARRIER_MARKERS = {
+    "au": ["現金販売価格／支払総額", "program-inner"],
+    "docomo": ["現金販売価格", "お客さま負担額"],
+    "SoftBank": ["総額", "mobile-page-u96-app-model-price-item-row"],
+}
+
+# One record per fetch_page() call: {"carrier", "url", "path": "http"|"browser", "reason", "ms"}
+PATH_LOG = []
+
+_client = None
+_enabled = True
+_user_agent = None
+_url_map = None
+
+
+class Document:
+    """The HTML of one page plus how we got it."""
+
+    def __init__(self, url, html, title, path, etag=None, last_modified=None, not_modified=False):
+        self.url = url
+        self.html = html
+        self.title = title
+        self.path = path
+        self.etag = etag
+        self.last_modified = last_modified
+        # True for a 304 answer to a conditional request: html is None, reuse the previous parse
+        self.not_modified = not_modified
+
+
+def configure(enabled=True, user_agent=None, url_map=None):
+    """`url_map` ({real origin: stand-in origin}, see standin.py) redirects every request."""
+    global _enabled, _user_agent, _url_map
+    _enabled = enabled
+    _user_agent = user_agent
+    _url_map = url_map
+
+
+def _http2_available():
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        headers = {"Accept-Language": "ja-JP,ja;q=0.9"}
+        if _user_agent:
+            headers["User-Agent"] = _user_agent
+        _client = httpx.AsyncClient(
+            http2=_http2_available(),
+            headers=headers,
+            follow_redirects=True,
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def _try_http(url, markers, validators=None):
+    """Return (response, None) on success (200 with markers, or 304) or (None, reason) when the browser is needed."""
+    with phase("http", url=url):
+        try:
+            target = rewrite_url(url, _url_map) if _url_map else url
+            if target is None:
+                return None, "not a carrier origin"
+            response = await _get_client().get(target, headers=validators or None)
+        except Exception as e:
+            return None, f"http error: {type(e).__name__}"
+        record_transfer(response.num_bytes_downloaded)
+    if response.status_code == 304 and validators:
+        return response, None
+    if response.status_code != 200:
+        return None, f"status {response.status_code}"
+    missing = [m for m in markers if m not in response.text]
+    if missing:
+        return None, f"missing marker {missing[0]!r}"
+    return response, None
+
+
+async def fetch_page(page, url, carrier, ready=None, validators=None):
+    """
+    Get a page's HTML, over plain HTTP when possible.
+
+    `ready` is the wait_ready() kwargs used on the browser fallback. `validators` are
+    conditional headers (If-None-Match / If-Modified-Since); a 304 returns a Document with
+    not_modified=True and no html. On the browser path `page` is left on `url`.
+    """
+    started = time.monotonic()
+    markers = CARRIER_MARKERS.get(carrier)
+    reason = "no markers for carrier"
+    if not _enabled:
+        reason = "disabled"
+    elif httpx is None:
+        reason = "httpx not installed"
+    elif markers:
+        response, reason = await _try_http(url, markers, validators)
+        if response is not None:
+            not_modified = response.status_code == 304
+            PATH_LOG.append({"carrier": carrier, "url": url, "path": "http", "reason": "304" if not_modified else "",
+                             "ms": int((time.monotonic() - started) * 1000)})
+            html = None if not_modified else response.text
+            return Document(url, html, html_title(html) if html else "", "http",
+                            etag=response.headers.get("etag"),
+                            last_modified=response.headers.get("last-modified"),
+                            not_modified=not_modified)
+
+    response = await goto(page, url)
+    if ready:
+        await wait_ready(page, **ready)
+    html = await page.content()
+    title = await page.title()
+    PATH_LOG.append({"carrier": carrier, "url": url, "path": "browser", "reason": reason,
+                     "ms": int((time.monotonic() - started) * 1000)})
+    headers = response.headers if response is not None else {}
+    return Document(url, html, title, "browser",
+                    etag=headers.get("etag"), last_modified=headers.get("last-modified"))
+
+
+def print_fetch_summary():
+    if not PATH_LOG:
+        return
+    print("Fetch paths:")
+    carriers = sorted({r["carrier"] for r in PATH_LOG})
+    for carrier in carriers:
+        recs = [r for r in PATH_LOG if r["carrier"] == carrier]
+        http = [r for r in recs if r["path"] == "http"]
+        browser = [r for r in recs if r["path"] == "browser"]
+        reasons = sorted({r["reason"] for r in browser})
+        print(f"  {carrier:<10} http={len(http):<3} browser={len(browser):<3}" + (f" ({'; '.join(reasons)})" if reasons else ""))
@@ -0,0 +1,142 @@
+"""
+Incremental scraping: skip re-parsing detail pages whose prices haven't changed.
+
+Per URL we persist the HTTP validators (ETag / Last-Modified), a fingerprint of
+the page's price section, and the items parsed from it. On the next run:
+
+- the HTTP fast path sends If-None-Match / If-Modified-Since; a 304 reuses the items
+- otherwise the fingerprint of the fetched page is compared; a match reuses the items
+
+Only the parts of the page a carrier's parser actually reads go into the
+fingerprint (label windows from price_extract plus a few elements), so
+unrelated changes like banners or tracking tokens don't cause misses.
+Bump PARSER_VERSION whenever parsing logic changes, or run with --full.
+"""
+import copy
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from html_utils import elements, visible_text
+from price_extract import AU_LABELS, DOCOMO_LABELS, SOFTBANK_LABELS, SOFTBANK_TOKUSAPO_LABELS
+
+STATE_FILE = os.path.join(".cache", "page_state.json")
+PARSER_VERSION = 1
+
+# What each carrier's detail parser reads: label extractors and (tag, class) elements
+FINGERPRINT_SPECS = {
+    "au": {
+        "labels": [AU_LABELS],
+        "elements": [("div", "program-inner"), ("label", "cmp-form-options__label--checked")],
+    },
+    "SoftBank": {
+        "labels": [SOFTBANK_LABELS, SOFTBANK_TOKUSAPO_LABELS],
+        "elements": [
+            (None, "mobile-page-u96-app-model-price-applied-model-price__card--tokusapo-plus"),
+            (None, "mobile-page-u96-app-model-price-item-row"),
+        ],
+    },
+    "docomo": {
+        "labels": [DOCOMO_LABELS],
+        "elements": [("h1", None)],
+    },
+}
+
+
+def fingerprint(carrier, title, html):
+    """sha256 over the title and the price-relevant text of the page, or None if the carrier has no spec."""
+    spec = FINGERPRINT_SPECS.get(carrier)
+    if spec is None:
+        return None
+    h = hashlib.sha256()
+    h.update(f"v{PARSER_VERSION}\0{title}\0".encode("utf-8"))
+    for extractor in spec["labels"]:
+        for window in extractor.windows(html):
+            h.update(visible_text(window).encode("utf-8"))
+            h.update(b"\0")
+    for tag, class_name in spec["elements"]:
+        for el in elements(html, tag, class_name):
+            h.update(visible_text(el).encode("utf-8"))
+            h.update(b"\0")
+    return h.hexdigest()
+
+
+class PageState:
+    def __init__(self, path=STATE_FILE, enabled=True):
+        self.path = path
+        self.enabled = enabled
+        self.entries = {}
+        self.stats = {}  # carrier -> {"hit": n, "miss": n, "not_modified": n}
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("parser_version") == PARSER_VERSION:
+            self.entries = data.get("entries", {})
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"parser_version": PARSER_VERSION, "entries": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def _count(self, carrier, kind):
+        s = self.stats.setdefault(carrier, {"hit": 0, "miss": 0, "not_modified": 0})
+        s[kind] += 1
+
+    def validators(self, url):
+        """Conditional request headers for url, if we can serve a 304 from state."""
+        entry = self.entries.get(url) if self.enabled else None
+        if not entry or not entry.get("items"):
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def reuse(self, carrier, doc):
+        """Previous items for doc.url if the page is unchanged, else None (a miss)."""
+        if not self.enabled:
+            return None
+        entry = self.entries.get(doc.url)
+        if entry is not None:
+            if doc.not_modified:
+                self._count(carrier, "not_modified")
+                return copy.deepcopy(entry["items"])
+            if entry.get("fingerprint") and entry["fingerprint"] == fingerprint(carrier, doc.title, doc.html):
+                self._count(carrier, "hit")
+                return copy.deepcopy(entry["items"])
+        self._count(carrier, "miss")
+        return None
+
+    def remember(self, carrier, doc, items):
+        if not self.enabled or doc.html is None:
+            return
+        fp = fingerprint(carrier, doc.title, doc.html)
+        if fp is None:
+            return
+        self.entries[doc.url] = {
+            "etag": doc.etag,
+            "last_modified": doc.last_modified,
+            "fingerprint": fp,
+            "items": copy.deepcopy(items),
+            "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M"),
+        }
+
+    def print_summary(self):
+        if not self.stats:
+            return
+        print("Incremental cache:")
+        for carrier, s in sorted(self.stats.items()):
+            print(f"  {carrier:<10} hits={s['hit'] + s['not_modified']:<3} (304: {s['not_modified']}) misses={s['miss']}")
+
+
+# Shared by all carriers in a run; main() configures, loads and saves it
+PAGE_STATE = PageState(enabled=False)
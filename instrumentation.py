@@ -0,0 +1,218 @@
+"""
+Per-phase timing and transfer accounting for a scrape run.
+
+Every carrier phase (Rakuten: campaign / stock / fee / monthly, the others:
+list / detail), every navigation and every readiness wait is a phase:
+
+    with phase("stock"):                 # carrier comes from the enclosing phase
+        await goto(page, url_stock)      # a "goto" phase of its own
+
+    @instrumented("detail")
+    async def parse(page, url): ...
+
+A phase records wall time plus what happened while it was open: bytes and
+requests the browser finished (via PhaseMetrics, a run_carrier hook), bytes
+fetched over the HTTP fast path, and Playwright protocol calls (each one a
+round trip to the browser over CDP, e.g. a locator's count() or text_content()).
+Nested phases count into their parents too, so "total" >= "detail" >= "goto".
+Whatever wall time isn't spent in goto/wait phases or protocol calls is Python parsing.
+
+The records (PHASE_LOG) are written as JSON lines next to data.json
+(data.json -> data.metrics.jsonl) and summarized at the end of the run.
+"""
+import contextvars
+import functools
+import json
+import os
+import time
+from contextlib import contextmanager
+
+# One dict per finished phase, see _Phase.record()
+PHASE_LOG = []
+
+# Phases open in the current task, innermost last. asyncio tasks (PagePool jobs) inherit a copy.
+_current = contextvars.ContextVar("instrumentation_phases", default=())
+# Open phases per carrier, for browser events that arrive outside the scraper's task
+_open = {}
+_run_started = time.monotonic()
+_protocol_counter_installed = False
+
+
+class _Phase:
+    def __init__(self, carrier, name, url=None, page=None):
+        self.carrier = carrier
+        self.name = name
+        self.url = url
+        self.page = page
+        self.started = time.monotonic()
+        self.bytes = 0
+        self.requests = 0
+        self.protocol_calls = 0
+        self.ok = True
+
+    def record(self):
+        return {
+            "carrier": self.carrier,
+            "phase": self.name,
+            "url": self.url,
+            "start_ms": int((self.started - _run_started) * 1000),
+            "wall_ms": int((time.monotonic() - self.started) * 1000),
+            "bytes": self.bytes,
+            "requests": self.requests,
+            "protocol_calls": self.protocol_calls,
+            "ok": self.ok,
+        }
+
+
+def start_run():
+    """Forget earlier phases (a long-lived process may scrape more than once)."""
+    global _run_started
+    PHASE_LOG.clear()
+    _open.clear()
+    _run_started = time.monotonic()
+
+
+@contextmanager
+def phase(name, carrier=None, url=None, page=None):
+    """
+    Time a block. `carrier` defaults to the enclosing phase's; `page` limits the
+    browser requests counted to that page (for navigations inside a PagePool).
+    """
+    parents = _current.get()
+    if carrier is None:
+        carrier = parents[-1].carrier if parents else ""
+    current = _Phase(carrier, name, url, page)
+    token = _current.set(parents + (current,))
+    _open.setdefault(carrier, []).append(current)
+    try:
+        yield current
+    except BaseException:
+        current.ok = False
+        raise
+    finally:
+        _current.reset(token)
+        _open[carrier].remove(current)
+        PHASE_LOG.append(current.record())
+
+
+def instrumented(name):
+    """Decorator form of phase() for coroutine functions."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with phase(name):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+async def goto(page, url, wait_until="domcontentloaded", **kwargs):
+    """page.goto() as a "goto" phase."""
+    with phase("goto", url=url, page=page):
+        return await page.goto(url, wait_until=wait_until, **kwargs)
+
+
+def record_transfer(nbytes, requests=1):
+    """Count traffic made outside the browser (the httpx fast path) into the open phases."""
+    for p in _current.get():
+        p.bytes += nbytes
+        p.requests += requests
+
+
+def _install_protocol_counter():
+    """
+    Count Playwright protocol calls into the calling task's open phases.
+
+    Every Page/Locator method ends in Channel.send(), so wrapping it is the one
+    place to see them all. It's a private API: if it moves, calls just aren't counted.
+    """
+    global _protocol_counter_installed
+    if _protocol_counter_installed:
+        return
+    _protocol_counter_installed = True
+    try:
+        from playwright._impl._connection import Channel
+    except ImportError:
+        return
+    send = Channel.send
+
+    @functools.wraps(send)
+    async def counting_send(self, *args, **kwargs):
+        for p in _current.get():
+            p.protocol_calls += 1
+        return await send(self, *args, **kwargs)
+
+    Channel.send = counting_send
+
+
+class PhaseMetrics:
+    """run_carrier hook: attributes the context's finished requests to the carrier's open phases."""
+
+    def __init__(self, carrier):
+        self.carrier = carrier
+
+    async def _on_request_finished(self, request):
+        phases = _open.get(self.carrier)
+        if not phases:
+            return
+        try:
+            page = request.frame.page
+        except Exception:
+            page = None  # e.g. service worker requests
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return
+        size = sizes.get("responseBodySize", 0) + sizes.get("responseHeadersSize", 0)
+        for p in phases:
+            if p.page is None or p.page is page:
+                p.bytes += size
+                p.requests += 1
+
+    async def install(self, context):
+        _install_protocol_counter()
+        context.on("requestfinished", self._on_request_finished)
+
+
+def metrics_path(data_path):
+    return os.path.splitext(data_path)[0] + ".metrics.jsonl"
+
+
+def write_metrics(data_path, run=None):
+    """Write PHASE_LOG as JSON lines (one run per file, `run` is data.json's updated_at)."""
+    path = metrics_path(data_path)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for rec in sorted(PHASE_LOG, key=lambda r: r["start_ms"]):
+            f.write(json.dumps(dict(rec, run=run), ensure_ascii=False) + "\n")
+    os.replace(tmp, path)
+    return path
+
+
+def phase_summary():
+    """Totals per (carrier, phase): {"count", "wall_ms", "max_ms", "bytes", "requests", "protocol_calls", "failed"}"""
+    summary = {}
+    for rec in PHASE_LOG:
+        s = summary.setdefault((rec["carrier"], rec["phase"]), {
+            "count": 0, "wall_ms": 0, "max_ms": 0, "bytes": 0, "requests": 0, "protocol_calls": 0, "failed": 0})
+        s["count"] += 1
+        s["wall_ms"] += rec["wall_ms"]
+        s["max_ms"] = max(s["max_ms"], rec["wall_ms"])
+        s["bytes"] += rec["bytes"]
+        s["requests"] += rec["requests"]
+        s["protocol_calls"] += rec["protocol_calls"]
+        if not rec["ok"]:
+            s["failed"] += 1
+    return summary
+
+
+def print_phase_summary():
+    summary = phase_summary()
+    if not summary:
+        return
+    print("Phases (wall time is summed over concurrent pages):")
+    print(f"  {'carrier':<10} {'phase':<10} {'n':>4} {'wall':>8} {'max':>7} {'KB':>8} {'reqs':>5} {'calls':>6}")
+    for (carrier, name), s in sorted(summary.items()):
+        print(f"  {carrier:<10} {name:<10} {s['count']:>4} {s['wall_ms'] / 1000:>7.1f}s {s['max_ms'] / 1000:>6.1f}s "
+              f"{s['bytes'] / 1024:>8.0f} {s['requests']:>5} {s['protocol_calls']:>6}"
+              + (f"  failed={s['failed']}" if s["failed"] else ""))
@@ -0,0 +1,49 @@
+"""
+Stable identifiers for scraped items.
+
+An item is identified by carrier / model / storage plus a short hash of its URL, e.g.
+    "rakuten/iphone-17-pro-max/256gb~3fa2c1", "docomo/iphone-se-第3世代/最小容量~90be1d"
+The hash is always there, so an item's id doesn't change when another item with
+the same triple appears or goes away (au lists a model under several URLs).
+Items that share the triple *and* the URL (ahamo lists every model on one page)
+are told apart by their order on the page: the second gets "-2", and so on.
+
+    python -m doctest items.py
+"""
+import hashlib
+import re
+
+_SLUG_RE = re.compile(r'[^\w]+', re.UNICODE)
+
+
+def slugify(text):
+    return _SLUG_RE.sub('-', (text or '').strip().lower()).strip('-') or 'unknown'
+
+
+def base_item_id(item):
+    return "/".join(slugify(item.get(k)) for k in ("carrier", "model", "storage"))
+
+
+def url_hash(url):
+    return hashlib.sha1((url or "").encode("utf-8")).hexdigest()[:6]
+
+
+def assign_item_ids(items):
+    """
+    List of ids, parallel to items; every id in the list is distinct.
+
+    >>> page = "https://ahamo.com/products/iphone/"
+    >>> assign_item_ids([
+    ...     {"carrier": "ahamo", "model": "iPhone 17 Pro", "storage": "128GB", "url": page},
+    ...     {"carrier": "ahamo", "model": "iPhone 17 Pro", "storage": "128GB", "url": page},
+    ...     {"carrier": "ahamo", "model": "iPhone 17", "storage": "128GB", "url": page},
+    ... ])
+    ['ahamo/iphone-17-pro/128gb~fe9c6f', 'ahamo/iphone-17-pro/128gb~fe9c6f-2', 'ahamo/iphone-17/128gb~fe9c6f']
+    """
+    ids = []
+    seen = {}
+    for item in items:
+        iid = base_item_id(item) + "~" + url_hash(item.get("url"))
+        seen[iid] = seen.get(iid, 0) + 1
+        ids.append(iid if seen[iid] == 1 else f"{iid}-{seen[iid]}")
+    return ids
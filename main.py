@@ -1,264 +1,335 @@
 
+import argparse
 import asyncio
 from playwright.async_api import async_playwright
 import json
+import os
+import time
+import traceback
 from datetime import datetime
+from browser_cache import CarrierCache, print_cache_summary
+from history import connect as connect_history, record_run
+from incremental import PAGE_STATE
+from instrumentation import PhaseMetrics, goto, phase, print_phase_summary, start_run, write_metrics
+from page_pool import PagePool
+from readiness import wait_ready, print_wait_summary
+from dom_extract import extract
+from resource_filter import ResourceFilter, load_size_cache, save_size_cache, print_filter_summary
+from html_utils import elements, first_text, strip_tags
+from http_fetch import fetch_page, configure as configure_http, close_client, print_fetch_summary
+from price_extract import (
+    AU_LABELS, DOCOMO_LABELS, PERIOD_RE, PERIOD_START_RE, RAKUTEN_INSTALLMENT_48_RE, RAKUTEN_MONTHLY_RE,
+    RAKUTEN_POINTS_RE, SOFTBANK_LABELS, SOFTBANK_NO_PAYMENT_25_48_RE, SOFTBANK_TOKUSAPO_LABELS, STORAGE_RE,
+    UQ_DISCOUNT_LABELS, UQ_STORAGE_PRICE_LOOSE_RE, UQ_STORAGE_PRICE_RE, YEN_RE, parse_amount,
+)
+from view_index import write_view_index
+from wire_format import write_compact, print_size_summary
+from shards import write_shards
+from changes import load_previous, write_changes, summary as changes_summary
+from snapshots import DEFAULT_SNAPSHOT_DIR, SnapshotStore, SnapshotRecorder, SnapshotReplayer
+from standin import StandInRouter, origin_map
 import re
 
 DATA_FILE = "docs/data.json"
 
+# --- Rakuten table schemas (one page.evaluate each, see dom_extract.py) ---
+RAKUTEN_STOCK_SCHEMA = {
+    "selector": ".product-iphone-stock-Layout_Product-name",
+    "all": True,
+    "fields": {
+        "name": {},
+        "area": {
+            "selector": "div.product-iphone-stock-Layout_Product-area",
+            "sibling": True,
+            "fields": {
+                "colors": {
+                    "selector": ".color-details",
+                    "all": True,
+                    "fields": {
+                        "color": {"selector": ".c-Heading_Lv4, h4"},
+                        "rows": {
+                            "selector": "table tbody tr",
+                            "all": True,
+                            "fields": {"cells": {"selector": "td", "all": True}},
+                        },
+                    },
+                },
+            },
+        },
+    },
+}
+
+RAKUTEN_FEE_SCHEMA = {
+    "selector": ".product-iphone-Fee_Media",
+    "all": True,
+    "fields": {
+        "name": {"selector": "h3, .product-name, h2"},
+        # Like the old section.locator("table"): headers and rows of every table, in order
+        "tables": {
+            "selector": "table",
+            "all": True,
+            "fields": {
+                "headers": {"selector": "thead th", "all": True},
+                "rows": {
+                    "selector": "tbody tr",
+                    "all": True,
+                    "fields": {
+                        "th": {"selector": "th"},
+                        "tds": {"selector": "td", "all": True},
+                    },
+                },
+            },
+        },
+    },
+}
+
+
+def parse_rakuten_stock(products):
+    """RAKUTEN_STOCK_SCHEMA result -> {model: {storage: [variant, ...]}}"""
+    stock_map = {}
+    for product in products:
+        model_name = (product["name"] or "").strip()
+
+        area = product["area"]
+        if area is None: continue
+
+        if model_name not in stock_map: stock_map[model_name] = {}
+
+        for cd in area["colors"]:
+            if cd["color"] is None: continue
+            color_name = cd["color"].strip()
+
+            for row in cd["rows"]:
+                cols = row["cells"]
+                if len(cols) < 2: continue
+
+                cap_text = cols[0]
+                status_text = cols[1]
+
+                storage_match = STORAGE_RE.search(cap_text)
+                if not storage_match: continue
+
+                storage = storage_match.group(0)
+                is_in_stock = "在庫あり" in status_text or "In stock" in status_text
+
+                if storage not in stock_map[model_name]:
+                    stock_map[model_name][storage] = []
+
+                stock_map[model_name][storage].append({
+                    "color": color_name,
+                    "stock_text": status_text.strip()[:20],
+                    "stock_available": is_in_stock
+                })
+        print(f"  Parsed stock for {model_name}: {len(stock_map[model_name])} capacities")
+    return stock_map
+
+
+def parse_rakuten_fee(sections, campaign_map, stock_map, url):
+    """RAKUTEN_FEE_SCHEMA result -> Rakuten items (pure Python, no page access)"""
+    items = []
+
+    for i, section in enumerate(sections):
+        if section["name"] is None:
+            print(f"  Section {i}: No header")
+            continue
+
+        model_name = section["name"].strip()
+
+        if "iPhone" not in model_name:
+            continue
+
+        print(f"  Processing: {model_name}")
+
+        tables = section["tables"]
+        if not tables:
+            print("    No table")
+            continue
+
+        headers = [th for table in tables for th in table["headers"]]
+        storages = []
+        for txt in headers:
+            txt = txt.strip()
+            if "GB" in txt or "TB" in txt:
+                storages.append(txt)
+
+        if not storages:
+            print(f"    No storages found. Headers: {len(headers)}")
+            continue
+
+        price_map = {s: {"gross": 0, "program": 0, "rent": 0} for s in storages}
+
+        for row in (row for table in tables for row in table["rows"]):
+            if row["th"] is None: continue
+            header_text = row["th"].strip()
+
+            tds = row["tds"]
+            if len(tds) < len(storages): continue
+
+            # Logic A: Gross
+            if any(k in header_text for k in ["楽天モバイル", "一括価格", "現金販売価格"]):
+                for idx, txt in enumerate(tds):
+                    if idx >= len(storages): break
+                    gross = parse_amount(txt)
+                    if gross > 0:
+                        price_map[storages[idx]]["gross"] = gross
+                    if "48回" in txt:
+                         m_inst = RAKUTEN_INSTALLMENT_48_RE.search(txt)
+                         if m_inst:
+                             installment = int(m_inst.group(1).replace(',', ''))
+                             price_map[storages[idx]]["program_calc"] = installment * 24
+
+            # Logic B: Program Row
+            elif any(k in header_text for k in ["買い替え超トクプログラム", "24回分"]):
+                for idx, txt in enumerate(tds):
+                    if idx >= len(storages): break
+                    val = parse_amount(txt)
+                    if val > 0: price_map[storages[idx]]["program"] = val
+
+            # Logic C: Rent Row (Priority)
+            elif any(k in header_text for k in ["実質", "キャンペーン"]):
+                for idx, txt in enumerate(tds):
+                    if idx >= len(storages): break
+                    val = parse_amount(txt)
+                    if val > 0: price_map[storages[idx]]["rent"] = val
+
+        added_count = 0
+        for s in storages:
+            pm = price_map[s]
+            p_gross = pm["gross"]
+            if p_gross == 0: continue
+
+            p_program = 0
+            if pm["program"] > 0: p_program = pm["program"]
+            elif "program_calc" in pm and pm["program_calc"] > 0: p_program = pm["program_calc"]
+            else: p_program = int(p_gross / 2)
+            
+            p_effective_rent = pm["rent"] if pm["rent"] > 0 else p_program
+            p_effective_buyout = p_gross
+            
+            points_awarded = 0
+            if model_name in campaign_map:
+                points_awarded = campaign_map[model_name]
+            elif "16e" in model_name and "iPhone 16e" in campaign_map:
+                    points_awarded = campaign_map["iPhone 16e"]
+
+            if "16e" in model_name and points_awarded < 50000:
+                 points_awarded = 52352
+
+            if pm["rent"] == 0:
+                 p_effective_rent = p_effective_rent - points_awarded
+            
+            if p_effective_rent < 0: p_effective_rent = 0
+            
+            program_exemption = p_gross - p_program
+            if program_exemption < 0: program_exemption = 0
+            
+            item_variants = []
+            if model_name in stock_map and s in stock_map[model_name]:
+                    item_variants = stock_map[model_name][s]
+
+            items.append({
+                "carrier": "Rakuten",
+                "model": model_name,
+                "storage": s,
+                "price_gross": p_gross,
+                "price_effective_rent": p_effective_rent,
+                "price_effective_buyout": p_effective_buyout - points_awarded,
+                "url": url,
+                "discount_official": 0,
+                "points_awarded": points_awarded,
+                "program_exemption": program_exemption,
+                "monthly_payment": p_effective_rent // 24 if p_effective_rent > 0 else p_gross // 48,
+                "monthly_payment_phases": [],
+                "variants": item_variants
+            })
+            added_count += 1
+        
+        if added_count == 0:
+            print(f"    Warning: No items added for {model_name}. Map: {price_map}")
+
+    return items
+
+
 async def scrape_rakuten(page):
     print("Scraping Rakuten Mobile...")
     items = []
     
     # --- 1. Scrape Campaign Points (Phase 5) ---
     campaign_map = {} 
-    try:
-        camp_url = "https://network.mobile.rakuten.co.jp/product/iphone/"
-        await page.goto(camp_url, wait_until="domcontentloaded")
-        await page.wait_for_timeout(3000)
+    with phase("campaign"):
+        try:
+            camp_url = "https://network.mobile.rakuten.co.jp/product/iphone/"
+            await goto(page, camp_url)
+            await wait_ready(page, selector="a[href*='campaign']", label="rakuten:campaign")
         
-        links = await page.locator("a[href*='campaign']").all()
-        print(f"Rakuten Campaign: Found {len(links)} links")
+            links = await page.locator("a[href*='campaign']").all()
+            print(f"Rakuten Campaign: Found {len(links)} links")
         
-        visited_urls = set()
-        for link in links:
-            href = await link.get_attribute("href")
-            if href and "point" in href and "iphone" in href:
-                if not href.startswith("http"):
-                    href = "https://network.mobile.rakuten.co.jp" + href
+            visited_urls = set()
+            for link in links:
+                href = await link.get_attribute("href")
+                if href and "point" in href and "iphone" in href:
+                    if not href.startswith("http"):
+                        href = "https://network.mobile.rakuten.co.jp" + href
                 
-                if href in visited_urls: continue
-                visited_urls.add(href)
+                    if href in visited_urls: continue
+                    visited_urls.add(href)
                 
-                try:
-                    target_model = None
-                    if "iphone-17" in href: target_model = "iPhone 17"
-                    elif "iphone-16e" in href: target_model = "iPhone 16e"
-                    elif "iphone-16" in href: target_model = "iPhone 16"
-                    else: continue
+                    try:
+                        target_model = None
+                        if "iphone-17" in href: target_model = "iPhone 17"
+                        elif "iphone-16e" in href: target_model = "iPhone 16e"
+                        elif "iphone-16" in href: target_model = "iPhone 16"
+                        else: continue
                     
-                    if campaign_map.get(target_model, 0) > 40000: continue
+                        if campaign_map.get(target_model, 0) > 40000: continue
                     
-                    await page.goto(href, wait_until="domcontentloaded")
-                    content = await page.content()
-                    matches = re.findall(r'([\d,]{4,})\s*ポイント', content)
-                    if matches:
-                        nums = [int(m.replace(',', '')) for m in matches]
-                        max_pts = max(nums)
-                        if max_pts > campaign_map.get(target_model, 0):
-                            campaign_map[target_model] = max_pts
-                            print(f"  Campaign: {target_model} -> {max_pts} pts")
-                except Exception as e:
-                    print(f"  Camp Error {href}: {e}")
-    except Exception as e:
-        print(f"Error scraping campaigns: {e}")
+                        await goto(page, href)
+                        content = await page.content()
+                        matches = RAKUTEN_POINTS_RE.findall(content)
+                        if matches:
+                            nums = [int(m.replace(',', '')) for m in matches]
+                            max_pts = max(nums)
+                            if max_pts > campaign_map.get(target_model, 0):
+                                campaign_map[target_model] = max_pts
+                                print(f"  Campaign: {target_model} -> {max_pts} pts")
+                    except Exception as e:
+                        print(f"  Camp Error {href}: {e}")
+        except Exception as e:
+            print(f"Error scraping campaigns: {e}")
 
     # --- 2. Scrape Stock (Phase 7) ---
     stock_map = {}
-    try:
-        url_stock = "https://network.mobile.rakuten.co.jp/product/iphone/stock/"
-        await page.goto(url_stock, wait_until="domcontentloaded")
-        await page.wait_for_timeout(3000)
-        
-        product_headers = await page.locator(".product-iphone-stock-Layout_Product-name").all()
-        print(f"Rakuten Stock: Found {len(product_headers)} products")
+    with phase("stock"):
+        try:
+            url_stock = "https://network.mobile.rakuten.co.jp/product/iphone/stock/"
+            await goto(page, url_stock)
+            await wait_ready(page, selector=".product-iphone-stock-Layout_Product-name", label="rakuten:stock")
         
-        for header in product_headers:
-            model_name = await header.text_content()
-            model_name = model_name.strip()
-            
-            area = header.locator("xpath=following-sibling::div[contains(@class, 'product-iphone-stock-Layout_Product-area')]").first
-            if await area.count() == 0: continue
-                
-            if model_name not in stock_map: stock_map[model_name] = {}
-            
-            color_details = await area.locator(".color-details").all()
-            for cd in color_details:
-                color_header = cd.locator(".c-Heading_Lv4, h4")
-                if await color_header.count() == 0: continue
-                
-                color_text = await color_header.first.text_content()
-                color_name = color_text.strip()
-                
-                table = cd.locator("table")
-                if await table.count() == 0: continue
-                
-                rows = await table.locator("tbody tr").all()
-                for row in rows:
-                    cols = await row.locator("td").all()
-                    if len(cols) < 2: continue
-                    
-                    cap_text = await cols[0].text_content()
-                    status_text = await cols[1].text_content()
-                    
-                    storage_match = re.search(r'(\d+)(GB|TB)', cap_text)
-                    if not storage_match: continue
-                    
-                    storage = storage_match.group(0)
-                    is_in_stock = "在庫あり" in status_text or "In stock" in status_text
-                    
-                    if storage not in stock_map[model_name]: 
-                        stock_map[model_name][storage] = []
-                    
-                    stock_map[model_name][storage].append({
-                        "color": color_name,
-                        "stock_text": status_text.strip()[:20],
-                        "stock_available": is_in_stock
-                    })
-            print(f"  Parsed stock for {model_name}: {len(stock_map[model_name])} capacities")
-    except Exception as e:
-        print(f"Error scraping Rakuten Stock: {e}")
+            products = await extract(page, RAKUTEN_STOCK_SCHEMA)
+            print(f"Rakuten Stock: Found {len(products)} products")
+            stock_map = parse_rakuten_stock(products)
+        except Exception as e:
+            print(f"Error scraping Rakuten Stock: {e}")
 
     # --- 3. Scrape Fees (New Phase 11 Logic) ---
-    try:
-        url = "https://network.mobile.rakuten.co.jp/product/iphone/fee/"
-        await page.goto(url, wait_until="domcontentloaded")
-        await page.wait_for_timeout(3000)
-
-        sections = await page.locator(".product-iphone-Fee_Media").all()
-        if len(sections) == 0:
-            sections = await page.locator("section").all()
-
-        print(f"Rakuten Fee: Found {len(sections)} sections")
-        
-        # Define helper here
-        def extract_price(text):
-            m = re.search(r'([\d,]+)', text)
-            if m: return int(m.group(1).replace(',', ''))
-            return 0
-
-        for i, section in enumerate(sections):
-            name_el = section.locator("h3, .product-name, h2")
-            if await name_el.count() == 0:
-                print(f"  Section {i}: No header")
-                continue
-            
-            raw_model = await name_el.first.text_content()
-            model_name = raw_model.strip()
-            
-            if "iPhone" not in model_name:
-                # print(f"  Skip non-iPhone: {model_name}")
-                continue
-            
-            print(f"  Processing: {model_name}")
-            
-            table = section.locator("table")
-            if await table.count() == 0:
-                print("    No table")
-                continue
-            
-            headers = await table.locator("thead th").all()
-            storages = []
-            for th in headers:
-                txt = await th.text_content()
-                txt = txt.strip()
-                if "GB" in txt or "TB" in txt:
-                    storages.append(txt)
-            
-            if not storages:
-                print(f"    No storages found. Headers: {len(headers)}")
-                continue
+    with phase("fee"):
+        try:
+            url = "https://network.mobile.rakuten.co.jp/product/iphone/fee/"
+            await goto(page, url)
+            await wait_ready(page, selector=".product-iphone-Fee_Media table", label="rakuten:fee")
 
-            rows = await table.locator("tbody tr").all()
-            price_map = {s: {"gross": 0, "program": 0, "rent": 0} for s in storages}
-            
-            for row in rows:
-                th = row.locator("th")
-                if await th.count() == 0: continue
-                header_text = await th.first.text_content()
-                header_text = header_text.strip()
-                
-                tds = await row.locator("td").all()
-                if len(tds) < len(storages): continue
-                
-                # Logic A: Gross
-                if any(k in header_text for k in ["楽天モバイル", "一括価格", "現金販売価格"]):
-                    for idx, td in enumerate(tds):
-                        if idx >= len(storages): break
-                        txt = await td.text_content()
-                        gross = extract_price(txt)
-                        if gross > 0:
-                            price_map[storages[idx]]["gross"] = gross
-                        if "48回" in txt:
-                             m_inst = re.search(r'48回.*?([\d,]+)', txt)
-                             if m_inst:
-                                 installment = int(m_inst.group(1).replace(',', ''))
-                                 price_map[storages[idx]]["program_calc"] = installment * 24
-
-                # Logic B: Program Row
-                elif any(k in header_text for k in ["買い替え超トクプログラム", "24回分"]):
-                    for idx, td in enumerate(tds):
-                        if idx >= len(storages): break
-                        val = extract_price(await td.text_content())
-                        if val > 0: price_map[storages[idx]]["program"] = val
-
-                # Logic C: Rent Row (Priority)
-                elif any(k in header_text for k in ["実質", "キャンペーン"]):
-                    for idx, td in enumerate(tds):
-                        if idx >= len(storages): break
-                        val = extract_price(await td.text_content())
-                        if val > 0: price_map[storages[idx]]["rent"] = val
-            
-            added_count = 0
-            for s in storages:
-                pm = price_map[s]
-                p_gross = pm["gross"]
-                if p_gross == 0: continue
+            sections = await extract(page, RAKUTEN_FEE_SCHEMA)
+            if len(sections) == 0:
+                sections = await extract(page, dict(RAKUTEN_FEE_SCHEMA, selector="section"))
 
-                p_program = 0
-                if pm["program"] > 0: p_program = pm["program"]
-                elif "program_calc" in pm and pm["program_calc"] > 0: p_program = pm["program_calc"]
-                else: p_program = int(p_gross / 2)
-                
-                p_effective_rent = pm["rent"] if pm["rent"] > 0 else p_program
-                p_effective_buyout = p_gross
-                
-                points_awarded = 0
-                if model_name in campaign_map:
-                    points_awarded = campaign_map[model_name]
-                elif "16e" in model_name and "iPhone 16e" in campaign_map:
-                        points_awarded = campaign_map["iPhone 16e"]
-
-                if "16e" in model_name and points_awarded < 50000:
-                     points_awarded = 52352
-
-                if pm["rent"] == 0:
-                     p_effective_rent = p_effective_rent - points_awarded
-                
-                if p_effective_rent < 0: p_effective_rent = 0
-                
-                program_exemption = p_gross - p_program
-                if program_exemption < 0: program_exemption = 0
-                
-                item_variants = []
-                if model_name in stock_map and s in stock_map[model_name]:
-                        item_variants = stock_map[model_name][s]
-
-                items.append({
-                    "carrier": "Rakuten",
-                    "model": model_name,
-                    "storage": s,
-                    "price_gross": p_gross,
-                    "price_effective_rent": p_effective_rent,
-                    "price_effective_buyout": p_effective_buyout - points_awarded,
-                    "url": url,
-                    "discount_official": 0,
-                    "points_awarded": points_awarded,
-                    "program_exemption": program_exemption,
-                    "monthly_payment": p_effective_rent // 24 if p_effective_rent > 0 else p_gross // 48,
-                    "monthly_payment_phases": [],
-                    "variants": item_variants
-                })
-                added_count += 1
-            
-            if added_count == 0:
-                print(f"    Warning: No items added for {model_name}. Map: {price_map}")
+            print(f"Rakuten Fee: Found {len(sections)} sections")
+            items.extend(parse_rakuten_fee(sections, campaign_map, stock_map, url))
 
-    except Exception as e:
-        print(f"Error scraping Rakuten: {e}")
-        import traceback
-        traceback.print_exc()
+        except Exception as e:
+            print(f"Error scraping Rakuten: {e}")
+            import traceback
+            traceback.print_exc()
 
     # --- 4. Scrape Monthly Prices from Individual Product Pages ---
     print("Rakuten: Fetching monthly prices from individual product pages...")
@@ -274,31 +345,38 @@ async def scrape_rakuten(page):
         "iPhone Air": "https://network.mobile.rakuten.co.jp/product/iphone/iphone-air/",
     }
     
+    url_to_model = {u: m for m, u in product_urls.items()}
+
+    async def parse_monthly_page(page, product_url):
+        model_name = url_to_model[product_url]
+        await goto(page, product_url, wait_until="networkidle")
+        await wait_ready(page, selector="text=円/月", label="rakuten:monthly")
+
+        page_text = await page.inner_text("body")
+
+        # Pattern: X円/月 or X,XXX円/月 (monthly price display, including commas)
+        monthly_matches = RAKUTEN_MONTHLY_RE.findall(page_text)
+        if monthly_matches:
+            # Parse prices, removing commas
+            prices = [int(p.replace(',', '')) for p in monthly_matches]
+            # Filter: Device monthly payments are typically >= 1 yen for promos, but plan prices like 1,078円 should be ignored
+            # Real device promotional prices are usually shown as 1円, 78円 etc (very low), or actual device payments (3000+ yen)
+            # To distinguish: if we find a price <= 100 yen, it's likely a device promo price
+            # Otherwise, filter out prices that look like plan prices (1000-2000 range)
+            device_prices = [p for p in prices if p <= 100 or p >= 2000]
+            if device_prices:
+                min_price = min(device_prices)
+                print(f"  {model_name}: {min_price}円/月 (from page)")
+                return model_name, min_price
+        return None
+
     monthly_price_map = {}  # model -> monthly_price
-    for model_name, product_url in product_urls.items():
-        try:
-            await page.goto(product_url, wait_until="networkidle")
-            await page.wait_for_timeout(3000)
-            
-            page_text = await page.inner_text("body")
-            
-            # Pattern: X円/月 or X,XXX円/月 (monthly price display, including commas)
-            monthly_matches = re.findall(r'([\d,]+)円/月', page_text)
-            if monthly_matches:
-                # Parse prices, removing commas
-                prices = [int(p.replace(',', '')) for p in monthly_matches]
-                # Filter: Device monthly payments are typically >= 1 yen for promos, but plan prices like 1,078円 should be ignored
-                # Real device promotional prices are usually shown as 1円, 78円 etc (very low), or actual device payments (3000+ yen)
-                # To distinguish: if we find a price <= 100 yen, it's likely a device promo price
-                # Otherwise, filter out prices that look like plan prices (1000-2000 range)
-                device_prices = [p for p in prices if p <= 100 or p >= 2000]
-                if device_prices:
-                    min_price = min(device_prices)
-                    monthly_price_map[model_name] = min_price
-                    print(f"  {model_name}: {min_price}円/月 (from page)")
-        except Exception as e:
-            print(f"  Error fetching {model_name}: {e}")
-    
+    with phase("monthly"):
+        async with PagePool(page.context) as pool:
+            for result in await pool.map(list(product_urls.values()), parse_monthly_page):
+                if result:
+                    monthly_price_map[result[0]] = result[1]
+
     # Update items with scraped monthly prices
     for item in items:
         model = item["model"]
@@ -318,110 +396,103 @@ async def scrape_ahamo(page):
     print("Scraping ahamo...")
     items = []
     try:
-        url = "https://ahamo.com/products/iphone/"
-        await page.goto(url, wait_until="domcontentloaded")
-        await page.wait_for_timeout(5000)
+        with phase("list"):
+            url = "https://ahamo.com/products/iphone/"
+            await goto(page, url)
+            await wait_ready(page, selector="a.a-product-thumbnail-link", label="ahamo:list")
 
-        links = await page.locator("a.a-product-thumbnail-link").all()
-        print(f"ahamo: Found {len(links)} links")
+            links = await page.locator("a.a-product-thumbnail-link").all()
+            print(f"ahamo: Found {len(links)} links")
         
-        for i, link in enumerate(links):
-            # Name
-            name_el = link.locator(".a-product-thumbnail__name")
-            if await name_el.count() == 0:
-                name_el = link.locator(".a-product-thumbnail-link__name")
+            for i, link in enumerate(links):
+                # Name
+                name_el = link.locator(".a-product-thumbnail__name")
+                if await name_el.count() == 0:
+                    name_el = link.locator(".a-product-thumbnail-link__name")
             
-            if await name_el.count() == 0:
-                 continue
+                if await name_el.count() == 0:
+                     continue
                  
-            model_name = await name_el.first.text_content()
-            model_name = model_name.strip()
+                model_name = await name_el.first.text_content()
+                model_name = model_name.strip()
             
-            # --- Price Extraction V2 (Gross vs Effective) ---
+                # --- Price Extraction V2 (Gross vs Effective) ---
             
-            # 1. Gross Price (定価)
-            # Located in .a-product-thumbnail__price (e.g. 133,265)
-            price_gross = 0
-            gross_el = link.locator(".a-product-thumbnail__price .a-price-amount").first
-            if await gross_el.count() > 0:
-                raw = await gross_el.text_content()
-                m = re.search(r'([\d,]+)', raw)
-                if m: price_gross = int(m.group(1).replace(',', ''))
-
-            # 2. Effective Rent (実質負担)
-            # Located in Kaedoki section "Customer Burden"
-            price_effective_rent = 0
-            rent_el = link.locator(".a-product-thumbnail-link__kaedoki-campaign-content-price-item-price .a-price-amount").first
-            if await rent_el.count() > 0:
-                raw = await rent_el.text_content()
-                m = re.search(r'([\d,]+)', raw)
-                if m: price_effective_rent = int(m.group(1).replace(',', ''))
+                # 1. Gross Price (定価)
+                # Located in .a-product-thumbnail__price (e.g. 133,265)
+                price_gross = 0
+                gross_el = link.locator(".a-product-thumbnail__price .a-price-amount").first
+                if await gross_el.count() > 0:
+                    price_gross = parse_amount(await gross_el.text_content())
+
+                # 2. Effective Rent (実質負担)
+                # Located in Kaedoki section "Customer Burden"
+                price_effective_rent = 0
+                rent_el = link.locator(".a-product-thumbnail-link__kaedoki-campaign-content-price-item-price .a-price-amount").first
+                if await rent_el.count() > 0:
+                    price_effective_rent = parse_amount(await rent_el.text_content())
             
-            # 3. Official Discount (割引)
-            discount_official = 0
-            disc_el = link.locator(".a-product-thumbnail-link__kaedoki-campaign-content-price-item-discount .a-price-amount").first
-            if await disc_el.count() > 0:
-                raw = await disc_el.text_content()
-                m = re.search(r'([\d,]+)', raw)
-                if m: discount_official = int(m.group(1).replace(',', ''))
-
-            # Fallback for old/simple cards
-            if price_gross == 0:
-                 fallback = link.locator(".a-product-thumbnail-link__price-number")
-                 if await fallback.count() > 0:
-                     raw = await fallback.first.text_content()
-                     m = re.search(r'([\d,]+)', raw)
-                     if m: price_gross = int(m.group(1).replace(',', ''))
+                # 3. Official Discount (割引)
+                discount_official = 0
+                disc_el = link.locator(".a-product-thumbnail-link__kaedoki-campaign-content-price-item-discount .a-price-amount").first
+                if await disc_el.count() > 0:
+                    discount_official = parse_amount(await disc_el.text_content())
+
+                # Fallback for old/simple cards
+                if price_gross == 0:
+                     fallback = link.locator(".a-product-thumbnail-link__price-number")
+                     if await fallback.count() > 0:
+                         price_gross = parse_amount(await fallback.first.text_content())
             
-            # 4. Calculation
-            # ahamo d-point campaign?
-            # User request: "points_awarded"
-            # We can try to extract "d-point" from "Benefit" section if we want advanced logic.
-            # For now, initialize to 0 or check if previously extracted text has "point".
-            points_awarded = 0
+                # 4. Calculation
+                # ahamo d-point campaign?
+                # User request: "points_awarded"
+                # We can try to extract "d-point" from "Benefit" section if we want advanced logic.
+                # For now, initialize to 0 or check if previously extracted text has "point".
+                points_awarded = 0
             
-            program_exemption = 0
-            price_effective_buyout = price_gross - discount_official - points_awarded
+                program_exemption = 0
+                price_effective_buyout = price_gross - discount_official - points_awarded
             
-            if price_effective_rent > 0 and price_gross > 0:
-                # Exemption = Gross - Discount - Rent - Points?
-                # Usually Rent is calculated BEFORE points in ahamo display, OR points are separate.
-                # Let's assume Rent displayed is "after program", but points are separate cashback.
-                # So Effective Rent (User Def) = Displayed Rent - Points.
-                program_exemption = price_gross - discount_official - price_effective_rent
-                if program_exemption < 0: program_exemption = 0
-                
-                # Apply points to effective rent
-                price_effective_rent = price_effective_rent - points_awarded
-
-            if price_effective_rent == 0 and price_effective_buyout > 0:
-                price_effective_rent = price_effective_buyout
-
-            # Storage (Inferred)
-            storage = "Wait for detail" 
-            if "15" in model_name or "16" in model_name or "17" in model_name:
-                storage = "128GB"
-            elif "SE" in model_name:
-                storage = "64GB"
-            else:
-                storage = "Unknown"
-
-            if price_gross > 0:
-                 items.append({
-                    "carrier": "ahamo",
-                    "model": model_name,
-                    "storage": storage,
-                    "price_gross": price_gross,               
-                    "discount_official": discount_official,   
-                    "program_exemption": program_exemption, 
-                    "points_awarded": points_awarded,
-                    "price_effective_rent": price_effective_rent,      
-                    "price_effective_buyout": price_effective_buyout,  
-                    "monthly_payment": price_effective_rent // 24 if price_effective_rent > 0 else price_gross // 48,
-                    "monthly_payment_phases": [],
-                    "variants": [],
-                    "url": url
-                })
+                if price_effective_rent > 0 and price_gross > 0:
+                    # Exemption = Gross - Discount - Rent - Points?
+                    # Usually Rent is calculated BEFORE points in ahamo display, OR points are separate.
+                    # Let's assume Rent displayed is "after program", but points are separate cashback.
+                    # So Effective Rent (User Def) = Displayed Rent - Points.
+                    program_exemption = price_gross - discount_official - price_effective_rent
+                    if program_exemption < 0: program_exemption = 0
+                
+                    # Apply points to effective rent
+                    price_effective_rent = price_effective_rent - points_awarded
+
+                if price_effective_rent == 0 and price_effective_buyout > 0:
+                    price_effective_rent = price_effective_buyout
+
+                # Storage (Inferred)
+                storage = "Wait for detail" 
+                if "15" in model_name or "16" in model_name or "17" in model_name:
+                    storage = "128GB"
+                elif "SE" in model_name:
+                    storage = "64GB"
+                else:
+                    storage = "Unknown"
+
+                if price_gross > 0:
+                     items.append({
+                        "carrier": "ahamo",
+                        "model": model_name,
+                        "storage": storage,
+                        "price_gross": price_gross,               
+                        "discount_official": discount_official,   
+                        "program_exemption": program_exemption, 
+                        "points_awarded": points_awarded,
+                        "price_effective_rent": price_effective_rent,      
+                        "price_effective_buyout": price_effective_buyout,  
+                        "monthly_payment": price_effective_rent // 24 if price_effective_rent > 0 else price_gross // 48,
+                        "monthly_payment_phases": [],
+                        "variants": [],
+                        "url": url
+                    })
 
     except Exception as e:
         print(f"Error scraping ahamo: {e}")
@@ -435,26 +506,28 @@ async def scrape_uq(page):
     print("Scraping UQ mobile...")
     items = []
     try:
-        url = "https://www.uqwimax.jp/mobile/iphone/"
-        await page.goto(url, wait_until="domcontentloaded")
-        await page.wait_for_timeout(3000)
-
-        product_links = await page.locator("a[href*='/mobile/iphone/']").all()
-        hrefs = set()
-        for link in product_links:
-            href = await link.get_attribute("href")
-            if href and "iphone" in href and href.count('/') > 3:
-                if not href.startswith("http"):
-                    href = "https://www.uqwimax.jp" + href
-                hrefs.add(href)
+        with phase("list"):
+            url = "https://www.uqwimax.jp/mobile/iphone/"
+            await goto(page, url)
+            await wait_ready(page, selector="a[href*='/mobile/iphone/']", label="uq:list")
+
+            product_links = await page.locator("a[href*='/mobile/iphone/']").all()
+            hrefs = set()
+            for link in product_links:
+                href = await link.get_attribute("href")
+                if href and "iphone" in href and href.count('/') > 3:
+                    if not href.startswith("http"):
+                        href = "https://www.uqwimax.jp" + href
+                    hrefs.add(href)
         
-        model_urls = [h for h in hrefs if re.search(r'/iphone/\d+|se', h)]
-        print(f"UQ: Found model URLs: {len(model_urls)}")
+            model_urls = [h for h in hrefs if re.search(r'/iphone/\d+|se', h)]
+            print(f"UQ: Found model URLs: {len(model_urls)}")
 
-        for model_url in model_urls:
+        async def parse_model_page(page, model_url):
+            page_items = []
             try:
-                await page.goto(model_url, wait_until="domcontentloaded")
-                await page.wait_for_timeout(2000)
+                await goto(page, model_url)
+                await wait_ready(page, selector="text=機種代金", label="uq:detail")
                 
                 model_name = ""
                 potential_headers = ["h1", ".product-name", "title"]
@@ -471,15 +544,10 @@ async def scrape_uq(page):
                 
                 content = await page.content()
                 
-                matches = re.finditer(r'(64|128|256|512|1T)GB.*?機種代金\s*[:：]?\s*([\d,]+)円', content, re.DOTALL)
+                matches = UQ_STORAGE_PRICE_RE.finditer(content)
                 
-                discount_official = 0
-                disc_match = re.search(r'最大割引額.*?(-?[\d,]+)円', content)
-                if disc_match:
-                    d_str = disc_match.group(1).replace(',', '').replace('-', '')
-                    discount_official = int(d_str) 
-                else: 
-                     discount_official = 22000
+                # Shown as a negative amount ("-22,000円")
+                discount_official = abs(UQ_DISCOUNT_LABELS.extract(content).get("discount", -22000))
                 
                 # UQ Points? (au PAY)
                 points_awarded = 0
@@ -497,8 +565,8 @@ async def scrape_uq(page):
                     price_effective_rent = price_effective_buyout - program_exemption
                     if price_effective_rent < 0: price_effective_rent = 0
 
-                    if not any(i['model'] == model_name and i['storage'] == storage for i in items):
-                         items.append({
+                    if not any(i['model'] == model_name and i['storage'] == storage for i in page_items):
+                         page_items.append({
                             "carrier": "UQ mobile",
                             "model": model_name,
                             "storage": storage,
@@ -516,7 +584,7 @@ async def scrape_uq(page):
                          found = True
                 
                 if not found:
-                    matches_v2 = re.finditer(r'(64|128|256|512|1T)GB.*?([\d,]{4,})円', content, re.DOTALL)
+                    matches_v2 = UQ_STORAGE_PRICE_LOOSE_RE.finditer(content)
                     for m in matches_v2:
                         storage = m.group(1) + "GB"
                         if "T" in m.group(1): storage = "1TB"
@@ -526,8 +594,8 @@ async def scrape_uq(page):
                         price_effective_buyout = price_gross - discount_official - points_awarded
                         price_effective_rent = price_effective_buyout
                         
-                        if not any(i['model'] == model_name and i['storage'] == storage for i in items):
-                             items.append({
+                        if not any(i['model'] == model_name and i['storage'] == storage for i in page_items):
+                             page_items.append({
                                 "carrier": "UQ mobile",
                                 "model": model_name,
                                 "storage": storage,
@@ -545,6 +613,15 @@ async def scrape_uq(page):
 
             except Exception as e:
                 print(f"UQ Error on {model_url}: {e}")
+            return page_items
+
+        with phase("detail"):
+            async with PagePool(page.context) as pool:
+                results = await pool.map(model_urls, parse_model_page)
+        for page_items in results:
+            for item in page_items or []:
+                if not any(i['model'] == item['model'] and i['storage'] == item['storage'] for i in items):
+                    items.append(item)
 
     except Exception as e:
         print(f"Error scraping UQ: {e}")
@@ -557,38 +634,44 @@ async def scrape_au(page):
     print("Scraping au...")
     items = []
     try:
-        url = "https://www.au.com/iphone/"
-        await page.goto(url, wait_until="domcontentloaded")
-        await page.wait_for_timeout(3000)
-
-
-        # Find model links
-        # Au uses /iphone/product/...
-        links = await page.locator("a").all()
-        hrefs = []
-        for link in links:
-            href = await link.get_attribute("href")
-            # Filter for valid product pages
-            # Removed incorrect "product/iphone" exclusion which filtered out /iphone/product/iphone-16/
-            if href and "/iphone/product/" in href:
-                if not href.startswith("http"):
-                    href = "https://www.au.com" + href
-                hrefs.append(href)
+        with phase("list"):
+            url = "https://www.au.com/iphone/"
+            await goto(page, url)
+            await wait_ready(page, selector="a[href*='/iphone/product/']", label="au:list")
+
+
+            # Find model links
+            # Au uses /iphone/product/...
+            links = await page.locator("a").all()
+            hrefs = []
+            for link in links:
+                href = await link.get_attribute("href")
+                # Filter for valid product pages
+                # Removed incorrect "product/iphone" exclusion which filtered out /iphone/product/iphone-16/
+                if href and "/iphone/product/" in href:
+                    if not href.startswith("http"):
+                        href = "https://www.au.com" + href
+                    hrefs.append(href)
         
-        unique_urls = list(set(hrefs))
-        # Filter for recent iPhones to capture relevant data
-        target_urls = [u for u in unique_urls if any(m in u for m in ["iphone-17", "iphone-air", "iphone-16", "iphone-15", "iphone-14", "iphone-se"])]
+            unique_urls = list(set(hrefs))
+            # Filter for recent iPhones to capture relevant data
+            target_urls = [u for u in unique_urls if any(m in u for m in ["iphone-17", "iphone-air", "iphone-16", "iphone-15", "iphone-14", "iphone-se"])]
         
-        print(f"au: Found {len(target_urls)} model URLs")
+            print(f"au: Found {len(target_urls)} model URLs")
 
-        for model_url in target_urls:
+        async def parse_model_page(page, model_url):
+            page_items = []
             try:
                 print(f"  Checking {model_url}")
-                await page.goto(model_url, wait_until="domcontentloaded")
-                await page.wait_for_timeout(3000)
+                doc = await fetch_page(page, model_url, "au", ready=dict(
+                    selector="text=現金販売価格", title=lambda t: "iPhone" in t, label="au:detail"),
+                    validators=PAGE_STATE.validators(model_url))
+                cached = PAGE_STATE.reuse("au", doc)
+                if cached is not None:
+                    return cached
                 
                 # Model Name
-                title = await page.title()
+                title = doc.title
                 model_name = "Unknown iPhone"
                 if "iPhone" in title:
                     # Extract "iPhone 16" etc from title "iPhone 16（...）| au"
@@ -600,28 +683,25 @@ async def scrape_au(page):
                         model_name = re.sub(r'の予約.*', '', model_name)
                         model_name = model_name.replace("予約", "").strip()
                 
-                content = await page.content()
+                content = doc.html
                 
                 # 1. Gross Price (Cash Price)
-                price_gross = 0
-                gross_match = re.search(r'現金販売価格／支払総額：([\d,]+)円', content)
-                if gross_match:
-                    price_gross = int(gross_match.group(1).replace(',', ''))
+                price_gross = AU_LABELS.extract(content).get("gross", 0)
                 
                 # 2. Effective Rent (Program Content)
                 price_effective_rent = 0
                 
                 # Look for "スマホトクするプログラム" block
-                # We use locator to find the section then find the price inside
-                program_sections = await page.locator("div.program-inner").all()
-                for section in program_sections:
-                    text = await section.text_content()
+                # Find the section then find the price inside (works on raw or rendered HTML)
+                for section in elements(content, "div", "program-inner"):
+                    text = strip_tags(section)
                     if "スマホトクするプログラム" in text and "実質負担額" in text:
                         # Find the price element inside this section
                         # Usually .text-amount-price strong
-                        price_el = section.locator(".text-amount-price strong").first
-                        if await price_el.count() > 0:
-                            p_text = await price_el.text_content()
+                        amount_els = elements(section, class_name="text-amount-price")
+                        price_el = elements(amount_els[0], "strong") if amount_els else []
+                        if price_el:
+                            p_text = strip_tags(price_el[0]).strip()
                             price_effective_rent = int(p_text.replace(',', ''))
                             break
                             
@@ -634,9 +714,8 @@ async def scrape_au(page):
                 # For now, let's assume "Start From" price (Lowest Storage).
                 storage = "最小容量"
                 # If we want to capture the storage size from the active button:
-                checked_label = page.locator("label.cmp-form-options__label--checked").first
-                if await checked_label.count() > 0:
-                     st_text = await checked_label.text_content()
+                st_text = first_text(content, "label", "cmp-form-options__label--checked")
+                if st_text is not None:
                      if "GB" in st_text or "TB" in st_text:
                          storage = st_text.strip()
                 
@@ -654,7 +733,7 @@ async def scrape_au(page):
                      price_effective_rent = price_gross
 
                 if price_gross > 0:
-                     items.append({
+                     page_items.append({
                         "carrier": "au",
                         "model": model_name,
                         "storage": storage,
@@ -670,8 +749,17 @@ async def scrape_au(page):
                         "url": model_url
                     })
 
+                PAGE_STATE.remember("au", doc, page_items)
+
             except Exception as e:
                 print(f"  au Error on {model_url}: {e}")
+            return page_items
+
+        with phase("detail"):
+            async with PagePool(page.context) as pool:
+                results = await pool.map(target_urls, parse_model_page)
+        for page_items in results:
+            items.extend(page_items or [])
                 
     except Exception as e:
         print(f"Error scraping au: {e}")
@@ -684,33 +772,39 @@ async def scrape_softbank(page):
     print("Scraping SoftBank...")
     items = []
     try:
-        # Softbank logic: Main page -> Model page -> Price section
-        url = "https://www.softbank.jp/iphone/"
-        await page.goto(url, wait_until="domcontentloaded")
-        await page.wait_for_timeout(3000)
+        with phase("list"):
+            # Softbank logic: Main page -> Model page -> Price section
+            url = "https://www.softbank.jp/iphone/"
+            await goto(page, url)
+            await wait_ready(page, selector="a[href*='/iphone/iphone-']", label="softbank:list")
         
-        # Links
-        links = await page.locator("a[href*='/iphone/iphone-']").all()
-        hrefs = set()
-        for link in links:
-            href = await link.get_attribute("href")
-            # /iphone/iphone-16/ or similar
-            if href and re.search(r'/iphone/iphone-[\w-]+/?$', href):
-                 if not href.startswith("http"):
-                    href = "https://www.softbank.jp" + href
-                 hrefs.add(href)
+            # Links
+            links = await page.locator("a[href*='/iphone/iphone-']").all()
+            hrefs = set()
+            for link in links:
+                href = await link.get_attribute("href")
+                # /iphone/iphone-16/ or similar
+                if href and re.search(r'/iphone/iphone-[\w-]+/?$', href):
+                     if not href.startswith("http"):
+                        href = "https://www.softbank.jp" + href
+                     hrefs.add(href)
         
-        target_urls = [u for u in hrefs if "price" not in u and "spec" not in u] # Avoid sub-pages
-        print(f"SoftBank: Found {len(target_urls)} model URLs")
+            target_urls = [u for u in hrefs if "price" not in u and "spec" not in u] # Avoid sub-pages
+            print(f"SoftBank: Found {len(target_urls)} model URLs")
         
-        for model_url in target_urls:
+        async def parse_model_page(page, model_url):
+            page_items = []
             try:
                 # print(f"  Checking {model_url}")
-                await page.goto(model_url, wait_until="domcontentloaded")
-                await page.wait_for_timeout(3000)
+                doc = await fetch_page(page, model_url, "SoftBank", ready=dict(
+                    selector=".mobile-page-u96-app-model-price-item-row", label="softbank:detail"),
+                    validators=PAGE_STATE.validators(model_url))
+                cached = PAGE_STATE.reuse("SoftBank", doc)
+                if cached is not None:
+                    return cached
                 
                 model_name = "Unknown iPhone"
-                title = await page.title()
+                title = doc.title
                 if "iPhone" in title:
                     # Split by common delimiters including '・' used by SoftBank for multiple models
                     # "iPhone 16 Pro・iPhone 16 Pro Max..." -> "iPhone 16 Pro"
@@ -723,27 +817,22 @@ async def scrape_softbank(page):
                     model_name = model_name.replace("【予約・購入】", "").strip()
                     model_name = model_name.replace("予約", "").strip()
                 
-                content = await page.content()
+                content = doc.html
                 
                 # 1. Gross Price
-                price_gross = 0
-                g_regex = re.search(r'総額.*?([\d,]+)円', content)
-                if g_regex:
-                    price_gross = int(g_regex.group(1).replace(',', ''))
+                # One pass over the page for gross, rent and the phase fallbacks below
+                amounts = SOFTBANK_LABELS.extract(content)
+                price_gross = amounts.get("gross", 0)
                 
                 # 2. Effective Rent (2-year total)
                 price_effective_rent = 0
                 
-                tokusapo_section = page.locator(".mobile-page-u96-app-model-price-applied-model-price__card--tokusapo-plus")
-                if await tokusapo_section.count() > 0:
-                     section_text = await tokusapo_section.text_content()
-                     m = re.search(r'支払総額.*?([\d,]+)円', section_text)
-                     if m:
-                         price_effective_rent = int(m.group(1).replace(',', ''))
+                section_text = first_text(content, class_name="mobile-page-u96-app-model-price-applied-model-price__card--tokusapo-plus")
+                if section_text is not None:
+                     price_effective_rent = SOFTBANK_TOKUSAPO_LABELS.extract(section_text).get("rent", 0)
                 
                 if price_effective_rent == 0:
-                     r_match = re.search(r'実質負担金.*?([\d,]+)円', content)
-                     if r_match: price_effective_rent = int(r_match.group(1).replace(',', ''))
+                     price_effective_rent = amounts.get("rent", 0)
 
                 # 3. Monthly Payment Phases (SoftBank特有)
                 # 新トクするサポートの各期間の月額を取得
@@ -752,13 +841,13 @@ async def scrape_softbank(page):
                 
                 # Pattern: "1～12回" followed by amount, "13～24回", "25～48回"
                 # Try to find payment rows in the pricing section
-                price_rows = await page.locator(".mobile-page-u96-app-model-price-item-row").all()
+                price_rows = elements(content, class_name="mobile-page-u96-app-model-price-item-row")
                 
                 for row in price_rows:
                     try:
-                        row_text = await row.text_content()
+                        row_text = strip_tags(row)
                         # Check for period patterns like "1～12回"
-                        period_match = re.search(r'(\d+)[～~](\d+)回', row_text)
+                        period_match = PERIOD_RE.search(row_text)
                         if period_match:
                             period = f"{period_match.group(1)}～{period_match.group(2)}回"
                             
@@ -770,7 +859,7 @@ async def scrape_softbank(page):
                             if "お支払い不要" in row_text:
                                 amount = 0
                             else:
-                                amount_match = re.search(r'([\d,]+)円', row_text)
+                                amount_match = YEN_RE.search(row_text)
                                 if amount_match:
                                     amount = int(amount_match.group(1).replace(',', ''))
                                     # Previously filtered < 100, but 1 yen is valid for campaigns
@@ -790,15 +879,9 @@ async def scrape_softbank(page):
                 # Fallback: Try regex on full content if no rows found
                 if not monthly_payment_phases:
                     # Look for patterns like "1～12回...3,640円"
-                    phase_patterns = [
-                        (r'1[～~]12回.*?([\d,]+)円', "1～12回"),
-                        (r'13[～~]24回.*?([\d,]+)円', "13～24回"),
-                        (r'25[～~]48回.*?([\d,]+)円', "25～48回"),
-                    ]
-                    for pattern, period in phase_patterns:
-                        m = re.search(pattern, content)
-                        if m:
-                            amount = int(m.group(1).replace(',', ''))
+                    for period in ["1～12回", "13～24回", "25～48回"]:
+                        if period in amounts:
+                            amount = amounts[period]
                             if amount >= 1:  # Accept valid promo amounts like 1 yen
                                 monthly_payment_phases.append({
                                     "period": period,
@@ -807,11 +890,11 @@ async def scrape_softbank(page):
                     
                     # Check for "お支払い不要" periods
                     if "25～48回" not in [p["period"] for p in monthly_payment_phases]:
-                        if re.search(r'25[～~]48回.*?お支払い不要', content):
+                        if SOFTBANK_NO_PAYMENT_25_48_RE.search(content):
                             monthly_payment_phases.append({"period": "25～48回", "amount": 0})
                 
                 # Sort phases by period start number
-                monthly_payment_phases.sort(key=lambda x: int(re.search(r'^(\d+)', x["period"]).group(1)) if re.search(r'^(\d+)', x["period"]) else 0)
+                monthly_payment_phases.sort(key=lambda x: int(PERIOD_START_RE.search(x["period"]).group(1)) if PERIOD_START_RE.search(x["period"]) else 0)
                 
                 # Calculate monthly_payment
                 # Use first phase amount if valid, otherwise calculate from 2-year total
@@ -821,7 +904,7 @@ async def scrape_softbank(page):
                     monthly_payment = price_effective_rent // 24
                 
                 if price_gross > 0:
-                     items.append({
+                     page_items.append({
                         "carrier": "SoftBank",
                         "model": model_name,
                         "storage": "最小容量",
@@ -836,8 +919,16 @@ async def scrape_softbank(page):
                         "variants": [],
                         "url": model_url
                     })
+                PAGE_STATE.remember("SoftBank", doc, page_items)
             except Exception as e:
                 print(f"  SoftBank Error {model_url}: {e}")
+            return page_items
+
+        with phase("detail"):
+            async with PagePool(page.context) as pool:
+                results = await pool.map(target_urls, parse_model_page)
+        for page_items in results:
+            items.extend(page_items or [])
 
     except Exception as e:
         print(f"Error scraping SoftBank: {e}")
@@ -845,134 +936,142 @@ async def scrape_softbank(page):
     print(f"SoftBank: Found {len(items)} items")
     return items
 
+
+def parse_docomo_detail(content, title, url):
+    """Final HTML + title of a docomo detail page -> items (pure Python, no page access)"""
+    page_items = []
+    model_name = "Unknown iPhone"
+
+    # Docomo title: "iPhone 17 Pro | ドコモオンラインショップ"
+    if "|" in title:
+        model_name = title.split('|')[0].strip()
+    elif "iPhone" in title:
+        model_name = title.strip()
+
+    # Cleanup "の予約・購入" suffixes if present
+    model_name = re.sub(r'の予約.*', '', model_name)
+    model_name = re.sub(r'【.*', '', model_name)
+    model_name = model_name.replace("予約", "").strip()
+    model_name = re.split(r'[・【]', model_name)[0].strip()
+
+    # Fallback to H1 if title failed or produced "Unknown"
+    if "iPhone" not in model_name or len(model_name) > 50 or model_name == "Unknown iPhone":
+        try:
+             h1 = first_text(content, "h1")
+             if h1 and "iPhone" in h1:
+                 model_name = h1.strip()
+                 # Clean h1 too
+                 model_name = re.sub(r'の予約.*', '', model_name)
+                 model_name = re.sub(r'【.*', '', model_name)
+                 model_name = model_name.replace("予約", "").strip()
+                 model_name = re.split(r'[・【]', model_name)[0].strip()
+        except:
+            pass
+
+    # Price extraction
+    price_gross = 0
+    price_effective_rent = 0
+
+    try:
+        # 1. Gross Price
+        # Search for "現金販売価格"
+        # "支払い総額/現金販売価格" ... "214,940円"
+        amounts = DOCOMO_LABELS.extract(content)
+        price_gross = amounts.get("gross", 0)
+
+        if price_gross == 0:
+             price_gross = amounts.get("gross_total", 0)
+
+        # 2. Effective Rent
+        # Look for "お客さま負担額" (Customer Burden)
+        # Use findAll to get candidates, pick the largely plausible one?
+        # Or specific pattern: "お客さま負担額" then some chars then number
+        price_effective_rent = amounts.get("rent", 0)
+
+        # Safety check: If rent is impossibly low (e.g. monthly), ignore it
+        if price_effective_rent > 0 and price_effective_rent < 10000:
+             # Try finding another price
+             # Sometimes the Monthly price appears first.
+             # Try finding "実質負担金"
+             price_effective_rent = amounts.get("rent_alt", price_effective_rent)
+
+             # If still low, just set to 0 to fallback to gross
+             if price_effective_rent < 10000:
+                 price_effective_rent = 0
+
+    except Exception as e:
+        print(f"  Price extract error for {model_name}: {e}")
+
+    if price_gross > 0:
+         effective = price_effective_rent if price_effective_rent else price_gross
+         page_items.append({
+            "carrier": "docomo",
+            "model": model_name,
+            "storage": "最小容量",
+            "price_gross": price_gross,
+            "discount_official": 0,
+            "program_exemption": price_gross - price_effective_rent if price_effective_rent else 0,
+            "points_awarded": 0,
+            "price_effective_rent": effective,
+            "price_effective_buyout": price_gross,
+            "monthly_payment": effective // 24 if effective > 0 else price_gross // 48,
+            "monthly_payment_phases": [],
+            "variants": [],
+            "url": url
+        })
+    return page_items
+
+
 async def scrape_docomo(page):
     print("Scraping docomo... (v3 fast)")
     items = []
     try:
-        # Docomo Online Shop is structured
-        url = "https://onlineshop.docomo.ne.jp/products/iphone/index.html"
-        await page.goto(url, wait_until="domcontentloaded")
-        await page.wait_for_timeout(4000)
+        with phase("list"):
+            # Docomo Online Shop is structured
+            url = "https://onlineshop.docomo.ne.jp/products/iphone/index.html"
+            await goto(page, url)
+            await wait_ready(page, selector="a[href*='/products/mobile/details/']", label="docomo:list")
         
-        # Product Cards
-        cards = await page.locator("a[href*='/products/mobile/details/']").all()
+            # Product Cards
+            cards = await page.locator("a[href*='/products/mobile/details/']").all()
 
-        print(f"Docomo: Found {len(cards)} product cards")
+            print(f"Docomo: Found {len(cards)} product cards")
         
-        card_urls = []
-        for card in cards:
-            href = await card.get_attribute("href")
-            # Updated filter to match selector
-            if href and "/products/mobile/details/" in href:
-                 if not href.startswith("http"):
-                     if href.startswith("/"):
-                         href = "https://onlineshop.docomo.ne.jp" + href
-                     else:
-                         href = "https://onlineshop.docomo.ne.jp/products/iphone/" + href 
-                 card_urls.append(href)
+            card_urls = []
+            for card in cards:
+                href = await card.get_attribute("href")
+                # Updated filter to match selector
+                if href and "/products/mobile/details/" in href:
+                     if not href.startswith("http"):
+                         if href.startswith("/"):
+                             href = "https://onlineshop.docomo.ne.jp" + href
+                         else:
+                             href = "https://onlineshop.docomo.ne.jp/products/iphone/" + href 
+                     card_urls.append(href)
         
-        unique_urls = list(set(card_urls))
+            unique_urls = list(set(card_urls))
         
-        for p_url in unique_urls:
+        async def parse_detail_page(page, p_url):
+            page_items = []
             try:
-                await page.goto(p_url, wait_until="domcontentloaded")
-                await page.wait_for_timeout(2000) # Shorter wait, just need HTML
-                
-                # Wait for title to populate (retry logic)
-                for _ in range(5):
-                    title = await page.title()
-                    if "|" in title and "iPhone" in title:
-                        break
-                    await page.wait_for_timeout(500)
-                
-                # Docomo title: "iPhone 17 Pro | ドコモオンラインショップ"
-                if "|" in title:
-                    model_name = title.split('|')[0].strip()
-                elif "iPhone" in title:
-                    model_name = title.strip()
-                
-                # Cleanup "の予約・購入" suffixes if present
-                model_name = re.sub(r'の予約.*', '', model_name)
-                model_name = re.sub(r'【.*', '', model_name)
-                model_name = model_name.replace("予約", "").strip()
-                model_name = re.split(r'[・【]', model_name)[0].strip()
-
-                # Fallback to H1 if title failed or produced "Unknown"
-                if "iPhone" not in model_name or len(model_name) > 50 or model_name == "Unknown iPhone":
-                    try:
-                         h1 = await page.locator("h1").first.text_content()
-                         if h1 and "iPhone" in h1:
-                             model_name = h1.strip()
-                             # Clean h1 too
-                             model_name = re.sub(r'の予約.*', '', model_name)
-                             model_name = re.sub(r'【.*', '', model_name)
-                             model_name = model_name.replace("予約", "").strip()
-                             model_name = re.split(r'[・【]', model_name)[0].strip()
-                    except:
-                        pass
-                        
-                # Get full content for fast regex
-                content = await page.content()
-
-                # Price extraction
-                price_gross = 0
-                price_effective_rent = 0
-                
-                try:
-                    # 1. Gross Price
-                    # Search for "現金販売価格"
-                    # "支払い総額/現金販売価格" ... "214,940円"
-                    m_g = re.search(r'現金販売価格.*?([\d,]+)円', content)
-                    if m_g:
-                        price_gross = int(m_g.group(1).replace(',', ''))
-                    
-                    if price_gross == 0:
-                         m_g2 = re.search(r'支払い総額.*?([\d,]+)円', content)
-                         if m_g2: price_gross = int(m_g2.group(1).replace(',', ''))
-
-                    # 2. Effective Rent
-                    # Look for "お客さま負担額" (Customer Burden)
-                    # Use findAll to get candidates, pick the largely plausible one?
-                    # Or specific pattern: "お客さま負担額" then some chars then number
-                    m_r = re.search(r'お客さま負担額.*?([\d,]+)円', content)
-                    if m_r:
-                         price_effective_rent = int(m_r.group(1).replace(',', ''))
-                    
-                    # Safety check: If rent is impossibly low (e.g. monthly), ignore it
-                    if price_effective_rent > 0 and price_effective_rent < 10000:
-                         # Try finding another price
-                         # Sometimes the Monthly price appears first.
-                         # Try finding "実質負担金"
-                         m_r2 = re.search(r'実質負担金.*?([\d,]+)円', content)
-                         if m_r2: 
-                             price_effective_rent = int(m_r2.group(1).replace(',', ''))
-                         
-                         # If still low, just set to 0 to fallback to gross
-                         if price_effective_rent < 10000:
-                             price_effective_rent = 0
-
-                except Exception as e:
-                    print(f"  Price extract error for {model_name}: {e}")
-
-                if price_gross > 0:
-                     effective = price_effective_rent if price_effective_rent else price_gross
-                     items.append({
-                        "carrier": "docomo",
-                        "model": model_name,
-                        "storage": "最小容量",
-                        "price_gross": price_gross,
-                        "discount_official": 0,
-                        "program_exemption": price_gross - price_effective_rent if price_effective_rent else 0,
-                        "points_awarded": 0,
-                        "price_effective_rent": effective,
-                        "price_effective_buyout": price_gross,
-                        "monthly_payment": effective // 24 if effective > 0 else price_gross // 48,
-                        "monthly_payment_phases": [],
-                        "variants": [],
-                        "url": p_url
-                    })
+                # The price block is server-rendered; in the browser the title is filled in by JS
+                doc = await fetch_page(page, p_url, "docomo", ready=dict(
+                    selector="text=現金販売価格", title=lambda t: "|" in t and "iPhone" in t, label="docomo:detail"),
+                    validators=PAGE_STATE.validators(p_url))
+                cached = PAGE_STATE.reuse("docomo", doc)
+                if cached is not None:
+                    return cached
+                page_items = parse_docomo_detail(doc.html, doc.title, p_url)
+                PAGE_STATE.remember("docomo", doc, page_items)
             except Exception as e:
                 print(f"  Docomo Detail Error: {e}")
+            return page_items
+
+        with phase("detail"):
+            async with PagePool(page.context) as pool:
+                results = await pool.map(unique_urls, parse_detail_page)
+        for page_items in results:
+            items.extend(page_items or [])
                 
     except Exception as e:
         print(f"Error scraping docomo: {e}")
@@ -980,34 +1079,294 @@ async def scrape_docomo(page):
     print(f"Docomo: Found {len(items)} items")
     return items
 
-async def main():
+# Carrier scrapers in output order. Each runs in its own BrowserContext.
+CARRIER_SCRAPERS = [
+    ("Rakuten", scrape_rakuten),
+    ("ahamo", scrape_ahamo),
+    ("UQ mobile", scrape_uq),
+    ("au", scrape_au),
+    ("SoftBank", scrape_softbank),
+    ("docomo", scrape_docomo),
+]
+
+CONTEXT_OPTIONS = {
+    "user_agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "locale": "ja-JP",
+}
+
+# How many carriers may scrape at the same time (override with SCRAPE_CONCURRENCY or --concurrency)
+DEFAULT_CONCURRENCY = int(os.environ.get("SCRAPE_CONCURRENCY", len(CARRIER_SCRAPERS)))
+
+
+class WarmContexts:
+    """
+    One BrowserContext per carrier that stays open across scrape_all() calls
+    (see scrape_daemon.py), so its HTTP cache, cookies and connections stay warm.
+    Hooks are installed once, when a carrier's context is created.
+    """
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.contexts = {}
+        self.hooks = {}
+
+    async def get(self, name, hooks):
+        if name not in self.contexts:
+            context = await self.browser.new_context(**context_options(hooks))
+            for hook in hooks:
+                await hook.install(context)
+            self.contexts[name] = context
+            self.hooks[name] = list(hooks)
+        return self.contexts[name]
+
+    async def close(self):
+        for name, context in self.contexts.items():
+            try:
+                for hook in self.hooks[name]:
+                    if hasattr(hook, "before_close"):
+                        await hook.before_close(context)
+                await context.close()
+            except Exception as e:
+                print(f"[{name}] Error closing context: {e}")
+        self.contexts = {}
+        self.hooks = {}
+
+
+def context_options(hooks):
+    """CONTEXT_OPTIONS plus whatever hooks with a `context_options()` method add (e.g. a saved storage_state)."""
+    options = dict(CONTEXT_OPTIONS)
+    for hook in hooks:
+        if hasattr(hook, "context_options"):
+            options.update(hook.context_options())
+    return options
+
+
+async def run_carrier(browser, name, scraper, semaphore, hooks=(), contexts=None):
+    """
+    Run one carrier scraper in an isolated context. Never raises: a crash yields [].
+
+    `hooks` are objects with `install(context)` and optionally `before_close(context)` and
+    `context_options()` (resource filter, browser cache, snapshot recorder/replayer, ...), installed in order.
+    With `contexts` (WarmContexts) the carrier's context is reused and left open; only its pages are closed.
+    """
+    async with semaphore:
+        started = time.monotonic()
+        context = None
+        try:
+            if contexts is not None:
+                context = await contexts.get(name, hooks)
+            else:
+                context = await browser.new_context(**context_options(hooks))
+                for hook in hooks:
+                    await hook.install(context)
+            page = await context.new_page()
+            with phase("total", carrier=name):
+                items = await scraper(page)
+        except Exception as e:
+            print(f"[{name}] Scraper crashed: {e}")
+            traceback.print_exc()
+            items = []
+        finally:
+            if context is not None and contexts is not None:
+                for open_page in list(context.pages):
+                    try:
+                        await open_page.close()
+                    except Exception:
+                        pass
+            elif context is not None:
+                for hook in hooks:
+                    if hasattr(hook, "before_close"):
+                        try:
+                            await hook.before_close(context)
+                        except Exception as e:
+                            print(f"[{name}] Error in {type(hook).__name__}.before_close: {e}")
+                try:
+                    await context.close()
+                except Exception as e:
+                    print(f"[{name}] Error closing context: {e}")
+        print(f"[{name}] Finished in {time.monotonic() - started:.1f}s ({len(items)} items)")
+        return items
+
+
+async def scrape_all(browser, concurrency=DEFAULT_CONCURRENCY, block_resources=True, record_dir=None, replay_dir=None,
+                     url_map=None, carriers=None, contexts=None, browser_cache=True):
+    """
+    Run all carriers (or just `carriers`) concurrently, at most `concurrency` at once.
+    Returns items in CARRIER_SCRAPERS order.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    scrapers = [(name, scraper) for name, scraper in CARRIER_SCRAPERS if carriers is None or name in carriers]
+    size_cache = load_size_cache()
+    filters = [ResourceFilter.for_carrier(name, size_cache, enabled=block_resources) for name, _ in scrapers]
+    # Replays abort every asset anyway, and stand-in runs shouldn't mix their assets into the real carriers' caches
+    caches = [CarrierCache(name, enabled=browser_cache and not replay_dir and not url_map) for name, _ in scrapers]
+
+    # Snapshot hooks are installed after the filter so their routes take precedence
+    snapshot_store = None
+    snapshot_hook = None
+    if replay_dir:
+        snapshot_store = SnapshotStore(replay_dir)
+        snapshot_hook = SnapshotReplayer(snapshot_store)
+        print(f"Replaying {len(snapshot_store.entries)} snapshots from {replay_dir}/ (offline)")
+    elif record_dir:
+        snapshot_store = SnapshotStore(record_dir)
+        snapshot_hook = SnapshotRecorder(snapshot_store)
+
+    # The cache goes under the filter, so blocked requests never reach it
+    hooks = [
+        [PhaseMetrics(name)] + ([StandInRouter(url_map)] if url_map else []) + [cache, rf]
+        + ([snapshot_hook] if snapshot_hook else [])
+        for (name, _), cache, rf in zip(scrapers, caches, filters)
+    ]
+    if contexts is not None:
+        # Warm contexts keep the hooks they were created with, so report (and save) through those
+        hooks = [contexts.hooks.get(name, h) for (name, _), h in zip(scrapers, hooks)]
+        filters = [next(hook for hook in h if isinstance(hook, ResourceFilter)) for h in hooks]
+        caches = [next(hook for hook in h if isinstance(hook, CarrierCache)) for h in hooks]
+        size_cache = filters[0].size_cache if filters else size_cache
+
+    results = await asyncio.gather(*[
+        run_carrier(browser, name, scraper, semaphore, h, contexts)
+        for (name, scraper), h in zip(scrapers, hooks)
+    ])
+    items = []
+    for carrier_items in results:
+        items.extend(carrier_items)
+    if contexts is not None:
+        # Warm contexts only save on close; keep the index on disk current between jobs
+        for cache in caches:
+            if cache.enabled:
+                cache.save()
+    print_cache_summary(caches)
+
+    if isinstance(snapshot_hook, SnapshotRecorder):
+        snapshot_store.save()
+        print(f"Recorded {len(snapshot_store.entries)} snapshots to {record_dir}/")
+    if isinstance(snapshot_hook, SnapshotReplayer):
+        print(f"Replay: served {snapshot_hook.served} pages, {len(snapshot_hook.missing)} missing")
+    else:
+        try:
+            save_size_cache(size_cache)
+        except OSError as e:
+            print(f"Could not save resource size cache: {e}")
+        print_filter_summary(filters)
+    return items
+
+
+def save_outputs(items, output, started, changes=True, history=True):
+    """
+    Write data.json and everything derived from it (view index, compact copy, shards,
+    change feed, phase metrics), print the run summaries and record the history run.
+    Returns the saved data.
+    """
+    all_data = {
+        "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M"),
+        "items": items
+    }
+
+    previous = load_previous(output)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(all_data, f, indent=2, ensure_ascii=False)
+    index_file = write_view_index(all_data, output)
+    compact_sizes = write_compact(all_data, output)
+    manifest, shards_written = write_shards(all_data, output)
+
+    print(f"Data saved to {output} + {index_file} ({len(items)} items, {time.monotonic() - started:.1f}s)")
+    print_size_summary(output, compact_sizes)
+    print(f"Shards: {len(manifest['carriers'])} carriers, {len(manifest['models'])} models ({shards_written} rewritten)")
+    if previous is not None and changes:
+        print(f"Changes since {previous.get('updated_at')}: {changes_summary(write_changes(previous, all_data, output))}")
+    print_wait_summary()
+    print_fetch_summary()
+    print_phase_summary()
+    print(f"Phase metrics written to {write_metrics(output, run=all_data['updated_at'])}")
+    if PAGE_STATE.enabled:
+        PAGE_STATE.print_summary()
+        PAGE_STATE.save()
+    if history:
+        conn = connect_history()
+        try:
+            run_id = record_run(conn, all_data)
+        finally:
+            conn.close()
+        print(f"Recorded history run {run_id}")
+    return all_data
+
+
+async def main(concurrency=DEFAULT_CONCURRENCY, block_resources=True, record_dir=None, replay_dir=None, output=DATA_FILE,
+               use_http=True, incremental=True, history=True, base_url=None, browser_cache=True):
+    started = time.monotonic()
+    start_run()
+    url_map = origin_map(base_url) if base_url else None
+    if url_map:
+        print("Carrier sites replaced by the stand-in server: " + ", ".join(sorted(url_map.values())))
+    # Snapshots only see browser navigations, so record/replay always go through Chromium
+    configure_http(enabled=use_http and not record_dir and not replay_dir, user_agent=CONTEXT_OPTIONS["user_agent"],
+                   url_map=url_map)
+    # Replays are for re-running parsers, so never short-circuit them with cached items
+    PAGE_STATE.enabled = incremental and not replay_dir
+    if PAGE_STATE.enabled:
+        PAGE_STATE.load()
     async with async_playwright() as p:
         # Launch browser (headless=False for debug if needed, but usually True)
         browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            locale="ja-JP"
-        )
-        page = await context.new_page()
-
-        rakuten_data = await scrape_rakuten(page)
-        ahamo_data = await scrape_ahamo(page)
-        uq_data = await scrape_uq(page)
-        au_data = await scrape_au(page)
-        sb_data = await scrape_softbank(page)
-        docomo_data = await scrape_docomo(page)
-
-        all_data = {
-            "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M"),
-            "items": rakuten_data + ahamo_data + uq_data + au_data + sb_data + docomo_data
-        }
-
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump(all_data, f, indent=2, ensure_ascii=False)
-            
-        print(f"Data saved to {DATA_FILE}")
-        
+
+        try:
+            items = await scrape_all(browser, concurrency, block_resources, record_dir, replay_dir, url_map,
+                                     browser_cache=browser_cache)
+        finally:
+            await close_client()
+
+        # Replays and stand-in runs re-parse old pages: diffed against live data every re-parse difference
+        # would show up as a price change, and recording them would put stale prices in the history
+        offline = bool(replay_dir or base_url)
+        save_outputs(items, output, started, changes=not offline, history=history and not offline)
+
         await browser.close()
 
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape iPhone prices from Japanese carriers into docs/data.json")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="max number of carriers scraped at the same time (default: %(default)s)")
+    parser.add_argument("--no-block", dest="block_resources", action="store_false",
+                        help="download images/fonts/media/trackers too (also refreshes the blocked-bytes size estimates)")
+    parser.add_argument("--no-http", dest="use_http", action="store_false",
+                        help="always use the browser, even for pages that are server-rendered")
+    parser.add_argument("--full", dest="incremental", action="store_false",
+                        help="re-parse every detail page even if its fingerprint is unchanged")
+    parser.add_argument("--no-browser-cache", dest="browser_cache", action="store_false",
+                        help="start every carrier from an empty browser profile (no .cache/browser/ assets or cookies)")
+    parser.add_argument("--no-history", dest="history", action="store_false",
+                        help="don't append this run to the local price history (history/prices.sqlite3)")
+    snap = parser.add_mutually_exclusive_group()
+    snap.add_argument("--record", nargs="?", const=DEFAULT_SNAPSHOT_DIR, metavar="DIR",
+                      help="save every page's final HTML to a snapshot store (default: %(const)s/)")
+    snap.add_argument("--replay", nargs="?", const=DEFAULT_SNAPSHOT_DIR, metavar="DIR",
+                      help="serve pages from a snapshot store instead of the network (default: %(const)s/)")
+    parser.add_argument("--base-url", metavar="URL",
+                        help="scrape the local stand-in server (standin.py) at URL instead of the carrier sites")
+    parser.add_argument("--output", default=None,
+                        help=f"where to write the JSON (default: {DATA_FILE}, replay_data.json with --replay, "
+                             "standin_data.json with --base-url)")
+    args = parser.parse_args()
+    if args.output is None:
+        # Don't clobber the published data with an offline replay or a load test
+        args.output = "replay_data.json" if args.replay else "standin_data.json" if args.base_url else DATA_FILE
+    return args
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_args()
+    asyncio.run(main(
+        concurrency=args.concurrency,
+        block_resources=args.block_resources,
+        record_dir=args.record,
+        replay_dir=args.replay,
+        output=args.output,
+        use_http=args.use_http,
+        incremental=args.incremental,
+        history=args.history,
+        base_url=args.base_url,
+        browser_cache=args.browser_cache,
+    ))
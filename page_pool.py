@@ -0,0 +1,91 @@
+import asyncio
+import time
+from urllib.parse import urlparse
+
+# Defaults tuned for carrier sites: a few tabs per carrier, gentle on each host
+DEFAULT_POOL_SIZE = 4
+DEFAULT_PER_HOST_LIMIT = 3
+DEFAULT_POLITENESS_DELAY = 0.5  # seconds between two navigations starting on the same host
+
+
+class PagePool:
+    """
+    A small pool of pages inside one BrowserContext.
+
+    Jobs are (url, handler) pairs. `handler(page, url)` navigates and parses,
+    and its return value is collected. Concurrency is bounded by the pool size
+    and by a per-host semaphore; navigations to the same host are spaced by
+    `politeness_delay` seconds.
+
+        async with PagePool(page.context) as pool:
+            results = await pool.map(urls, parse_detail)
+    """
+
+    def __init__(self, context, size=DEFAULT_POOL_SIZE, per_host_limit=DEFAULT_PER_HOST_LIMIT,
+                 politeness_delay=DEFAULT_POLITENESS_DELAY):
+        self.context = context
+        self.size = max(1, size)
+        self.per_host_limit = max(1, per_host_limit)
+        self.politeness_delay = politeness_delay
+        self._pages = []
+        self._idle = asyncio.Queue()
+        self._host_semaphores = {}
+        self._host_locks = {}
+        self._host_last_start = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        for page in self._pages:
+            try:
+                await page.close()
+            except Exception:
+                pass
+        self._pages = []
+        self._idle = asyncio.Queue()
+
+    async def _acquire_page(self):
+        if self._idle.empty() and len(self._pages) < self.size:
+            page = await self.context.new_page()
+            self._pages.append(page)
+            return page
+        return await self._idle.get()
+
+    def _release_page(self, page):
+        self._idle.put_nowait(page)
+
+    async def _wait_politely(self, host):
+        # Serialize the "may I start?" check per host so the delay is honoured under concurrency
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            last = self._host_last_start.get(host)
+            if last is not None:
+                wait = self.politeness_delay - (time.monotonic() - last)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            self._host_last_start[host] = time.monotonic()
+
+    async def run(self, url, handler):
+        """Run one job. Errors are printed and turned into None so one bad page doesn't sink the batch."""
+        host = urlparse(url).netloc
+        semaphore = self._host_semaphores.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+        async with semaphore:
+            await self._wait_politely(host)
+            page = None
+            try:
+                page = await self._acquire_page()
+                return await handler(page, url)
+            except Exception as e:
+                print(f"  PagePool error on {url}: {e}")
+                return None
+            finally:
+                if page is not None:
+                    self._release_page(page)
+
+    async def map(self, urls, handler):
+        """Run `handler` over all urls in parallel. Results keep the order of `urls`."""
+        return await asyncio.gather(*[self.run(url, handler) for url in urls])
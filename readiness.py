@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+from instrumentation import phase
+
+# Default budget for one readiness wait (the old fixed sleeps were 2-5 s)
+DEFAULT_TIMEOUT_MS = 8000
+# A network-quiet window: no requests in flight for this long counts as "quiet"
+NETWORK_QUIET_MS = 500
+TITLE_POLL_MS = 100
+
+# One record per wait_ready() call: {"label", "url", "waited_ms", "ready", "conditions"}
+WAIT_LOG = []
+
+
+async def _wait_selector(page, selector, deadline):
+    remaining = max(1, int((deadline - time.monotonic()) * 1000))
+    await page.wait_for_selector(selector, state="attached", timeout=remaining)
+
+
+async def _wait_title(page, predicate, deadline):
+    while True:
+        title = await page.title()
+        if predicate(title):
+            return
+        if time.monotonic() >= deadline:
+            raise asyncio.TimeoutError(f"title predicate not met (last title: {title!r})")
+        await asyncio.sleep(TITLE_POLL_MS / 1000)
+
+
+async def _wait_network_quiet(page, deadline):
+    remaining = max(1, int((deadline - time.monotonic()) * 1000))
+    await page.wait_for_load_state("networkidle", timeout=remaining)
+
+
+async def wait_ready(page, selector=None, title=None, network_quiet=False, timeout=DEFAULT_TIMEOUT_MS, label=""):
+    """
+    Wait until the page is "ready" instead of sleeping a fixed time.
+
+    - selector: CSS/Playwright selector that must be attached (e.g. ".product-iphone-Fee_Media", "text=円/月")
+    - title: callable(title) -> bool, polled until true (e.g. docomo's "iPhone ... | ドコモオンラインショップ")
+    - network_quiet: also wait for Playwright's networkidle state
+
+    All given conditions must hold within one shared `timeout` (ms) budget.
+    A timeout is not an error: the scraper carries on and parses whatever is there,
+    just like after the old fixed sleep. Returns True if every condition was met.
+    The time spent is appended to WAIT_LOG (and recorded as a "wait" phase).
+    """
+    started = time.monotonic()
+    deadline = started + timeout / 1000
+    conditions = []
+    ready = True
+    with phase("wait", url=page.url, page=page):
+        try:
+            if selector:
+                conditions.append(f"selector={selector}")
+                await _wait_selector(page, selector, deadline)
+            if title:
+                conditions.append("title")
+                await _wait_title(page, title, deadline)
+            if network_quiet:
+                conditions.append("network_quiet")
+                await _wait_network_quiet(page, deadline)
+        except Exception as e:
+            ready = False
+            print(f"  Not ready after {timeout}ms [{label or page.url}]: {str(e).splitlines()[0] if str(e) else type(e).__name__}")
+
+    waited_ms = int((time.monotonic() - started) * 1000)
+    WAIT_LOG.append({
+        "label": label,
+        "url": page.url,
+        "waited_ms": waited_ms,
+        "ready": ready,
+        "conditions": conditions,
+    })
+    return ready
+
+
+def wait_summary():
+    """Totals per label: {label: {"count", "total_ms", "max_ms", "timeouts"}}"""
+    summary = {}
+    for rec in WAIT_LOG:
+        s = summary.setdefault(rec["label"] or "(unlabelled)", {"count": 0, "total_ms": 0, "max_ms": 0, "timeouts": 0})
+        s["count"] += 1
+        s["total_ms"] += rec["waited_ms"]
+        s["max_ms"] = max(s["max_ms"], rec["waited_ms"])
+        if not rec["ready"]:
+            s["timeouts"] += 1
+    return summary
+
+
+def print_wait_summary():
+    summary = wait_summary()
+    if not summary:
+        return
+    total = sum(s["total_ms"] for s in summary.values())
+    print(f"Readiness waits: {len(WAIT_LOG)} pages, {total / 1000:.1f}s total")
+    for label, s in sorted(summary.items()):
+        print(f"  {label:<24} n={s['count']:<3} total={s['total_ms']:>6}ms max={s['max_ms']:>5}ms timeouts={s['timeouts']}")
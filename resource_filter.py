@@ -0,0 +1,194 @@
+import json
+import os
+from urllib.parse import urlparse, urlsplit
+
+# Learned response sizes (size_key(url) -> bytes), used to estimate what a blocked request would have cost.
+# Filled in whenever a resource is actually downloaded, e.g. on a run with --no-block.
+SIZE_CACHE_FILE = os.path.join(".cache", "resource_sizes.json")
+# Most recently seen entries kept when saving; cache-busting and tracking URLs would grow it forever
+MAX_SIZE_ENTRIES = 5000
+
+# Playwright resource types we never need for price extraction
+DEFAULT_BLOCKED_TYPES = {"image", "media", "font"}
+
+# Analytics / ads / chat widgets seen on the carrier sites (matched as host suffixes)
+TRACKER_DOMAINS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "facebook.net",
+    "facebook.com",
+    "bat.bing.com",
+    "clarity.ms",
+    "hotjar.com",
+    "criteo.com",
+    "criteo.net",
+    "yjtag.jp",
+    "ads.yahoo.co.jp",
+    "adobedtm.com",
+    "omtrdc.net",
+    "demdex.net",
+    "karte.io",
+    "analytics.tiktok.com",
+    "treasuredata.com",
+    "app.chatplus.jp",
+    "zopim.com",
+]
+
+# Per-carrier overrides. "allow"/"deny" are host suffixes or URL substrings;
+# "allow_types" re-enables a resource type for that carrier.
+# allow wins over deny, deny wins over the defaults.
+CARRIER_RULES = {
+    "Rakuten": {
+        "deny": ["rat.rakuten.co.jp"],
+    },
+    "ahamo": {},
+    "UQ mobile": {},
+    "au": {},
+    "SoftBank": {},
+    "docomo": {},
+}
+
+
+def _matches(url, host, patterns):
+    for pat in patterns:
+        if host == pat or host.endswith("." + pat) or pat in url:
+            return True
+    return False
+
+
+def size_key(url):
+    """scheme://host/path: the query string is usually a cache-buster or tracking id, not a different resource."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}{parts.path}"
+
+
+def load_size_cache(path=SIZE_CACHE_FILE):
+    try:
+        with open(path, encoding="utf-8") as f:
+            sizes = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # Older files were keyed by the full URL
+    return {size_key(url): size for url, size in sizes.items()}
+
+
+def save_size_cache(sizes, path=SIZE_CACHE_FILE, max_entries=MAX_SIZE_ENTRIES):
+    """Write the `max_entries` most recently seen sizes (the dict is kept in last-seen order)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(dict(list(sizes.items())[-max_entries:]), f)
+    os.replace(tmp, path)
+
+
+class ResourceFilter:
+    """
+    Aborts requests for images, media, fonts and trackers on a BrowserContext.
+
+        rf = ResourceFilter.for_carrier("docomo", size_cache)
+        await rf.install(context)
+        ...
+        print(rf.stats())
+    """
+
+    def __init__(self, carrier="", blocked_types=None, allow=None, deny=None, allow_types=None,
+                 enabled=True, size_cache=None):
+        self.carrier = carrier
+        self.blocked_types = set(DEFAULT_BLOCKED_TYPES if blocked_types is None else blocked_types)
+        self.blocked_types -= set(allow_types or [])
+        self.allow = list(allow or [])
+        self.deny = list(TRACKER_DOMAINS) + list(deny or [])
+        self.enabled = enabled
+        self.size_cache = size_cache if size_cache is not None else {}
+        self.blocked_requests = 0
+        self.blocked_bytes_est = 0
+        self.blocked_unknown_size = 0
+        self.blocked_by_reason = {}
+        self.allowed_requests = 0
+        self.allowed_bytes = 0
+
+    @classmethod
+    def for_carrier(cls, carrier, size_cache=None, enabled=True):
+        rules = CARRIER_RULES.get(carrier, {})
+        return cls(
+            carrier=carrier,
+            allow=rules.get("allow"),
+            deny=rules.get("deny"),
+            allow_types=rules.get("allow_types"),
+            enabled=enabled,
+            size_cache=size_cache,
+        )
+
+    def block_reason(self, url, resource_type):
+        """Why this request should be blocked, or None to let it through."""
+        host = urlparse(url).hostname or ""
+        if _matches(url, host, self.allow):
+            return None
+        if _matches(url, host, self.deny):
+            return "tracker"
+        if resource_type in self.blocked_types:
+            return resource_type
+        return None
+
+    async def _handle_route(self, route):
+        request = route.request
+        reason = self.block_reason(request.url, request.resource_type) if self.enabled else None
+        if reason is None:
+            await route.fallback()
+            return
+
+        self.blocked_requests += 1
+        self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + 1
+        size = self.size_cache.get(size_key(request.url))
+        if size is None:
+            self.blocked_unknown_size += 1
+        else:
+            self.blocked_bytes_est += size
+        await route.abort("blockedbyclient")
+
+    async def _on_request_finished(self, request):
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return
+        size = sizes.get("responseBodySize", 0) + sizes.get("responseHeadersSize", 0)
+        self.allowed_requests += 1
+        self.allowed_bytes += size
+        key = size_key(request.url)
+        self.size_cache.pop(key, None)  # move to the end: last seen
+        self.size_cache[key] = size
+
+    async def install(self, context):
+        await context.route("**/*", self._handle_route)
+        context.on("requestfinished", self._on_request_finished)
+
+    def stats(self):
+        return {
+            "carrier": self.carrier,
+            "blocked_requests": self.blocked_requests,
+            "blocked_bytes_est": self.blocked_bytes_est,
+            "blocked_unknown_size": self.blocked_unknown_size,
+            "blocked_by_reason": dict(self.blocked_by_reason),
+            "allowed_requests": self.allowed_requests,
+            "allowed_bytes": self.allowed_bytes,
+        }
+
+
+def print_filter_summary(filters):
+    if not filters:
+        return
+    print("Resource filter:")
+    total_blocked = total_est = total_allowed = 0
+    for rf in filters:
+        s = rf.stats()
+        total_blocked += s["blocked_requests"]
+        total_est += s["blocked_bytes_est"]
+        total_allowed += s["allowed_bytes"]
+        reasons = ", ".join(f"{k}={v}" for k, v in sorted(s["blocked_by_reason"].items()))
+        print(f"  {s['carrier']:<10} blocked={s['blocked_requests']:<4} (~{s['blocked_bytes_est'] / 1024:.0f} KB saved, "
+              f"{s['blocked_unknown_size']} unknown size) downloaded={s['allowed_bytes'] / 1024:.0f} KB [{reasons}]")
+    print(f"  Total: blocked {total_blocked} requests, ~{total_est / 1024 / 1024:.1f} MB saved, "
+          f"{total_allowed / 1024 / 1024:.1f} MB downloaded")
@@ -0,0 +1,231 @@
+"""
+Long-lived scraper that keeps Chromium, one context per carrier and the HTTP
+client warm between runs, so a refresh only costs the page work: no browser
+launch, a primed HTTP cache and already-open connections to the six hosts.
+
+    python scrape_daemon.py serve                     # run in the foreground (Ctrl-C or `stop` to quit)
+    python scrape_daemon.py scrape                    # all carriers, written like main.py does
+    python scrape_daemon.py scrape SoftBank au        # refresh some carriers, merged into data.json
+    python scrape_daemon.py scrape SoftBank --no-write --json   # just print the items
+    python scrape_daemon.py status | stop
+
+Jobs are JSON lines over a unix socket (.cache/scraper.sock):
+
+    {"cmd": "scrape", "carriers": ["SoftBank"], "write": true}
+    -> {"ok": true, "seconds": 8.2, "carriers": {"SoftBank": 21}, "updated_at": "...", "items": [...] (write=false only)}
+
+One job runs at a time; the others wait. A partial refresh replaces only those
+carriers' items in the output file; a carrier that comes back empty keeps its
+previous items, so a transient failure doesn't blank it until the next full run.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from playwright.async_api import async_playwright
+
+from changes import load_previous
+from http_fetch import PATH_LOG, close_client, configure as configure_http
+from incremental import PAGE_STATE
+from instrumentation import start_run
+from main import CARRIER_SCRAPERS, CONTEXT_OPTIONS, DATA_FILE, DEFAULT_CONCURRENCY, WarmContexts, save_outputs, scrape_all
+from readiness import WAIT_LOG
+
+SOCKET_PATH = os.path.join(".cache", "scraper.sock")
+# Responses carry the items, so allow lines well past asyncio's 64 KiB default
+STREAM_LIMIT = 16 * 1024 * 1024
+
+
+def merge_items(previous, items, carriers):
+    """previous data.json items with `carriers` replaced by `items`, in CARRIER_SCRAPERS order."""
+    fresh = {}
+    for item in items:
+        fresh.setdefault(item["carrier"], []).append(item)
+    old = {}
+    for item in (previous or {}).get("items", []):
+        old.setdefault(item["carrier"], []).append(item)
+    merged = []
+    for name, _ in CARRIER_SCRAPERS:
+        if name in carriers and fresh.get(name):
+            merged.extend(fresh[name])
+        else:
+            if name in carriers and old.get(name):
+                print(f"[{name}] No items this time, keeping the previous {len(old[name])}")
+            merged.extend(old.get(name, []))
+    return merged
+
+
+class ScrapeDaemon:
+    def __init__(self, output=DATA_FILE, concurrency=DEFAULT_CONCURRENCY, block_resources=True, use_http=True,
+                 incremental=True, history=True, browser_cache=True):
+        self.output = output
+        self.concurrency = concurrency
+        self.block_resources = block_resources
+        self.use_http = use_http
+        self.incremental = incremental
+        self.history = history
+        self.browser_cache = browser_cache
+        self._playwright = None
+        self.browser = None
+        self.contexts = None
+        self.jobs_done = 0
+        self.started = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._stop = asyncio.Event()
+
+    async def _ensure_browser(self, playwright):
+        if self.browser is not None and self.browser.is_connected():
+            return
+        if self.browser is not None:
+            print("Browser went away, relaunching")
+        self.browser = await playwright.chromium.launch(headless=True)
+        self.contexts = WarmContexts(self.browser)
+
+    async def scrape(self, carriers=None, write=True):
+        names = [name for name, _ in CARRIER_SCRAPERS]
+        unknown = [c for c in carriers or [] if c not in names]
+        if unknown:
+            return {"ok": False, "error": f"unknown carrier(s) {unknown}; expected some of {names}"}
+        async with self._lock:
+            started = time.monotonic()
+            # Per-run logs; the warm state (contexts, HTTP client, page state) carries over
+            start_run()
+            WAIT_LOG.clear()
+            PATH_LOG.clear()
+            await self._ensure_browser(self._playwright)
+            items = await scrape_all(self.browser, self.concurrency, self.block_resources,
+                                     carriers=carriers or None, contexts=self.contexts, browser_cache=self.browser_cache)
+            result = {"ok": True, "carriers": {}}
+            for item in items:
+                result["carriers"][item["carrier"]] = result["carriers"].get(item["carrier"], 0) + 1
+            if write:
+                if carriers:
+                    items = merge_items(load_previous(self.output), items, carriers)
+                # A partial refresh would re-record the other carriers' old prices as if seen now
+                saved = save_outputs(items, self.output, started, history=self.history and not carriers)
+                result["updated_at"] = saved["updated_at"]
+            else:
+                result["items"] = items
+            self.jobs_done += 1
+            result["seconds"] = round(time.monotonic() - started, 1)
+            return result
+
+    def status(self):
+        return {
+            "ok": True,
+            "uptime_seconds": round(time.monotonic() - self.started),
+            "jobs_done": self.jobs_done,
+            "busy": self._lock.locked(),
+            "warm_contexts": sorted(self.contexts.contexts) if self.contexts else [],
+            "output": self.output,
+        }
+
+    async def _handle(self, reader, writer):
+        try:
+            line = await reader.readline()
+            try:
+                job = json.loads(line)
+                cmd = job.get("cmd")
+                if cmd == "scrape":
+                    response = await self.scrape(job.get("carriers"), job.get("write", True))
+                elif cmd == "status":
+                    response = self.status()
+                elif cmd == "stop":
+                    self._stop.set()
+                    response = {"ok": True}
+                else:
+                    response = {"ok": False, "error": f"unknown command {cmd!r}"}
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            writer.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path=SOCKET_PATH):
+        configure_http(enabled=self.use_http, user_agent=CONTEXT_OPTIONS["user_agent"])
+        PAGE_STATE.enabled = self.incremental
+        if PAGE_STATE.enabled:
+            PAGE_STATE.load()
+        os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+        if os.path.exists(socket_path):
+            os.remove(socket_path)  # left over from a daemon that didn't shut down cleanly
+        async with async_playwright() as p:
+            self._playwright = p
+            await self._ensure_browser(p)
+            server = await asyncio.start_unix_server(self._handle, socket_path, limit=STREAM_LIMIT)
+            print(f"Scrape daemon listening on {socket_path} (output: {self.output})")
+            try:
+                async with server:
+                    await self._stop.wait()
+            finally:
+                if os.path.exists(socket_path):
+                    os.remove(socket_path)
+                await self.contexts.close()
+                await self.browser.close()
+                await close_client()
+        print(f"Scrape daemon stopped after {self.jobs_done} job(s)")
+
+
+async def send(job, socket_path=SOCKET_PATH):
+    """Send one job to a running daemon and return its response."""
+    reader, writer = await asyncio.open_unix_connection(socket_path, limit=STREAM_LIMIT)
+    try:
+        writer.write((json.dumps(job) + "\n").encode("utf-8"))
+        await writer.drain()
+        return json.loads(await reader.readline())
+    finally:
+        writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm scraper daemon and its client")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="unix socket path (default: %(default)s)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    serve = sub.add_parser("serve", help="run the daemon in the foreground")
+    serve.add_argument("--output", default=DATA_FILE)
+    serve.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    serve.add_argument("--no-block", dest="block_resources", action="store_false")
+    serve.add_argument("--no-http", dest="use_http", action="store_false")
+    serve.add_argument("--full", dest="incremental", action="store_false")
+    serve.add_argument("--no-history", dest="history", action="store_false")
+    serve.add_argument("--no-browser-cache", dest="browser_cache", action="store_false")
+    scrape = sub.add_parser("scrape", help="run a scrape job on the daemon")
+    scrape.add_argument("carriers", nargs="*", help="carrier names as in the data (default: all)")
+    scrape.add_argument("--no-write", dest="write", action="store_false", help="return the items instead of saving them")
+    scrape.add_argument("--json", action="store_true", help="print the raw response")
+    sub.add_parser("status", help="show what the daemon is doing")
+    sub.add_parser("stop", help="shut the daemon down")
+    args = parser.parse_args()
+
+    if args.cmd == "serve":
+        daemon = ScrapeDaemon(args.output, args.concurrency, args.block_resources, args.use_http,
+                              args.incremental, args.history, args.browser_cache)
+        try:
+            asyncio.run(daemon.serve(args.socket))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    job = {"cmd": args.cmd}
+    if args.cmd == "scrape":
+        job.update(carriers=args.carriers or None, write=args.write)
+    try:
+        response = asyncio.run(send(job, args.socket))
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"No scrape daemon on {args.socket}; start one with `python scrape_daemon.py serve`")
+        return 1
+    if args.cmd != "scrape" or args.json or not response.get("ok"):
+        print(json.dumps(response, ensure_ascii=False, indent=2))
+    else:
+        counts = ", ".join(f"{name} {n}" for name, n in response["carriers"].items())
+        print(f"Scraped in {response['seconds']}s: {counts or 'no items'}"
+              + (f" -> saved ({response['updated_at']})" if "updated_at" in response else ""))
+    return 0 if response.get("ok") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Per-carrier and per-model shards of data.json for embeds that show a subset.
+
+Next to docs/data.json we write docs/data/:
+
+    data/carrier/<slug>.json      {"updated_at", "items"} for one carrier
+    data/model/<slug>.json        {"updated_at", "items"} for one model
+    data/manifest.json            facet counts + file and content hash per shard
+
+A widget mounted with `carriers: [...]` or `models: [...]` reads the manifest
+and fetches only those shards, as `<file>?v=<hash>`: a shard's URL only changes
+when its items do, so CDN and browser caches stay warm across runs where that
+carrier/model didn't change. Shard files are only rewritten when their items change,
+so their own "updated_at" can be older than the manifest's; the widget shows the manifest's.
+"""
+import hashlib
+import json
+import os
+
+from items import slugify
+
+MANIFEST_VERSION = 1
+
+
+def shard_root(data_path):
+    """docs/data.json -> docs/data/"""
+    return os.path.splitext(data_path)[0]
+
+
+def _write(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+
+
+def _group(items, key):
+    groups = {}
+    for item in items:
+        groups.setdefault(item[key], []).append(item)
+    return groups
+
+
+def write_shards(data, data_path):
+    """Write the shards and manifest for data. Returns (manifest, number of shard files rewritten)."""
+    root = shard_root(data_path)
+    items = data["items"]
+    manifest = {"version": MANIFEST_VERSION, "updated_at": data.get("updated_at"), "count": len(items)}
+    written = 0
+    for kind in ("carrier", "model"):
+        entries = {}
+        for value, group in _group(items, kind).items():
+            rel = f"{kind}/{slugify(value)}.json"
+            # Hash the items only: updated_at changes every run and would bust every shard
+            body = json.dumps(group, ensure_ascii=False, separators=(",", ":"))
+            path = os.path.join(root, rel)
+            if _is_stale(path, body):
+                payload = json.dumps({"updated_at": data.get("updated_at"), "items": group},
+                                     ensure_ascii=False, separators=(",", ":"))
+                _write(path, payload.encode("utf-8"))
+                written += 1
+            entries[value] = {"file": rel, "count": len(group),
+                              "hash": hashlib.sha256(body.encode("utf-8")).hexdigest()[:12]}
+        _remove_orphans(os.path.join(root, kind), {e["file"].split("/", 1)[1] for e in entries.values()})
+        manifest[f"{kind}s"] = entries
+    manifest["storages"] = {value: len(group) for value, group in _group(items, "storage").items()}
+
+    _write(os.path.join(root, "manifest.json"), json.dumps(manifest, ensure_ascii=False, indent=1).encode("utf-8"))
+    return manifest, written
+
+
+def _is_stale(path, body):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.dumps(json.load(f).get("items"), ensure_ascii=False, separators=(",", ":")) != body
+    except (OSError, ValueError):
+        return True
+
+
+def _remove_orphans(directory, keep):
+    """Delete shards for carriers/models that are no longer in the data."""
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    for name in names:
+        if name.endswith(".json") and name not in keep:
+            os.remove(os.path.join(directory, name))
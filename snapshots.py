@@ -0,0 +1,174 @@
+"""
+Offline HTML snapshot store.
+
+Layout (default directory: snapshots/):
+    manifest.json                 {"version": 1, "entries": {url: {"sha256", "size", "recorded_at"}}}
+    objects/<aa>/<sha256>.html.gz gzip'd final HTML, content-addressed (identical pages are stored once)
+
+`python main.py --record` saves the final HTML of every page the scrapers navigate to.
+`python main.py --replay` serves those snapshots through route fulfilment, with no network access,
+so parser changes can be re-run and timed in seconds.
+
+    python snapshots.py list                  # show what is recorded
+    python snapshots.py import URL FILE.html  # add an existing dump (e.g. docomo_detail.html)
+"""
+import gzip
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+
+DEFAULT_SNAPSHOT_DIR = "snapshots"
+MANIFEST_VERSION = 1
+
+
+def normalize_url(url):
+    # Fragments never reach the server, so they don't identify a different page
+    return url.split("#", 1)[0]
+
+
+class SnapshotStore:
+    def __init__(self, root=DEFAULT_SNAPSHOT_DIR):
+        self.root = root
+        self.manifest_path = os.path.join(root, "manifest.json")
+        self.entries = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.entries = json.load(f).get("entries", {})
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], digest + ".html.gz")
+
+    def put(self, url, html):
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + ".tmp"
+            # mtime=0 keeps the .gz bytes stable for identical content
+            with open(tmp, "wb") as f:
+                f.write(gzip.compress(data, mtime=0))
+            os.replace(tmp, path)
+        self.entries[normalize_url(url)] = {
+            "sha256": digest,
+            "size": len(data),
+            "recorded_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        return digest
+
+    def get(self, url):
+        """Return the recorded HTML for url, or None."""
+        entry = self.entries.get(normalize_url(url))
+        if entry is None:
+            return None
+        with open(self._object_path(entry["sha256"]), "rb") as f:
+            return gzip.decompress(f.read()).decode("utf-8")
+
+    def urls(self):
+        return sorted(self.entries)
+
+    def save(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "entries": self.entries}, f, indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
+
+
+class SnapshotRecorder:
+    """
+    Records each page's final HTML into a SnapshotStore.
+
+    A page is captured when it fires `load`, again right before it navigates
+    away (so late JS rendering is included), and once more when the carrier's
+    context is closed. The latest capture of a URL wins.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.recorded = 0
+
+    async def capture(self, page):
+        url = page.url
+        if not url.startswith("http"):
+            return
+        try:
+            html = await page.content()
+        except Exception:
+            return  # page is mid-navigation or already closed
+        self.store.put(url, html)
+        self.recorded += 1
+
+    async def _on_route(self, route):
+        request = route.request
+        if request.is_navigation_request() and request.frame.parent_frame is None:
+            await self.capture(request.frame.page)
+        await route.fallback()
+
+    def _watch_page(self, page):
+        async def on_load(_):
+            await self.capture(page)
+        page.on("load", on_load)
+
+    async def install(self, context):
+        await context.route("**/*", self._on_route)
+        for page in context.pages:
+            self._watch_page(page)
+        context.on("page", self._watch_page)
+
+    async def before_close(self, context):
+        for page in context.pages:
+            await self.capture(page)
+
+
+class SnapshotReplayer:
+    """Serves documents from a SnapshotStore and aborts every other request, so runs are fully offline."""
+
+    def __init__(self, store):
+        self.store = store
+        self.served = 0
+        self.missing = []
+
+    async def _on_route(self, route):
+        request = route.request
+        if request.resource_type != "document":
+            await route.abort("blockedbyclient")
+            return
+        html = self.store.get(request.url)
+        if html is None:
+            self.missing.append(request.url)
+            print(f"  Replay: no snapshot for {request.url}")
+            await route.fulfill(status=404, content_type="text/html; charset=utf-8", body="<html><body></body></html>")
+            return
+        self.served += 1
+        await route.fulfill(status=200, content_type="text/html; charset=utf-8", body=html)
+
+    async def install(self, context):
+        await context.route("**/*", self._on_route)
+
+
+def _cli(argv):
+    if len(argv) >= 1 and argv[0] == "list":
+        store = SnapshotStore()
+        for url in store.urls():
+            e = store.entries[url]
+            print(f"{e['recorded_at']}  {e['size']:>8}  {e['sha256'][:12]}  {url}")
+        print(f"{len(store.entries)} snapshots in {store.root}/")
+    elif len(argv) == 3 and argv[0] == "import":
+        url, path = argv[1], argv[2]
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        store = SnapshotStore()
+        digest = store.put(url, html)
+        store.save()
+        print(f"Imported {path} as {url} ({digest[:12]})")
+    else:
+        print(__doc__)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_cli(sys.argv[1:]))
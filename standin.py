@@ -0,0 +1,211 @@
+"""
+Local stand-in for the six carrier sites, for deterministic end-to-end load tests.
+
+Serves the pages of a snapshot store (`python main.py --record`) over plain
+HTTP, one port per carrier starting at --port (in CARRIER_ORIGINS order), under
+the real sites' paths: http://127.0.0.1:8800/product/iphone/fee/ is Rakuten's
+https://network.mobile.rakuten.co.jp/product/iphone/fee/, 8803 is au, and so on.
+Latency, jitter, errors and rate limiting are configurable and seeded:
+
+    python standin.py --latency 150 --jitter 100 --error-rate 0.05 --rate-limit 5
+    python main.py --base-url http://127.0.0.1:8800        # -> standin_data.json
+
+With --base-url, main.py rewrites every request to a carrier origin to its
+stand-in port (in the browser through StandInRouter, on the HTTP fast path
+through http_fetch), so page URLs, hrefs and items keep the real origins.
+Requests to any other host are aborted.
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+from snapshots import DEFAULT_SNAPSHOT_DIR, SnapshotStore, normalize_url
+
+CARRIER_ORIGINS = {
+    "Rakuten": "https://network.mobile.rakuten.co.jp",
+    "ahamo": "https://ahamo.com",
+    "UQ mobile": "https://www.uqwimax.jp",
+    "au": "https://www.au.com",
+    "SoftBank": "https://www.softbank.jp",
+    "docomo": "https://onlineshop.docomo.ne.jp",
+}
+DEFAULT_PORT = 8800
+
+_REASONS = {200: "OK", 304: "Not Modified", 404: "Not Found", 429: "Too Many Requests", 500: "Internal Server Error"}
+
+
+def origin_map(base_url):
+    """{real origin: stand-in origin} for a base URL like http://127.0.0.1:8800"""
+    base = urlsplit(base_url)
+    port = base.port or DEFAULT_PORT
+    return {origin: f"{base.scheme}://{base.hostname}:{port + i}" for i, origin in enumerate(CARRIER_ORIGINS.values())}
+
+
+def rewrite_url(url, mapping):
+    """The stand-in URL for a carrier URL, or None for any other host."""
+    parts = urlsplit(url)
+    target = mapping.get(f"{parts.scheme}://{parts.netloc}")
+    if target is None:
+        return None
+    return target + url[len(parts.scheme) + 3 + len(parts.netloc):]
+
+
+class StandInRouter:
+    """
+    run_carrier hook: sends carrier-origin requests to the stand-in server and aborts the rest.
+
+    Install it before the other routing hooks: Playwright tries the most recently
+    registered route first, so the resource filter still gets to block things.
+    """
+
+    def __init__(self, mapping):
+        self.mapping = mapping
+        self.rewritten = 0
+        self.aborted = 0
+
+    async def _on_route(self, route):
+        target = rewrite_url(route.request.url, self.mapping)
+        if target is None:
+            self.aborted += 1
+            await route.abort("blockedbyclient")
+            return
+        self.rewritten += 1
+        try:
+            response = await route.fetch(url=target)
+        except Exception:
+            await route.abort("connectionrefused")
+            return
+        await route.fulfill(response=response)
+
+    async def install(self, context):
+        await context.route("**/*", self._on_route)
+
+
+class StandInSite:
+    """One carrier's pages plus the fault model. respond() never raises."""
+
+    def __init__(self, name, origin, store, rng, latency_ms=0, jitter_ms=0, error_rate=0.0, rate_limit=0):
+        self.name = name
+        self.origin = origin
+        self.store = store
+        self.rng = rng
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self._recent = deque()
+        self.counts = {}
+
+    def _rate_limited(self):
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] >= 1.0:
+            self._recent.popleft()
+        if len(self._recent) >= self.rate_limit:
+            return True
+        self._recent.append(now)
+        return False
+
+    async def respond(self, target, headers):
+        """(status, headers, body) for a request target like "/iphone/?x=1"."""
+        delay = self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if self._rate_limited():
+            status, extra, body = 429, {"Retry-After": "1"}, b"rate limited"
+        elif self.rng.random() < self.error_rate:
+            status, extra, body = 500, {}, b"injected error"
+        else:
+            url = normalize_url(self.origin + target)
+            entry = self.store.entries.get(url)
+            if entry is None:
+                status, extra, body = 404, {}, b"<html><body></body></html>"
+            else:
+                etag = f'"{entry["sha256"][:16]}"'
+                if headers.get("if-none-match") == etag:
+                    status, extra, body = 304, {"ETag": etag}, b""
+                else:
+                    status, extra, body = 200, {"ETag": etag}, self.store.get(url).encode("utf-8")
+        self.counts[status] = self.counts.get(status, 0) + 1
+        return status, dict(extra, **{"Content-Type": "text/html; charset=utf-8"}), body
+
+    async def handle(self, reader, writer):
+        """Minimal HTTP/1.1 with keep-alive: GET/HEAD only, no request bodies."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target = request_line.decode("latin-1").split(" ", 2)[:2]
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                status, response_headers, body = await self.respond(target, headers)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}", f"Content-Length: {len(body)}",
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+                head += [f"{k}: {v}" for k, v in response_headers.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + (b"" if method == "HEAD" else body))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(store, host="127.0.0.1", port=DEFAULT_PORT, seed=0, **faults):
+    """Run one StandInSite per carrier until cancelled. Returns nothing; prints per-carrier counts on exit."""
+    rng = random.Random(seed)
+    sites = []
+    servers = []
+    for i, (name, origin) in enumerate(CARRIER_ORIGINS.items()):
+        site = StandInSite(name, origin, store, rng, **faults)
+        sites.append(site)
+        servers.append(await asyncio.start_server(site.handle, host, port + i))
+        pages = sum(1 for url in store.entries if url.startswith(origin + "/"))
+        print(f"  {name:<10} http://{host}:{port + i}/  ({pages} pages, as {origin})")
+    try:
+        await asyncio.gather(*[s.serve_forever() for s in servers])
+    finally:
+        for s in servers:
+            s.close()
+        for site in sites:
+            if site.counts:
+                print(f"  {site.name:<10} " + " ".join(f"{status}={n}" for status, n in sorted(site.counts.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded carrier pages locally with simulated latency and faults")
+    parser.add_argument("--snapshots", default=DEFAULT_SNAPSHOT_DIR, metavar="DIR",
+                        help="snapshot store to serve (default: %(default)s/)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="first port; carriers use port..port+5")
+    parser.add_argument("--latency", type=float, default=0, metavar="MS", help="added delay per response")
+    parser.add_argument("--jitter", type=float, default=0, metavar="MS", help="+/- uniform noise on the delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with a 500")
+    parser.add_argument("--rate-limit", type=int, default=0, metavar="N",
+                        help="per carrier, answer 429 beyond N requests per second (0: unlimited)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for jitter and injected errors")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.snapshots)
+    print(f"Serving {len(store.entries)} snapshots from {args.snapshots}/")
+    try:
+        asyncio.run(serve(store, args.host, args.port, seed=args.seed, latency_ms=args.latency,
+                          jitter_ms=args.jitter, error_rate=args.error_rate, rate_limit=args.rate_limit))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
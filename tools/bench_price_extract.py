@@ -0,0 +1,83 @@
+"""
+Microbenchmark: inline lazy regexes (the old scraper code) vs price_extract's
+one-pass LabelExtractor, on the HTML dumps saved in the repo root.
+
+    python tools/bench_price_extract.py [-n 50] [extra.html ...]
+
+Also checks that both approaches find the same amounts.
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from price_extract import DOCOMO_LABELS, SOFTBANK_LABELS  # noqa: E402
+
+DEFAULT_DUMPS = ["docomo_detail.html", "debug_stock_dump.html", "rakuten_section_dump.html"]
+
+
+def legacy_docomo(content):
+    found = {}
+    for key, pattern in [
+        ("gross", r'現金販売価格.*?([\d,]+)円'),
+        ("gross_total", r'支払い総額.*?([\d,]+)円'),
+        ("rent", r'お客さま負担額.*?([\d,]+)円'),
+        ("rent_alt", r'実質負担金.*?([\d,]+)円'),
+    ]:
+        m = re.search(pattern, content)
+        if m:
+            found[key] = int(m.group(1).replace(',', ''))
+    return found
+
+
+def legacy_softbank(content):
+    found = {}
+    for key, pattern in [
+        ("gross", r'総額.*?([\d,]+)円'),
+        ("rent", r'実質負担金.*?([\d,]+)円'),
+        ("1～12回", r'1[～~]12回.*?([\d,]+)円'),
+        ("13～24回", r'13[～~]24回.*?([\d,]+)円'),
+        ("25～48回", r'25[～~]48回.*?([\d,]+)円'),
+    ]:
+        m = re.search(pattern, content)
+        if m:
+            found[key] = int(m.group(1).replace(',', ''))
+    return found
+
+
+CASES = [
+    ("docomo", legacy_docomo, DOCOMO_LABELS.extract),
+    ("softbank", legacy_softbank, SOFTBANK_LABELS.extract),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="*", help="extra HTML files to include")
+    parser.add_argument("-n", "--number", type=int, default=50, help="iterations per measurement")
+    args = parser.parse_args()
+
+    paths = [os.path.join(ROOT, f) for f in DEFAULT_DUMPS] + args.files
+    print(f"{'file':<28} {'labels':<9} {'legacy ms':>10} {'one-pass ms':>12} {'speedup':>8}  match")
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"{os.path.basename(path):<28} (missing)")
+            continue
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        for name, legacy, fast in CASES:
+            t_legacy = min(timeit.repeat(lambda: legacy(html), number=args.number, repeat=3)) / args.number * 1000
+            t_fast = min(timeit.repeat(lambda: fast(html), number=args.number, repeat=3)) / args.number * 1000
+            same = legacy(html) == fast(html)
+            print(f"{os.path.basename(path):<28} {name:<9} {t_legacy:>10.3f} {t_fast:>12.3f} {t_legacy / t_fast:>7.1f}x  {'ok' if same else 'DIFF'}")
+            if not same:
+                print(f"    legacy:   {legacy(html)}")
+                print(f"    one-pass: {fast(html)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+Offline benchmark of the carriers' extraction paths, end to end in Chromium.
+
+The HTML dumps in the repo root are served under their carrier URLs through the
+snapshot replayer (snapshots.py), which aborts every other request, so this
+runs without network access. Each case navigates, waits for readiness, extracts
+and parses exactly like the scraper does, `--runs` times, and reports p50/p95
+durations, item counts and Playwright protocol calls. The pure-Python parsers
+are also timed on their own, so a box without Chromium still gets those cases.
+
+    python tools/bench_scrapers.py                          # fixture cases
+    python tools/bench_scrapers.py --snapshots snapshots    # + every carrier's full scraper over a recorded store
+    python tools/bench_scrapers.py --save-baseline          # store the results as the new baseline
+
+Cases whose p50 is more than `--threshold` slower than the baseline, whose item
+count changed or that found no items at all are flagged and make the exit status 1,
+as do browser cases that were skipped because Chromium couldn't be launched
+(unless --allow-skip). Cases without a baseline entry, or whose entry has no
+timings yet (p50_ms null: only the item count is checked), are reported as such;
+--save-baseline fills them in and keeps the entries of cases that didn't run.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from playwright.async_api import async_playwright  # noqa: E402
+
+from dom_extract import extract  # noqa: E402
+from html_utils import html_title  # noqa: E402
+from http_fetch import configure as configure_http, fetch_page  # noqa: E402
+from instrumentation import PhaseMetrics, goto, phase  # noqa: E402
+from main import (  # noqa: E402
+    CARRIER_SCRAPERS, CONTEXT_OPTIONS, RAKUTEN_FEE_SCHEMA, RAKUTEN_STOCK_SCHEMA,
+    parse_docomo_detail, parse_rakuten_fee, parse_rakuten_stock,
+)
+from readiness import wait_ready  # noqa: E402
+from snapshots import SnapshotReplayer, SnapshotStore  # noqa: E402
+
+BASELINE_FILE = os.path.join(ROOT, "tools", "bench_baseline.json")
+BASELINE_VERSION = 1
+DEFAULT_RUNS = 20
+WARMUP_RUNS = 2
+DEFAULT_THRESHOLD = 0.25
+
+RAKUTEN_STOCK_URL = "https://network.mobile.rakuten.co.jp/product/iphone/stock/"
+RAKUTEN_FEE_URL = "https://network.mobile.rakuten.co.jp/product/iphone/fee/"
+# The dump's own URL wasn't kept; any detail-page path on the right host will do
+DOCOMO_DETAIL_URL = "https://onlineshop.docomo.ne.jp/products/mobile/details/iphone-17-pro.html"
+
+
+async def bench_rakuten_stock(page):
+    await goto(page, RAKUTEN_STOCK_URL)
+    await wait_ready(page, selector=".product-iphone-stock-Layout_Product-name", label="rakuten:stock")
+    stock_map = parse_rakuten_stock(await extract(page, RAKUTEN_STOCK_SCHEMA))
+    return sum(len(variants) for storages in stock_map.values() for variants in storages.values())
+
+
+async def bench_rakuten_fee(page):
+    await goto(page, RAKUTEN_FEE_URL)
+    await wait_ready(page, selector=".product-iphone-Fee_Media table", label="rakuten:fee")
+    sections = await extract(page, RAKUTEN_FEE_SCHEMA)
+    if len(sections) == 0:
+        sections = await extract(page, dict(RAKUTEN_FEE_SCHEMA, selector="section"))
+    return len(parse_rakuten_fee(sections, {}, {}, RAKUTEN_FEE_URL))
+
+
+async def bench_docomo_detail(page):
+    doc = await fetch_page(page, DOCOMO_DETAIL_URL, "docomo", ready=dict(
+        selector="text=現金販売価格", title=lambda t: "|" in t and "iPhone" in t, label="docomo:detail"))
+    return len(parse_docomo_detail(doc.html, doc.title, DOCOMO_DETAIL_URL))
+
+
+# rakuten_section_dump.html is the inside of one fee section; give it back the element the schema looks for
+FEE_SECTION_PAGE = '<html><body><div class="product-iphone-Fee_Media">{}</div></body></html>'
+
+# (case, url, dump in the repo root, page template for the dump or None, coroutine(page) -> item count)
+FIXTURE_CASES = [
+    ("rakuten:stock", RAKUTEN_STOCK_URL, "debug_stock_dump.html", None, bench_rakuten_stock),
+    ("rakuten:fee", RAKUTEN_FEE_URL, "rakuten_section_dump.html", FEE_SECTION_PAGE, bench_rakuten_fee),
+    ("docomo:detail", DOCOMO_DETAIL_URL, "docomo_detail.html", None, bench_docomo_detail),
+]
+
+# Browser-free cases: (case, dump, function(html) -> item count)
+PARSE_CASES = [
+    ("docomo:parse", "docomo_detail.html",
+     lambda html: len(parse_docomo_detail(html, html_title(html), DOCOMO_DETAIL_URL))),
+]
+
+
+def scraper_case(scraper):
+    async def run(page):
+        return len(await scraper(page))
+    return run
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def run_parse_case(parse, html, runs):
+    durations, counts = [], set()
+    for i in range(WARMUP_RUNS + runs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            count = parse(html)
+            elapsed = (time.perf_counter() - started) * 1000
+        if i >= WARMUP_RUNS:
+            durations.append(elapsed)
+            counts.add(count)
+    return {
+        "p50_ms": round(percentile(durations, 50), 3),
+        "p95_ms": round(percentile(durations, 95), 3),
+        "items": max(counts),
+        "stable": len(counts) == 1,
+        "protocol_calls": 0,
+        "missing": [],
+    }
+
+
+async def run_case(browser, store, name, bench, runs):
+    replayer = SnapshotReplayer(store)
+    context = await browser.new_context(**CONTEXT_OPTIONS)
+    try:
+        await PhaseMetrics(name).install(context)
+        await replayer.install(context)
+        page = await context.new_page()
+        durations, counts, calls = [], set(), []
+        for i in range(WARMUP_RUNS + runs):
+            # The scrapers are chatty; their progress lines would drown the table
+            with contextlib.redirect_stdout(io.StringIO()):
+                with phase("bench", carrier=name) as current:
+                    started = time.perf_counter()
+                    count = await bench(page)
+                    elapsed = (time.perf_counter() - started) * 1000
+            if i >= WARMUP_RUNS:
+                durations.append(elapsed)
+                counts.add(count)
+                calls.append(current.protocol_calls)
+    finally:
+        await context.close()
+    return {
+        "p50_ms": round(percentile(durations, 50), 2),
+        "p95_ms": round(percentile(durations, 95), 2),
+        "items": max(counts),
+        "stable": len(counts) == 1,
+        "protocol_calls": max(calls),
+        "missing": sorted(set(replayer.missing)),
+    }
+
+
+def build_store(tmpdir, snapshot_dir=None):
+    """A throwaway snapshot store with the fixtures (plus a recorded store's pages, if given)."""
+    store = SnapshotStore(tmpdir)
+    cases = []
+    for name, url, dump, template, bench in FIXTURE_CASES:
+        path = os.path.join(ROOT, dump)
+        if not os.path.exists(path):
+            print(f"Skipping {name}: {dump} not found")
+            continue
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        store.put(url, template.format(html) if template else html)
+        cases.append((name, bench))
+    if snapshot_dir:
+        recorded = SnapshotStore(snapshot_dir)
+        for url in recorded.urls():
+            store.put(url, recorded.get(url))
+        cases += [(f"{carrier}:scrape", scraper_case(scraper)) for carrier, scraper in CARRIER_SCRAPERS]
+    return store, cases
+
+
+def compare(results, baseline, threshold):
+    """Print the table; returns the names of failed cases."""
+    regressions = []
+    unbaselined = []
+    untimed = []
+    print(f"{'case':<18} {'p50 ms':>9} {'p95 ms':>9} {'items':>6} {'calls':>6} {'base p50':>9} {'delta':>7}  status")
+    for name, r in results.items():
+        base = baseline.get(name)
+        status = "ok" if r["stable"] else "UNSTABLE ITEM COUNT"
+        delta = ""
+        if base:
+            if base.get("p50_ms") is None:
+                untimed.append(name)
+            else:
+                change = r["p50_ms"] / base["p50_ms"] - 1 if base["p50_ms"] else 0.0
+                delta = f"{change:+.0%}"
+                if change > threshold:
+                    status = "REGRESSION"
+            if r["items"] != base["items"]:
+                status = f"ITEMS {base['items']} -> {r['items']}"
+        else:
+            unbaselined.append(name)
+            status = "no baseline" if status == "ok" else status
+        if r["items"] == 0:
+            status = "NO ITEMS"
+        if status not in ("ok", "no baseline"):
+            regressions.append(name)
+        print(f"{name:<18} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['items']:>6} {r['protocol_calls']:>6} "
+              f"{(base or {}).get('p50_ms') or '-':>9} {delta:>7}  {status}")
+        if r["missing"]:
+            print(f"    no snapshot for {len(r['missing'])} page(s), e.g. {r['missing'][0]}")
+    if unbaselined:
+        print(f"WARNING: {len(unbaselined)} case(s) have no baseline entry and can't regress: {', '.join(unbaselined)}"
+              " (run with --save-baseline to add them)")
+    if untimed:
+        print(f"WARNING: {len(untimed)} case(s) have no baseline timings yet, only item counts: {', '.join(untimed)}"
+              " (run with --save-baseline to add them)")
+    return regressions
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get("cases", {})
+    except OSError:
+        print(f"WARNING: no baseline at {path}; nothing can be flagged as a regression")
+    except ValueError as e:
+        print(f"WARNING: unreadable baseline {path} ({e}); nothing can be flagged as a regression")
+    return {}
+
+
+def save_baseline(path, results, baseline):
+    """Update the cases that ran, keep the others' entries."""
+    cases = dict(baseline)
+    cases.update({name: {k: r[k] for k in ("p50_ms", "p95_ms", "items")} for name, r in results.items()})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": BASELINE_VERSION, "cases": cases}, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+async def bench(args):
+    # Everything goes through the replayed browser pages, never over HTTP
+    configure_http(enabled=False)
+    selected = lambda name: not args.case or any(sel in name for sel in args.case)  # noqa: E731
+    results, skipped = {}, []
+    for name, dump, parse in PARSE_CASES:
+        if selected(name):
+            with open(os.path.join(ROOT, dump), encoding="utf-8") as f:
+                results[name] = run_parse_case(parse, f.read(), args.runs)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store, cases = build_store(tmpdir, args.snapshots)
+        cases = [c for c in cases if selected(c[0])]
+        if not cases:
+            return results, skipped
+        async with async_playwright() as p:
+            try:
+                browser = await p.chromium.launch(headless=True)
+            except Exception as e:
+                skipped = [name for name, _ in cases]
+                print(f"Chromium unavailable, skipping {len(cases)} browser case(s): {str(e).splitlines()[0]}")
+                return results, skipped
+            try:
+                for name, case in cases:
+                    results[name] = await run_case(browser, store, name, case, args.runs)
+            finally:
+                await browser.close()
+    return results, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--runs", type=int, default=DEFAULT_RUNS, help="measured runs per case (default: %(default)s)")
+    parser.add_argument("--snapshots", metavar="DIR", help="also run every carrier's scraper over this snapshot store")
+    parser.add_argument("--case", action="append", help="only cases whose name contains this (repeatable)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline file (default: tools/bench_baseline.json)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed p50 slowdown vs the baseline, as a fraction (default: %(default)s)")
+    parser.add_argument("--save-baseline", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--allow-skip", action="store_true",
+                        help="exit 0 even if the browser cases were skipped (no Chromium)")
+    args = parser.parse_args()
+
+    results, skipped = asyncio.run(bench(args))
+    baseline = load_baseline(args.baseline)
+    regressions = compare(results, baseline, args.threshold)
+    if args.save_baseline:
+        save_baseline(args.baseline, results, baseline)
+        print(f"Baseline saved to {args.baseline}" + (f" (without {', '.join(skipped)})" if skipped else ""))
+    if skipped and not args.allow_skip:
+        print(f"FAILED: {len(skipped)} browser case(s) skipped: {', '.join(skipped)} (--allow-skip to accept)")
+        return 1
+    return 1 if regressions and not args.save_baseline else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
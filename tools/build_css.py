@@ -0,0 +1,445 @@
+"""
+Offline replacement for the runtime Tailwind CDN compiler (cdn.tailwindcss.com).
+
+Scans docs/*.html and docs/js/*.js for class candidates the same way Tailwind
+does (every token that could be a class), generates CSS only for the utilities
+found, and writes docs/css/site.<hash>.css (preflight + utilities, minified).
+The pages' CDN <script> (or a previous hashed <link>) is replaced by a <link>
+to the new file; old hashed files are removed. The same CSS is also written to
+docs/css/site.css, whose name never changes: sites that embed the widget link
+that one, so a rebuild doesn't break them. No network or Node needed.
+
+    python tools/build_css.py           # rebuild after changing classes in app.js / the pages
+    python tools/build_css.py --check   # exit 1 if the committed CSS is out of date
+
+Only the subset of Tailwind v3 this site uses is implemented (default theme,
+hover/focus/active/group-hover/peer-checked/md variants). Classes that appear in
+class="..." but produce no CSS are listed, so a new utility doesn't go unnoticed.
+"""
+import argparse
+import glob
+import hashlib
+import os
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DOCS = os.path.join(ROOT, "docs")
+CSS_DIR = os.path.join(DOCS, "css")
+CSS_PREFIX = "site."
+# Stable alias for third-party embeds (the hashed name is for our own pages)
+ALIAS_NAME = "site.css"
+PAGES = ["index.html", "monitor.html", "widget.html", "dev.html"]
+SOURCES = [os.path.join(DOCS, p) for p in PAGES] + sorted(glob.glob(os.path.join(DOCS, "js", "*.js")))
+
+CDN_TAG_RE = re.compile(r'<script src="https://cdn\.tailwindcss\.com"></script>')
+LINK_TAG_RE = re.compile(r'<link rel="stylesheet" href="css/site\.[0-9a-f]+\.css">')
+CANDIDATE_RE = re.compile(r'[A-Za-z0-9_\-:/.\[\]%]+')
+CLASS_ATTR_RE = re.compile(r'class="([^"$]*)"')
+
+# Class names that are only hooks (for JS or group/peer variants), never utilities
+MARKER_CLASSES = {"group", "peer", "filter-carrier", "no-scrollbar"}
+
+# --- Theme (Tailwind v3 defaults, only what the site needs) ---
+
+PALETTE = {
+    "slate": "f8fafc f1f5f9 e2e8f0 cbd5e1 94a3b8 64748b 475569 334155 1e293b 0f172a 020617",
+    "gray": "f9fafb f3f4f6 e5e7eb d1d5db 9ca3af 6b7280 4b5563 374151 1f2937 111827 030712",
+    "red": "fef2f2 fee2e2 fecaca fca5a5 f87171 ef4444 dc2626 b91c1c 991b1b 7f1d1d 450a0a",
+    "orange": "fff7ed ffedd5 fed7aa fdba74 fb923c f97316 ea580c c2410c 9a3412 7c2d12 431407",
+    "yellow": "fefce8 fef9c3 fef08a fde047 facc15 eab308 ca8a04 a16207 854d0e 713f12 422006",
+    "green": "f0fdf4 dcfce7 bbf7d0 86efac 4ade80 22c55e 16a34a 15803d 166534 14532d 052e16",
+    "blue": "eff6ff dbeafe bfdbfe 93c5fd 60a5fa 3b82f6 2563eb 1d4ed8 1e40af 1e3a8a 172554",
+    "pink": "fdf2f8 fce7f3 fbcfe8 f9a8d4 f472b6 ec4899 db2777 be185d 9d174d 831843 500724",
+}
+SHADES = ["50", "100", "200", "300", "400", "500", "600", "700", "800", "900", "950"]
+COLORS = {"black": "000000", "white": "ffffff"}
+for _name, _hexes in PALETTE.items():
+    COLORS.update({f"{_name}-{shade}": h for shade, h in zip(SHADES, _hexes.split())})
+
+FONT_SIZES = {"xs": ("0.75rem", "1rem"), "sm": ("0.875rem", "1.25rem"), "base": ("1rem", "1.5rem"),
+              "lg": ("1.125rem", "1.75rem"), "xl": ("1.25rem", "1.75rem"), "2xl": ("1.5rem", "2rem"),
+              "3xl": ("1.875rem", "2.25rem"), "4xl": ("2.25rem", "2.5rem")}
+FONT_WEIGHTS = {"normal": 400, "medium": 500, "semibold": 600, "bold": 700, "extrabold": 800, "black": 900}
+RADII = {"": "0.25rem", "sm": "0.125rem", "md": "0.375rem", "lg": "0.5rem", "xl": "0.75rem",
+         "2xl": "1rem", "3xl": "1.5rem", "full": "9999px", "none": "0px"}
+SHADOWS = {
+    "sm": ("0 1px 2px 0 rgb(0 0 0 / 0.05)", "0 1px 2px 0 var(--tw-shadow-color)"),
+    "": ("0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)",
+         "0 1px 3px 0 var(--tw-shadow-color), 0 1px 2px -1px var(--tw-shadow-color)"),
+    "md": ("0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)",
+           "0 4px 6px -1px var(--tw-shadow-color), 0 2px 4px -2px var(--tw-shadow-color)"),
+    "lg": ("0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)",
+           "0 10px 15px -3px var(--tw-shadow-color), 0 4px 6px -4px var(--tw-shadow-color)"),
+    "xl": ("0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)",
+           "0 20px 25px -5px var(--tw-shadow-color), 0 8px 10px -6px var(--tw-shadow-color)"),
+}
+MAX_WIDTHS = {"sm": "24rem", "md": "28rem", "lg": "32rem", "xl": "36rem", "2xl": "42rem", "3xl": "48rem",
+              "4xl": "56rem", "5xl": "64rem", "6xl": "72rem", "7xl": "80rem"}
+SCREENS = {"sm": "640px", "md": "768px", "lg": "1024px", "xl": "1280px"}
+EASE = "cubic-bezier(0.4, 0, 0.2, 1)"
+TRANSITION_PROPERTIES = {
+    "": "color, background-color, border-color, text-decoration-color, fill, stroke, opacity, box-shadow, transform, filter, backdrop-filter",
+    "all": "all",
+    "colors": "color, background-color, border-color, text-decoration-color, fill, stroke",
+    "opacity": "opacity",
+    "shadow": "box-shadow",
+    "transform": "transform",
+}
+TRANSFORM = ("transform: translate(var(--tw-translate-x), var(--tw-translate-y)) rotate(var(--tw-rotate)) "
+             "scaleX(var(--tw-scale-x)) scaleY(var(--tw-scale-y))")
+FONT_SANS = 'ui-sans-serif, system-ui, sans-serif, "Apple Color Emoji", "Segoe UI Emoji", "Segoe UI Symbol", "Noto Color Emoji"'
+
+PREFLIGHT = """
+*,::before,::after{box-sizing:border-box;border-width:0;border-style:solid;border-color:#e5e7eb}
+::before,::after{--tw-content:''}
+html,:host{line-height:1.5;-webkit-text-size-adjust:100%;-moz-tab-size:4;tab-size:4;font-family:{sans};font-feature-settings:normal;font-variation-settings:normal;-webkit-tap-highlight-color:transparent}
+body{margin:0;line-height:inherit}
+hr{height:0;color:inherit;border-top-width:1px}
+h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}
+a{color:inherit;text-decoration:inherit}
+b,strong{font-weight:bolder}
+small{font-size:80%}
+table{text-indent:0;border-color:inherit;border-collapse:collapse}
+button,input,optgroup,select,textarea{font-family:inherit;font-feature-settings:inherit;font-variation-settings:inherit;font-size:100%;font-weight:inherit;line-height:inherit;letter-spacing:inherit;color:inherit;margin:0;padding:0}
+button,select{text-transform:none}
+button,input:where([type='button']),input:where([type='reset']),input:where([type='submit']){-webkit-appearance:button;background-color:transparent;background-image:none}
+:-moz-focusring{outline:auto}
+summary{display:list-item}
+blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}
+fieldset{margin:0;padding:0}
+legend{padding:0}
+ol,ul,menu{list-style:none;margin:0;padding:0}
+textarea{resize:vertical}
+input::placeholder,textarea::placeholder{opacity:1;color:#9ca3af}
+button,[role="button"]{cursor:pointer}
+:disabled{cursor:default}
+img,svg,video,canvas,audio,iframe,embed,object{display:block;vertical-align:middle}
+img,video{max-width:100%;height:auto}
+[hidden]{display:none}
+*,::before,::after,::backdrop{--tw-translate-x:0;--tw-translate-y:0;--tw-rotate:0;--tw-scale-x:1;--tw-scale-y:1;--tw-ring-inset: ;--tw-ring-offset-width:0px;--tw-ring-offset-color:#fff;--tw-ring-color:rgb(59 130 246 / 0.5);--tw-ring-offset-shadow:0 0 #0000;--tw-ring-shadow:0 0 #0000;--tw-shadow:0 0 #0000;--tw-shadow-colored:0 0 #0000;--tw-grayscale: }
+""".replace("{sans}", FONT_SANS)
+
+KEYFRAMES = {"spin": "@keyframes spin{to{transform:rotate(360deg)}}"}
+
+# --- Utilities ---
+
+STATIC = {
+    "block": "display: block", "inline-block": "display: inline-block", "flex": "display: flex",
+    "inline-flex": "display: inline-flex", "grid": "display: grid", "hidden": "display: none",
+    "relative": "position: relative", "absolute": "position: absolute", "fixed": "position: fixed",
+    "flex-row": "flex-direction: row", "flex-col": "flex-direction: column", "flex-wrap": "flex-wrap: wrap",
+    "flex-nowrap": "flex-wrap: nowrap", "flex-1": "flex: 1 1 0%", "flex-grow": "flex-grow: 1",
+    "flex-shrink-0": "flex-shrink: 0",
+    "items-start": "align-items: flex-start", "items-center": "align-items: center",
+    "items-end": "align-items: flex-end", "items-baseline": "align-items: baseline",
+    "justify-start": "justify-content: flex-start", "justify-center": "justify-content: center",
+    "justify-end": "justify-content: flex-end", "justify-between": "justify-content: space-between",
+    "overflow-hidden": "overflow: hidden", "overflow-x-auto": "overflow-x: auto",
+    "whitespace-nowrap": "white-space: nowrap", "uppercase": "text-transform: uppercase",
+    "text-left": "text-align: left", "text-center": "text-align: center", "text-right": "text-align: right",
+    "font-sans": f"font-family: {FONT_SANS}",
+    "leading-none": "line-height: 1", "leading-tight": "line-height: 1.25", "leading-snug": "line-height: 1.375",
+    "leading-normal": "line-height: 1.5", "leading-relaxed": "line-height: 1.625",
+    "tracking-tighter": "letter-spacing: -0.05em", "tracking-tight": "letter-spacing: -0.025em",
+    "tracking-wide": "letter-spacing: 0.025em", "tracking-wider": "letter-spacing: 0.05em",
+    "antialiased": "-webkit-font-smoothing: antialiased; -moz-osx-font-smoothing: grayscale",
+    "object-contain": "object-fit: contain", "object-cover": "object-fit: cover", "object-left": "object-position: left",
+    "mix-blend-multiply": "mix-blend-mode: multiply",
+    "appearance-none": "-webkit-appearance: none; appearance: none",
+    "cursor-pointer": "cursor: pointer", "select-none": "-webkit-user-select: none; user-select: none",
+    "pointer-events-none": "pointer-events: none",
+    "outline-none": "outline: 2px solid transparent; outline-offset: 2px",
+    "border-transparent": "border-color: transparent",
+    "ring-inset": "--tw-ring-inset: inset",
+    "grayscale": "--tw-grayscale: grayscale(100%); filter: var(--tw-grayscale)",
+    "grayscale-0": "--tw-grayscale: grayscale(0); filter: var(--tw-grayscale)",
+    "animate-spin": "animation: spin 1s linear infinite",
+    "min-h-screen": "min-height: 100vh", "min-w-0": "min-width: 0px",
+    "ease-out": "transition-timing-function: cubic-bezier(0, 0, 0.2, 1)",
+    "ease-in-out": f"transition-timing-function: {EASE}",
+    "grid-cols-1": "grid-template-columns: repeat(1, minmax(0, 1fr))",
+    "grid-cols-2": "grid-template-columns: repeat(2, minmax(0, 1fr))",
+    "grid-cols-3": "grid-template-columns: repeat(3, minmax(0, 1fr))",
+    "border": "border-width: 1px", "border-t": "border-top-width: 1px", "border-b": "border-bottom-width: 1px",
+    "inset-y-0": "top: 0px; bottom: 0px", "inset-x-0": "left: 0px; right: 0px", "inset-0": "inset: 0px",
+}
+
+
+def spacing(value):
+    """Tailwind spacing scale: 1 -> 0.25rem, 1.5 -> 0.375rem, px -> 1px, full -> 100%."""
+    if value == "px":
+        return "1px"
+    if value == "0":
+        return "0px"
+    if value == "full":
+        return "100%"
+    if value == "auto":
+        return "auto"
+    if re.fullmatch(r'\d+(\.5)?', value):
+        return f"{float(value) / 4:g}rem"
+    return None
+
+
+def color(value, opacity=None):
+    if value == "transparent":
+        return "transparent"
+    if value == "current":
+        return "currentColor"
+    hex_ = COLORS.get(value)
+    if hex_ is None:
+        return None
+    if opacity is None:
+        return f"#{hex_}"
+    r, g, b = (int(hex_[i:i + 2], 16) for i in (0, 2, 4))
+    return f"rgb({r} {g} {b} / {int(opacity) / 100:g})"
+
+
+def _color_utility(prop_fn):
+    def handler(m):
+        c = color(m.group(1), m.group(2))
+        return prop_fn(c) if c else None
+    return handler
+
+
+def _spacing_utility(props, negative_ok=False):
+    def handler(m):
+        v = spacing(m.group(2))
+        if v is None:
+            return None
+        if m.group(1):
+            v = f"-{v}"
+        return "; ".join(f"{p}: {v}" for p in props)
+    return handler
+
+
+COLOR = r'((?:[a-z]+-\d{2,3})|black|white|transparent|current)(?:/(\d{1,3}))?'
+SP = r'(\d+(?:\.5)?|px|full|auto)'
+
+# Ordered like Tailwind's core plugins, so later utilities win the same way they do there
+RULES = [
+    (r'(-?)top-(\d+(?:\.5)?|px|0|full)', _spacing_utility(["top"])),
+    (r'(-?)right-(\d+(?:\.5)?|px|0|full)', _spacing_utility(["right"])),
+    (r'(-?)bottom-(\d+(?:\.5)?|px|0|full)', _spacing_utility(["bottom"])),
+    (r'(-?)left-(\d+(?:\.5)?|px|0|full)', _spacing_utility(["left"])),
+    (r'z-(\d+)', lambda m: f"z-index: {m.group(1)}"),
+    (r'(-?)m-' + SP, _spacing_utility(["margin"])),
+    (r'(-?)mx-' + SP, _spacing_utility(["margin-left", "margin-right"])),
+    (r'(-?)my-' + SP, _spacing_utility(["margin-top", "margin-bottom"])),
+    (r'(-?)mt-' + SP, _spacing_utility(["margin-top"])),
+    (r'(-?)mr-' + SP, _spacing_utility(["margin-right"])),
+    (r'(-?)mb-' + SP, _spacing_utility(["margin-bottom"])),
+    (r'(-?)ml-' + SP, _spacing_utility(["margin-left"])),
+    (r'()w-(\d+(?:\.5)?|px|full|auto)', _spacing_utility(["width"])),
+    (r'()h-(\d+(?:\.5)?|px|full|auto)', _spacing_utility(["height"])),
+    (r'max-w-(\w+)', lambda m: f"max-width: {MAX_WIDTHS[m.group(1)]}" if m.group(1) in MAX_WIDTHS else None),
+    (r'(-?)translate-x-(\d+(?:\.5)?|px|full)', lambda m: _transform("--tw-translate-x", m)),
+    (r'(-?)translate-y-(\d+(?:\.5)?|px|full)', lambda m: _transform("--tw-translate-y", m)),
+    (r'scale-(\d+)', lambda m: f"--tw-scale-x: {int(m.group(1)) / 100:g}; --tw-scale-y: {int(m.group(1)) / 100:g}; {TRANSFORM}"),
+    (r'()gap-(\d+(?:\.5)?|px)', _spacing_utility(["gap"])),
+    (r'()gap-x-(\d+(?:\.5)?|px)', _spacing_utility(["column-gap"])),
+    (r'()gap-y-(\d+(?:\.5)?|px)', _spacing_utility(["row-gap"])),
+    (r'rounded(?:-(\w+))?', lambda m: f"border-radius: {RADII[m.group(1) or '']}" if (m.group(1) or '') in RADII else None),
+    (r'border-(\d)', lambda m: f"border-width: {m.group(1)}px"),
+    (r'border-t-(\d)', lambda m: f"border-top-width: {m.group(1)}px"),
+    (r'border-b-(\d)', lambda m: f"border-bottom-width: {m.group(1)}px"),
+    (r'border-' + COLOR, _color_utility(lambda c: f"border-color: {c}")),
+    (r'bg-' + COLOR, _color_utility(lambda c: f"background-color: {c}")),
+    (r'()p-(\d+(?:\.5)?|px)', _spacing_utility(["padding"])),
+    (r'()px-(\d+(?:\.5)?|px)', _spacing_utility(["padding-left", "padding-right"])),
+    (r'()py-(\d+(?:\.5)?|px)', _spacing_utility(["padding-top", "padding-bottom"])),
+    (r'()pt-(\d+(?:\.5)?|px)', _spacing_utility(["padding-top"])),
+    (r'()pr-(\d+(?:\.5)?|px)', _spacing_utility(["padding-right"])),
+    (r'()pb-(\d+(?:\.5)?|px)', _spacing_utility(["padding-bottom"])),
+    (r'()pl-(\d+(?:\.5)?|px)', _spacing_utility(["padding-left"])),
+    (r'text-(xs|sm|base|lg|xl|2xl|3xl|4xl)', lambda m: "font-size: %s; line-height: %s" % FONT_SIZES[m.group(1)]),
+    (r'text-\[(\d+px)\]', lambda m: f"font-size: {m.group(1)}"),
+    (r'font-(\w+)', lambda m: f"font-weight: {FONT_WEIGHTS[m.group(1)]}" if m.group(1) in FONT_WEIGHTS else None),
+    (r'text-' + COLOR, _color_utility(lambda c: f"color: {c}")),
+    (r'opacity-(\d+)', lambda m: f"opacity: {int(m.group(1)) / 100:g}"),
+    (r'shadow(?:-(sm|md|lg|xl))?', lambda m: _shadow(m.group(1) or "")),
+    (r'shadow-' + COLOR, _color_utility(lambda c: f"--tw-shadow-color: {c}; --tw-shadow: var(--tw-shadow-colored)")),
+    (r'ring(?:-(\d))?', lambda m: _ring(m.group(1) or "3")),
+    (r'ring-' + COLOR, _color_utility(lambda c: f"--tw-ring-color: {c}")),
+    (r'transition(?:-(\w+))?', lambda m: _transition(m.group(1) or "")),
+    (r'duration-(\d+)', lambda m: f"transition-duration: {m.group(1)}ms"),
+]
+
+
+def _transform(var, m):
+    v = spacing(m.group(2))
+    if v is None:
+        return None
+    return f"{var}: {'-' if m.group(1) else ''}{v}; {TRANSFORM}"
+
+
+def _shadow(size):
+    shadow, colored = SHADOWS[size]
+    return (f"--tw-shadow: {shadow}; --tw-shadow-colored: {colored}; "
+            "box-shadow: var(--tw-ring-offset-shadow, 0 0 #0000), var(--tw-ring-shadow, 0 0 #0000), var(--tw-shadow)")
+
+
+def _ring(width):
+    return ("--tw-ring-offset-shadow: var(--tw-ring-inset) 0 0 0 var(--tw-ring-offset-width) var(--tw-ring-offset-color); "
+            f"--tw-ring-shadow: var(--tw-ring-inset) 0 0 0 calc({width}px + var(--tw-ring-offset-width)) var(--tw-ring-color); "
+            "box-shadow: var(--tw-ring-offset-shadow), var(--tw-ring-shadow), var(--tw-shadow, 0 0 #0000)")
+
+
+def _transition(kind):
+    if kind not in TRANSITION_PROPERTIES:
+        return None
+    return (f"transition-property: {TRANSITION_PROPERTIES[kind]}; "
+            f"transition-timing-function: {EASE}; transition-duration: 150ms")
+
+
+COMPILED_RULES = [(re.compile(pattern), handler) for pattern, handler in RULES]
+
+# Variants in output order (later wins): pseudo-classes, then group-*, then peer-*
+PSEUDO_VARIANTS = {"hover": ":hover", "focus": ":focus", "active": ":active"}
+VARIANT_ORDER = ["hover", "focus", "active", "group-hover", "peer-checked"]
+
+
+def escape(class_name):
+    return re.sub(r'([^A-Za-z0-9_-])', r'\\\1', class_name)
+
+
+def utility(name):
+    """(plugin order, declarations, child selector suffix) for a bare utility, or None."""
+    if name in STATIC:
+        return (0, STATIC[name], "")
+    m = re.fullmatch(r'space-y-(\d+(?:\.5)?|px)', name)
+    if m:
+        return (1, f"margin-top: {spacing(m.group(1))}", " > :not([hidden]) ~ :not([hidden])")
+    for order, (pattern, handler) in enumerate(COMPILED_RULES, start=2):
+        m = pattern.fullmatch(name)
+        if m:
+            decls = handler(m)
+            if decls:
+                return (order, decls, "")
+    return None
+
+
+def parse_candidate(candidate):
+    """Split 'md:hover:bg-white' into (screen, [variants], 'bg-white', group name), or None."""
+    *variants, name = candidate.split(":")
+    screen = None
+    rest = []
+    for v in variants:
+        if v in SCREENS and screen is None and not rest:
+            screen = v
+        elif v in PSEUDO_VARIANTS or v == "peer-checked" or re.fullmatch(r'group-hover(/\w+)?', v):
+            rest.append(v)
+        else:
+            return None
+    return screen, rest, name
+
+
+def build_rule(candidate):
+    """(sort key, css) for one class candidate, or None if it isn't a utility we know."""
+    parsed = parse_candidate(candidate)
+    if parsed is None:
+        return None
+    screen, variants, name = parsed
+    found = utility(name)
+    if found is None:
+        return None
+    order, decls, suffix = found
+    selector = "." + escape(candidate)
+    variant_rank = 0
+    for v in variants:
+        if v in PSEUDO_VARIANTS:
+            selector += PSEUDO_VARIANTS[v]
+        elif v == "peer-checked":
+            selector = f".peer:checked ~ {selector}"
+        else:  # group-hover or group-hover/name
+            group = "group" + v[len("group-hover"):]
+            selector = f".{escape(group)}:hover {selector}"
+        variant_rank = max(variant_rank, 1 + VARIANT_ORDER.index(v.split("/")[0]))
+    css = f"{selector}{suffix}{{{decls.replace('; ', ';').replace(': ', ':')}}}"
+    if screen:
+        css = f"@media (min-width:{SCREENS[screen]}){{{css}}}"
+    screen_rank = list(SCREENS).index(screen) + 1 if screen else 0
+    return (screen_rank, variant_rank, order, candidate), css
+
+
+def scan_sources(paths):
+    candidates, class_attrs = set(), set()
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        candidates.update(CANDIDATE_RE.findall(text))
+        for attr in CLASS_ATTR_RE.findall(text):
+            class_attrs.update(attr.split())
+    return candidates, class_attrs
+
+
+def build_css(paths=SOURCES):
+    candidates, class_attrs = scan_sources(paths)
+    rules = {}
+    for candidate in candidates:
+        built = build_rule(candidate)
+        if built:
+            rules[candidate] = built
+    body = "".join(css for _, css in sorted(rules.values()))
+    keyframes = "".join(k for name, k in KEYFRAMES.items() if f"animate-{name}" in rules)
+    css = "".join(line for line in PREFLIGHT.strip().splitlines()) + keyframes + body + "\n"
+    unknown = sorted(c for c in class_attrs if c not in rules and c not in MARKER_CLASSES and not c.startswith("group/"))
+    return css, len(rules), unknown
+
+
+def link_pages(href):
+    """Point every page at href instead of the CDN script / an older build. Returns changed pages."""
+    tag = f'<link rel="stylesheet" href="{href}">'
+    changed = []
+    for page in PAGES:
+        path = os.path.join(DOCS, page)
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        new_html = LINK_TAG_RE.sub(tag, CDN_TAG_RE.sub(tag, html))
+        if new_html != html:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(new_html)
+            changed.append(page)
+    return changed
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Build docs/css/site.<hash>.css from the classes used in docs/")
+    parser.add_argument("--check", action="store_true", help="only verify that the built CSS and page links are current")
+    args = parser.parse_args(argv)
+
+    css, count, unknown = build_css()
+    name = f"{CSS_PREFIX}{hashlib.sha256(css.encode('utf-8')).hexdigest()[:10]}.css"
+    path = os.path.join(CSS_DIR, name)
+    for c in unknown:
+        print(f"warning: no CSS generated for class {c!r}")
+
+    alias = os.path.join(CSS_DIR, ALIAS_NAME)
+    if args.check:
+        linked = all(f'href="css/{name}"' in open(os.path.join(DOCS, p), encoding="utf-8").read() for p in PAGES)
+        try:
+            with open(alias, encoding="utf-8") as f:
+                alias_current = f.read() == css
+        except OSError:
+            alias_current = False
+        if os.path.exists(path) and linked and alias_current:
+            print(f"css/{name} and css/{ALIAS_NAME} are up to date")
+            return 0
+        print(f"css/{name} or css/{ALIAS_NAME} is missing, stale or not linked; run python tools/build_css.py")
+        return 1
+
+    os.makedirs(CSS_DIR, exist_ok=True)
+    for target in (path, alias):
+        with open(target, "w", encoding="utf-8") as f:
+            f.write(css)
+    for old in glob.glob(os.path.join(CSS_DIR, CSS_PREFIX + "*.css")):
+        if os.path.basename(old) not in (name, ALIAS_NAME):
+            os.remove(old)
+    changed = link_pages(f"css/{name}")
+    print(f"Wrote css/{name}: {count} utilities, {len(css.encode('utf-8')) / 1024:.1f} KB"
+          + (f"; relinked {', '.join(changed)}" if changed else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
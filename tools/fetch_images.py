@@ -1,12 +1,30 @@
+import argparse
+import asyncio
+import hashlib
+import json
 import os
-import requests
 import re
 import time
+from urllib.parse import urlsplit
+
+try:
+    from PIL import Image
+except ImportError:  # only needed for the variant pipeline: pip install pillow
+    Image = None
 
 # Create docs/images directory if it doesn't exist
 OUTPUT_DIR = os.path.join("docs", "images")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Responsive variants live in docs/images/v/, named by the source PNG's content hash,
+# so byte-identical sources (e.g. iphone16pro/iphone16promax) share one set of files.
+VARIANT_DIR = os.path.join(OUTPUT_DIR, "v")
+MANIFEST_FILE = os.path.join(OUTPUT_DIR, "manifest.json")
+# The widget's thumbnail box is w-20 h-24 with p-2: the image gets 64x80 CSS px. 1x/2x/3x of that.
+THUMB_BOX = (64, 80)
+DENSITIES = [1, 2, 3]
+FORMATS = {"avif": {"quality": 55}, "webp": {"quality": 80, "method": 6}}
+
 # Image Mapping (using Apple CDN or Placeholders)
 # Note: For unreleased/future models (iPhone 17, Air, 16e), we will use placeholders or previous model images as proxies if not available.
 # Since this is a demo/dev environment, I will use high-quality placeholders or known URLs where possible.
@@ -58,41 +76,226 @@ def normalize_model_name(name):
     clean = re.sub(r'[^a-z0-9]', '', clean)
     return clean
 
-def download_image(url, filename, save_path):
-    print(f"Downloading {filename} from {url}...")
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36"
+# Validators (ETag / Last-Modified) and content hashes of everything we've downloaded
+FETCH_STATE_FILE = os.path.join(".cache", "image_sources.json")
+MAX_CONCURRENCY = 8
+PER_HOST_LIMIT = 2
+# Leading bytes of the formats we store; anything else (an HTML error page, say) is rejected
+MAGIC = {".png": [b"\x89PNG\r\n\x1a\n"], ".svg": [b"<svg", b"<?xml"], ".webp": [b"RIFF"], ".jpg": [b"\xff\xd8\xff"]}
+
+
+def _sha256_file(path):
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, stream=True)
-        response.raise_for_status()
-        
-        with open(save_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        print(f"Saved to {save_path}")
-        return True
-    except Exception as e:
-        print(f"Failed to download {filename}: {e}")
-        return False
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
 
-def main():
+
+def _load_fetch_state():
+    try:
+        with open(FETCH_STATE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_fetch_state(state):
+    os.makedirs(os.path.dirname(FETCH_STATE_FILE), exist_ok=True)
+    tmp = FETCH_STATE_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp, FETCH_STATE_FILE)
+
+
+def _check_payload(filename, content, response, expected_sha256=None):
+    """Reason the downloaded bytes can't be trusted, or None."""
+    length = response.headers.get("content-length")
+    # httpx decodes gzip/br, so the header only describes identity-encoded bodies
+    if length and not response.headers.get("content-encoding") and int(length) != len(content):
+        return f"truncated ({len(content)} of {length} bytes)"
+    magic = MAGIC.get(os.path.splitext(filename)[1].lower())
+    head = content[:64].lstrip()
+    if magic and not any(head.startswith(m) for m in magic):
+        return f"not a {os.path.splitext(filename)[1]} file ({response.headers.get('content-type')})"
+    if expected_sha256 and hashlib.sha256(content).hexdigest() != expected_sha256:
+        return "sha256 mismatch"
+    return None
+
+
+async def _fetch_one(client, host_limits, state, job, output_dir, force=False):
+    """Download one (url, filename[, sha256]) job; returns (filename, status)."""
+    url, filename = job[0], job[1]
+    expected = job[2] if len(job) > 2 else None
+    path = os.path.join(output_dir, filename)
+    entry = state.get(filename, {})
+    local = _sha256_file(path)
+    # A file we didn't download (committed to the repo, or edited since) is kept: a fresh
+    # clone has no state, and overwriting would swap real photos for the placeholders above
+    if local and not force and (entry.get("adopted") or entry.get("url") != url or entry.get("sha256") != local):
+        state[filename] = {"url": url, "sha256": local, "adopted": True, "fetched_at": entry.get("fetched_at")}
+        return filename, "kept (local file; --force to replace)"
+    headers = {}
+    # Only revalidate when the local file is still the one the validators describe
+    if not force and entry.get("url") == url and entry.get("sha256") == local:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    host = urlsplit(url).hostname
+    async with host_limits.setdefault(host, asyncio.Semaphore(PER_HOST_LIMIT)):
+        try:
+            response = await client.get(url, headers=headers)
+        except Exception as e:
+            return filename, f"failed ({type(e).__name__})"
+    if response.status_code == 304:
+        return filename, "not modified"
+    if response.status_code != 200:
+        return filename, f"failed (status {response.status_code})"
+    problem = _check_payload(filename, response.content, response, expected)
+    if problem:
+        return filename, f"failed ({problem})"
+
+    digest = hashlib.sha256(response.content).hexdigest()
+    status = "unchanged"
+    if digest != local:
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(response.content)
+        os.replace(tmp, path)
+        status = "downloaded"
+    state[filename] = {"url": url, "sha256": digest, "etag": response.headers.get("etag"),
+                       "last_modified": response.headers.get("last-modified"),
+                       "fetched_at": time.strftime("%Y-%m-%d %H:%M")}
+    return filename, status
+
+
+async def download_all(jobs, output_dir=OUTPUT_DIR, force=False):
+    """
+    Fetch (url, filename[, expected_sha256]) jobs into output_dir concurrently, with
+    PER_HOST_LIMIT requests per host, conditional requests from the stored validators,
+    payload checks and atomic writes. Works for product images and carrier logos alike.
+    Existing files this didn't download are left alone unless `force`.
+    """
+    import httpx  # only needed for downloading, not for the offline variant build
+
+    state = _load_fetch_state()
+    host_limits = {}
+    limits = httpx.Limits(max_connections=MAX_CONCURRENCY, max_keepalive_connections=MAX_CONCURRENCY)
+    async with httpx.AsyncClient(headers={"User-Agent": USER_AGENT}, follow_redirects=True,
+                                 timeout=30.0, limits=limits) as client:
+        results = await asyncio.gather(*[_fetch_one(client, host_limits, state, job, output_dir, force) for job in jobs])
+    _save_fetch_state(state)
+
+    for filename, status in results:
+        print(f"  {filename:<24} {status}")
+    counts = {}
+    for _, status in results:
+        key = status.split(" (")[0]
+        counts[key] = counts.get(key, 0) + 1
+    print("Downloads: " + ", ".join(f"{n} {k}" for k, n in sorted(counts.items())))
+    return dict(results)
+
+
+def product_jobs():
+    """One job per image file; both SE spellings map to iphonese3.png."""
+    jobs = {}
     for model_name, url in image_map.items():
-        # Generate filename
-        # Special handling for SE to ensure consistency if needed, but regex above handles it
-        slug = normalize_model_name(model_name)
-        
-        # If duplicated keys in normalize (e.g. SE half/full width), it's fine, we iterate map
-        filename = f"{slug}.png"
-        save_path = os.path.join(OUTPUT_DIR, filename)
-        
-        if os.path.exists(save_path):
-            print(f"Skipping {filename}, already exists.")
+        jobs.setdefault(f"{normalize_model_name(model_name)}.png", url)
+    return [(url, filename) for filename, url in jobs.items()]
+
+
+def load_jobs(path):
+    """Extra jobs from a JSON file, e.g. carrier logos: {"logo_au.svg": "https://...", ...}
+    (a value may also be [url, sha256] to pin the expected content)."""
+    with open(path, encoding="utf-8") as f:
+        mapping = json.load(f)
+    return [(v, k) if isinstance(v, str) else (v[0], k, v[1]) for k, v in mapping.items()]
+
+
+def _avif_supported():
+    try:
+        import pillow_avif  # noqa: F401  (plugin for Pillow < 11.2)
+    except ImportError:
+        pass
+    Image.init()
+    return "AVIF" in Image.SAVE
+
+
+def build_variants(source_dir=OUTPUT_DIR):
+    """
+    Resize every product PNG into WebP/AVIF thumbnails and write images/manifest.json.
+    Works purely on local files; already-encoded variants are reused.
+    """
+    if Image is None:
+        print("Pillow is not installed (pip install pillow); skipping image variants.")
+        return None
+    formats = {fmt: opts for fmt, opts in FORMATS.items() if fmt != "avif" or _avif_supported()}
+    if "avif" not in formats:
+        print("No AVIF encoder in this Pillow build; writing WebP only.")
+    os.makedirs(VARIANT_DIR, exist_ok=True)
+
+    manifest = {"version": 1, "box": list(THUMB_BOX), "images": {}}
+    keep = set()
+    encoded = 0
+    for name in sorted(os.listdir(source_dir)):
+        if not (name.startswith("iphone") and name.endswith(".png")):
             continue
-            
-        success = download_image(url, filename, save_path)
-        if success:
-            time.sleep(1) # Be nice to server for batch downloads
+        path = os.path.join(source_dir, name)
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        with Image.open(path) as img:
+            img.load()
+            entry = {"src": name, "sha256": digest, "width": img.width, "height": img.height,
+                     "bytes": len(data), "variants": {fmt: [] for fmt in formats}}
+            for density in DENSITIES:
+                thumb = img.copy()
+                thumb.thumbnail((THUMB_BOX[0] * density, THUMB_BOX[1] * density), Image.LANCZOS)
+                for fmt, opts in formats.items():
+                    rel = f"v/{digest[:12]}-{thumb.width}.{fmt}"
+                    out = os.path.join(OUTPUT_DIR, rel)
+                    if not os.path.exists(out):
+                        tmp = out + ".tmp"
+                        thumb.save(tmp, format=fmt.upper(), **opts)
+                        os.replace(tmp, out)
+                        encoded += 1
+                    keep.add(os.path.basename(rel))
+                    entry["variants"][fmt].append({"file": rel, "w": thumb.width, "h": thumb.height,
+                                                   "bytes": os.path.getsize(out)})
+        manifest["images"][name[:-len(".png")]] = entry
+
+    for name in os.listdir(VARIANT_DIR):
+        if name not in keep:
+            os.remove(os.path.join(VARIANT_DIR, name))
+    with open(MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+
+    sources = {e["sha256"]: e["bytes"] for e in manifest["images"].values()}
+    variant_bytes = {v["file"]: v["bytes"] for e in manifest["images"].values()
+                     for vs in e["variants"].values() for v in vs}
+    print(f"Images: {len(manifest['images'])} models, {len(sources)} unique sources "
+          f"({sum(sources.values()) / 1024:.0f} KB) -> {len(variant_bytes)} variants "
+          f"({sum(variant_bytes.values()) / 1024:.0f} KB), {encoded} newly encoded")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download product images and build their WebP/AVIF variants")
+    parser.add_argument("--offline", action="store_true", help="don't download, only rebuild variants from local PNGs")
+    parser.add_argument("--jobs", metavar="JSON", action="append", default=[],
+                        help="also fetch {filename: url} from this file (e.g. carrier logos)")
+    parser.add_argument("--force", action="store_true",
+                        help="replace local images that weren't downloaded by this tool (e.g. the committed ones)")
+    args = parser.parse_args()
+    if not args.offline:
+        jobs = product_jobs()
+        for path in args.jobs:
+            jobs += load_jobs(path)
+        asyncio.run(download_all(jobs, force=args.force))
+    build_variants()
 
 if __name__ == "__main__":
     main()
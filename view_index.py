@@ -0,0 +1,110 @@
+"""
+Precomputed view index for the widget (docs/js/app.js).
+
+Everything the widget used to recompute on every filter click is derived once
+here and written next to data.json (data.json -> data.index.json):
+
+- "models" / "storages": the facet chips, already in display order
+- "model_rank" / "monthly": per item, parallel to data.json "items"
+- "order": item positions pre-sorted for every sort mode (and price mode)
+- "lowest": per (model, storage) cheapest flags for both price modes
+
+Orderings are positions into data.json "items"; "ids" gives the stable id
+(items.py) at each position. The widget only trusts the index when its
+"updated_at" matches data.json, and falls back to computing things itself otherwise.
+
+    python view_index.py docs/data.json     # rebuild the index for a saved data.json
+"""
+import json
+import os
+import re
+import sys
+
+from items import assign_item_ids
+
+INDEX_VERSION = 1
+PRICE_MODES = ["rent", "buyout"]
+
+_MODEL_NUMBER_RE = re.compile(r'iPhone\s*(\d+)')
+
+
+def model_rank(model):
+    """Generation number used for "newest first" (SE sorts last), as in app.js getNum()."""
+    if "SE" in model:
+        return -1
+    m = _MODEL_NUMBER_RE.search(model)
+    return int(m.group(1)) if m else 0
+
+
+def storage_rank(storage):
+    """GB count for sorting storage chips; non-numeric labels sort last."""
+    m = re.match(r'\d+', storage)
+    if not m:
+        return 9999
+    return int(m.group(0)) * 1024 if "TB" in storage else int(m.group(0))
+
+
+def monthly_price(item):
+    return item.get("monthly_payment") or (item["price_effective_rent"] // 24 if item.get("price_effective_rent") else 0)
+
+
+def _mode_price(item, monthly, mode):
+    return monthly if mode == "rent" else (item.get("price_gross") or 0)
+
+
+def index_path(data_path):
+    return os.path.splitext(data_path)[0] + ".index.json"
+
+
+def build_view_index(data):
+    items = data["items"]
+    positions = range(len(items))
+    ranks = [model_rank(i["model"]) for i in items]
+    monthly = [monthly_price(i) for i in items]
+
+    models = sorted({i["model"] for i in items}, key=lambda m: (-model_rank(m), m))
+    # First-seen order before the (stable) sort, so ties like 最小容量/Unknown land where app.js puts them
+    storages = sorted(dict.fromkeys(i["storage"] for i in items), key=storage_rank)
+
+    # Python's sort is stable like Array.prototype.sort, so ties keep data.json order
+    order = {"model_newest": sorted(positions, key=lambda p: (-ranks[p], items[p]["model"]))}
+    for mode in PRICE_MODES:
+        prices = [_mode_price(i, m, mode) for i, m in zip(items, monthly)]
+        order[f"price_asc:{mode}"] = sorted(positions, key=lambda p: prices[p])
+        order[f"price_desc:{mode}"] = sorted(positions, key=lambda p: -prices[p])
+
+    lowest = {}
+    for mode in PRICE_MODES:
+        cheapest = {}
+        for item, m in zip(items, monthly):
+            key = (item["model"], item["storage"])
+            price = _mode_price(item, m, mode)
+            cheapest[key] = min(price, cheapest.get(key, price))
+        lowest[mode] = [1 if _mode_price(i, m, mode) == cheapest[(i["model"], i["storage"])] else 0
+                        for i, m in zip(items, monthly)]
+
+    return {
+        "version": INDEX_VERSION,
+        "updated_at": data.get("updated_at"),
+        "count": len(items),
+        "ids": assign_item_ids(items),
+        "models": models,
+        "storages": storages,
+        "model_rank": ranks,
+        "monthly": monthly,
+        "order": order,
+        "lowest": lowest,
+    }
+
+
+def write_view_index(data, data_path):
+    path = index_path(data_path)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(build_view_index(data), f, ensure_ascii=False, separators=(",", ":"))
+    return path
+
+
+if __name__ == "__main__":
+    for data_path in sys.argv[1:] or ["docs/data.json"]:
+        with open(data_path, encoding="utf-8") as f:
+            print(f"Wrote {write_view_index(json.load(f), data_path)}")
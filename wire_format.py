@@ -0,0 +1,159 @@
+"""
+Compact, versioned wire format for the widget (data.json -> data.v2.json).
+
+data.json repeats every key and most strings (carrier, model, URL, stock text)
+once per item, pretty-printed. data.v2.json carries the same items as:
+
+    {
+      "v": 2, "updated_at": "...", "n": <item count>,
+      "strings": {"carrier": [...], "model": [...], "storage": [...], "url": [...],
+                  "color": [...], "text": [...]},           # interned, first-seen order
+      "cols": {"carrier": [i, ...], "model": [...], "storage": [...], "url": [...],
+               "price_gross": [...], "price_effective_rent": [...], ...},
+      "phases":   [[text_i, amount, text_i, amount, ...], ...],        # per item
+      "variants": [[color_i, text_i, available(0/1), ...], ...],       # per item
+      "extra": {"<position>": {...}}                                    # unknown keys, if any
+    }
+
+minified, plus precompressed .gz and .br siblings for static hosts that serve
+them. data.json itself is still written unchanged for older embeds.
+decode() (and decodeCompactData() in docs/js/wire_format.js) rebuild equal item dicts
+(key order aside: scrapers don't agree on one).
+"""
+import gzip
+import json
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FORMAT_VERSION = 2
+
+STRING_COLUMNS = ["carrier", "model", "storage", "url"]
+INT_COLUMNS = [
+    "price_gross",
+    "price_effective_rent",
+    "price_effective_buyout",
+    "discount_official",
+    "points_awarded",
+    "program_exemption",
+    "monthly_payment",
+]
+# Keys covered by the columns above; anything else goes to "extra"
+ITEM_KEYS = ["carrier", "model", "storage", "price_gross", "price_effective_rent", "price_effective_buyout",
+             "url", "discount_official", "points_awarded", "program_exemption", "monthly_payment",
+             "monthly_payment_phases", "variants"]
+
+
+class _Interner:
+    def __init__(self):
+        self.values = []
+        self._index = {}
+
+    def __call__(self, value):
+        if value is None:
+            return None
+        if value not in self._index:
+            self._index[value] = len(self.values)
+            self.values.append(value)
+        return self._index[value]
+
+
+def compact_path(data_path):
+    return os.path.splitext(data_path)[0] + f".v{FORMAT_VERSION}.json"
+
+
+def encode(data):
+    items = data["items"]
+    tables = {name: _Interner() for name in STRING_COLUMNS + ["color", "text"]}
+    cols = {name: [tables[name](i.get(name)) for i in items] for name in STRING_COLUMNS}
+    cols.update({name: [i.get(name) for i in items] for name in INT_COLUMNS})
+
+    phases, variants, extra = [], [], {}
+    for pos, item in enumerate(items):
+        flat = []
+        for p in item.get("monthly_payment_phases") or []:
+            flat += [tables["text"](p.get("period")), p.get("amount")]
+        phases.append(flat)
+        flat = []
+        for v in item.get("variants") or []:
+            flat += [tables["color"](v.get("color")), tables["text"](v.get("stock_text")),
+                     1 if v.get("stock_available") else 0]
+        variants.append(flat)
+        unknown = {k: v for k, v in item.items() if k not in ITEM_KEYS}
+        if unknown:
+            extra[str(pos)] = unknown
+
+    out = {
+        "v": FORMAT_VERSION,
+        "updated_at": data.get("updated_at"),
+        "n": len(items),
+        "strings": {name: t.values for name, t in tables.items()},
+        "cols": cols,
+        "phases": phases,
+        "variants": variants,
+    }
+    if extra:
+        out["extra"] = extra
+    return out
+
+
+def decode(compact):
+    if compact.get("v") != FORMAT_VERSION:
+        raise ValueError(f"unsupported data format version {compact.get('v')!r}")
+    strings, cols = compact["strings"], compact["cols"]
+
+    def lookup(table, i):
+        return None if i is None else strings[table][i]
+
+    items = []
+    for pos in range(compact["n"]):
+        item = {}
+        for key in ITEM_KEYS:
+            if key in STRING_COLUMNS:
+                item[key] = lookup(key, cols[key][pos])
+            elif key in INT_COLUMNS:
+                item[key] = cols[key][pos]
+        flat = compact["phases"][pos]
+        item["monthly_payment_phases"] = [{"period": lookup("text", flat[j]), "amount": flat[j + 1]}
+                                          for j in range(0, len(flat), 2)]
+        flat = compact["variants"][pos]
+        item["variants"] = [{"color": lookup("color", flat[j]), "stock_text": lookup("text", flat[j + 1]),
+                             "stock_available": flat[j + 2] == 1}
+                            for j in range(0, len(flat), 3)]
+        item.update(compact.get("extra", {}).get(str(pos), {}))
+        items.append(item)
+    return {"updated_at": compact.get("updated_at"), "items": items}
+
+
+def _write_bytes(path, payload):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+    return len(payload)
+
+
+def write_compact(data, data_path):
+    """Write data.v2.json (+ .gz, + .br when brotli is installed) next to data_path. Returns {path: bytes}."""
+    path = compact_path(data_path)
+    payload = json.dumps(encode(data), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    sizes = {path: _write_bytes(path, payload)}
+    # mtime=0 keeps the .gz byte-identical between runs with the same data
+    sizes[path + ".gz"] = _write_bytes(path + ".gz", gzip.compress(payload, compresslevel=9, mtime=0))
+    if brotli is not None:
+        sizes[path + ".br"] = _write_bytes(path + ".br", brotli.compress(payload, quality=11))
+    return sizes
+
+
+def print_size_summary(data_path, sizes):
+    def kb(n):
+        return f"{n / 1024:.1f} KB"
+
+    legacy = os.path.getsize(data_path)
+    parts = [f"{os.path.basename(p)} {kb(n)}" for p, n in sizes.items()]
+    smallest = min(sizes.values())
+    print(f"Wire format: {os.path.basename(data_path)} {kb(legacy)} -> " + ", ".join(parts) +
+          f" ({legacy / smallest:.1f}x smaller)")